@@ -1203,104 +1203,94 @@ const LangGraphVisualizer = () => {
       }
     ]);
 
+    // Update the last loading bot message in place
+    const updateLoadingMessage = (content, isLoading = true) => {
+      setMessages(prev => {
+        const updated = [...prev];
+        for (let i = updated.length - 1; i >= 0; i--) {
+          if (updated[i]?.isLoading) {
+            updated[i] = { ...updated[i], content, isLoading };
+            break;
+          }
+        }
+        return updated;
+      });
+    };
+
     try {
-      const response = await fetch('http://localhost:8000/chat', {
+      // Stream agent results and summary tokens as Server-Sent Events
+      const response = await fetch('http://localhost:8000/chat/stream', {
         method: 'POST',
         headers: { 'Content-Type': 'application/json' },
         body: JSON.stringify({ message: userInput })
       });
+      if (!response.ok || !response.body) {
+        throw new Error(`Stream request failed with status ${response.status}`);
+      }
 
-      const data = await response.json();
-      // Parse all agent names from query_type (comma-separated)
-      const agentNames = (data.query_type || '').split(',').map(a => a.trim()).filter(Boolean);
       const agentNameToNodeId = {
         'TicketAnalyzerAgent': 'ticket_analyzer',
         'NewsAggregatorAgent': 'news_aggregator',
         'ActivityTrackerAgent': 'activity_tracker',
         'InfrastructureCostMonitorAgent': 'infrastructure_cost_monitor',
         'ChatAgent': 'chat',
-        'ticket_analyzer': 'ticket_analyzer',
-        'news_aggregator': 'news_aggregator',
-        'activity_tracker': 'activity_tracker',
-        'infrastructure_cost_monitor': 'infrastructure_cost_monitor',
-        'chat': 'chat',
       };
-      let agentResponses = {};
-      let hasAgentResponses = typeof data.agent_responses === 'object' && data.agent_responses !== null;
-      if (hasAgentResponses) {
-        agentResponses = data.agent_responses;
-      }
-      // Always use the summary field from backend for chat display
-      let summaryContent = data.summary || data.response || 'No response';
-      
-      // Animate router, then each agent one by one
-      let delay = 0;
-      setExecutionPath([]); // All gray
-      setTimeout(() => setExecutionPath(['router']), delay += 800); // router active
-      agentNames.forEach((agent, idx) => {
-        const nodeId = agentNameToNodeId[agent] || agent.toLowerCase();
-        setTimeout(() => setExecutionPath(['router', nodeId]), delay += 1200);
-        setTimeout(() => setExecutionPath(['router']), delay += 800);
-      });
-      
-      const totalAnimationTime = delay + 800; // Total time for all animations
+      let terminalContent = '';
+      let summaryContent = '';
+      let finalContent = null;
+      const finishedNodes = [];
+
+      const handleEvent = (event, data) => {
+        if (event === 'route') {
+          const agentNames = data.agents || [];
+          setExecutionPath(['router', ...agentNames.map(agent => agentNameToNodeId[agent] || agent)]);
+          terminalContent += agentNames.length > 0 ? `Invoking agents: ${agentNames.join(', ')}\n` : '';
+          setTerminalOutput(terminalContent);
+        } else if (event === 'agent') {
+          // Each agent shows up as soon as it finishes
+          finishedNodes.push(data.agent);
+          setExecutionPath(['router', ...finishedNodes]);
+          terminalContent += `\n[${data.agent} is answering...]\n--- ${data.agent} ---\n${data.response}\n`;
+          setTerminalOutput(terminalContent);
+        } else if (event === 'token') {
+          summaryContent += data.token;
+          updateLoadingMessage(summaryContent);
+        } else if (event === 'done') {
+          finalContent = data.response || 'No response';
+        } else if (event === 'error') {
+          finalContent = data.detail || 'Error processing message';
+        }
+      };
 
-      // Show all agent responses in terminal AFTER visualization completes
-      setTimeout(() => {
-        let terminalContent = '';
-        let allResponses = '';
-        let uniqueResponses = new Set();
-        
-        // Build terminal header
-        terminalContent += agentNames.length > 0
-          ? `Invoking agents: ${agentNames.join(', ')}\n\n`
-          : '';
-        
-        // Collect all agent responses
-        let responseBlocks = [];
-        if (hasAgentResponses && Object.keys(agentResponses).length > 0) {
-          Object.entries(agentResponses).forEach(([agent, resp], idx, arr) => {
-            responseBlocks.push({ agent, resp });
+      // Parse "event: ...\ndata: ...\n\n" blocks from the response stream
+      const reader = response.body.getReader();
+      const decoder = new TextDecoder();
+      let buffer = '';
+      while (true) {
+        const { value, done } = await reader.read();
+        if (done) break;
+        buffer += decoder.decode(value, { stream: true });
+        let boundary;
+        while ((boundary = buffer.indexOf('\n\n')) !== -1) {
+          const block = buffer.slice(0, boundary);
+          buffer = buffer.slice(boundary + 2);
+          let event = 'message';
+          let data = '';
+          block.split('\n').forEach(line => {
+            if (line.startsWith('event:')) event = line.slice(6).trim();
+            else if (line.startsWith('data:')) data += line.slice(5).trim();
           });
+          if (data) handleEvent(event, JSON.parse(data));
         }
-        
-        // Show agent responses (but not the summary to avoid duplication)
-        responseBlocks.forEach(({ agent, resp }, idx) => {
-          if (!uniqueResponses.has(resp)) {
-            allResponses += `\n[${agent} is answering...]\n--- ${agent} ---\n${resp}\n`;
-            uniqueResponses.add(resp);
-          }
-        });
-        
-        // Add summary at the end only if it's different from agent responses
-        if (summaryContent && !uniqueResponses.has(summaryContent)) {
-          allResponses += `\n${summaryContent}`;
-        }
-        
-        // Update terminal with all content at once
-        setTerminalOutput(terminalContent + allResponses);
-        setExecutionPath([]);
-      }, totalAnimationTime);
-      
-      // Show response in chat AFTER terminal output (with delay for visibility)
-      setTimeout(() => {
-        setMessages(prev => {
-          const updated = [...prev];
-          // Find and update the last loading message
-          for (let i = updated.length - 1; i >= 0; i--) {
-            if (updated[i]?.isLoading) {
-              updated[i] = {
-                ...updated[i],
-                content: summaryContent,
-                isLoading: false
-              };
-              break;
-            }
-          }
-          return updated;
-        });
-        setIsLoading(false);
-      }, totalAnimationTime + 500);
+      }
+
+      // Show the final summary in terminal (if not a copy of an agent response) and chat
+      if (finalContent && !terminalContent.includes(finalContent)) {
+        setTerminalOutput(`${terminalContent}\n${finalContent}`);
+      }
+      updateLoadingMessage(finalContent || summaryContent || 'No response', false);
+      setExecutionPath([]);
+      setIsLoading(false);
     } catch (error) {
       const errorMessage = { 
         type: 'error', 
@@ -0,0 +1,560 @@
+"""
+Pluggable data backends for the Technology-Garage Multi-Agent System
+
+A backend provides the ticket store, the activity store and the cost table
+the agent nodes query. "memory" builds the indexed in-memory stores from
+data.py; "sqlite" keeps the data in a SQLite database (WAL mode, indexed on
+status, priority, person and dates) so a large dataset lives on disk, is
+shared by every worker, and is queried through prepared statements instead
+of being loaded into each process; "snapshot" (snapshot.py) maps a read-only
+columnar file.
+
+Bulk-load JSON/CSV exports into a database:
+
+    python backends.py agents.db tickets.csv activities.json costs.json
+"""
+
+import argparse
+import csv
+import json
+import os
+import sqlite3
+import threading
+from collections.abc import Sequence
+from contextlib import contextmanager
+
+from stores import TicketStore, ActivityStore, CostTable, KANBAN_COLUMNS, tokenize
+
+TICKET_FIELDS = ("ticket_id", "raised_by", "category", "subject", "description", "status", "priority", "created_at")
+ACTIVITY_FIELDS = ("activity_id", "employee", "task", "status", "priority", "start_date", "due_date", "progress")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS tickets (
+    id INTEGER PRIMARY KEY,
+    ticket_id TEXT NOT NULL UNIQUE COLLATE NOCASE,
+    raised_by TEXT NOT NULL,
+    category TEXT,
+    subject TEXT NOT NULL DEFAULT '',
+    description TEXT NOT NULL DEFAULT '',
+    status TEXT NOT NULL COLLATE NOCASE,
+    priority TEXT NOT NULL COLLATE NOCASE,
+    created_at TEXT,
+    extra TEXT,
+    person_full TEXT NOT NULL,
+    person TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS tickets_status ON tickets (status);
+CREATE INDEX IF NOT EXISTS tickets_priority ON tickets (priority);
+CREATE INDEX IF NOT EXISTS tickets_person_full ON tickets (person_full);
+CREATE INDEX IF NOT EXISTS tickets_person ON tickets (person);
+CREATE INDEX IF NOT EXISTS tickets_created_at ON tickets (created_at);
+CREATE TABLE IF NOT EXISTS ticket_tokens (
+    token TEXT NOT NULL,
+    id INTEGER NOT NULL,
+    PRIMARY KEY (token, id)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS activities (
+    id INTEGER PRIMARY KEY,
+    activity_id TEXT NOT NULL UNIQUE COLLATE NOCASE,
+    employee TEXT NOT NULL COLLATE NOCASE,
+    task TEXT NOT NULL DEFAULT '',
+    status TEXT NOT NULL,
+    priority TEXT NOT NULL COLLATE NOCASE,
+    start_date TEXT,
+    due_date TEXT,
+    progress TEXT,
+    extra TEXT
+);
+CREATE INDEX IF NOT EXISTS activities_status ON activities (status);
+CREATE INDEX IF NOT EXISTS activities_priority ON activities (priority);
+CREATE INDEX IF NOT EXISTS activities_employee ON activities (employee);
+CREATE INDEX IF NOT EXISTS activities_start_date ON activities (start_date);
+CREATE INDEX IF NOT EXISTS activities_due_date ON activities (due_date);
+CREATE TABLE IF NOT EXISTS employees (
+    name TEXT PRIMARY KEY COLLATE NOCASE
+) WITHOUT ROWID;
+CREATE TRIGGER IF NOT EXISTS activities_employees_insert AFTER INSERT ON activities BEGIN
+    INSERT OR IGNORE INTO employees (name) VALUES (new.employee);
+END;
+CREATE TRIGGER IF NOT EXISTS activities_employees_update AFTER UPDATE OF employee ON activities BEGIN
+    INSERT OR IGNORE INTO employees (name) VALUES (new.employee);
+END;
+CREATE TABLE IF NOT EXISTS activity_tokens (
+    token TEXT NOT NULL,
+    id INTEGER NOT NULL,
+    PRIMARY KEY (token, id)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS cost_providers (
+    id INTEGER PRIMARY KEY,
+    provider TEXT NOT NULL UNIQUE,
+    total_monthly_estimate TEXT
+);
+CREATE TABLE IF NOT EXISTS cost_services (
+    id INTEGER PRIMARY KEY,
+    provider TEXT NOT NULL,
+    category TEXT NOT NULL,
+    name TEXT NOT NULL,
+    service TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS cost_services_provider ON cost_services (provider, category);
+"""
+
+TICKET_COLUMNS = ", ".join(TICKET_FIELDS) + ", extra"
+ACTIVITY_COLUMNS = ", ".join(ACTIVITY_FIELDS) + ", extra"
+
+UPSERT_TICKET = f"""
+INSERT INTO tickets ({TICKET_COLUMNS}, person_full, person) VALUES ({", ".join("?" * (len(TICKET_FIELDS) + 3))})
+ON CONFLICT (ticket_id) DO UPDATE SET
+    {", ".join(f"{field} = excluded.{field}" for field in TICKET_FIELDS[1:])},
+    extra = excluded.extra, person_full = excluded.person_full, person = excluded.person
+"""
+UPSERT_ACTIVITY = f"""
+INSERT INTO activities ({ACTIVITY_COLUMNS}) VALUES ({", ".join("?" * (len(ACTIVITY_FIELDS) + 1))})
+ON CONFLICT (activity_id) DO UPDATE SET
+    {", ".join(f"{field} = excluded.{field}" for field in ACTIVITY_FIELDS[1:])}, extra = excluded.extra
+"""
+
+
+def _row_values(record: dict, fields: tuple) -> list:
+    """Column values for a record; fields outside the schema go to extra as JSON"""
+    extra = {key: value for key, value in record.items() if key not in fields}
+    return [record.get(field) for field in fields] + [json.dumps(extra) if extra else None]
+
+
+def _record(row, fields: tuple) -> dict:
+    record = dict(zip(fields, row))
+    if row[len(fields)]:
+        record.update(json.loads(row[len(fields)]))
+    return record
+
+
+def _ticket_values(ticket: dict) -> list:
+    full = ticket["raised_by"].strip().lower()
+    return _row_values(ticket, TICKET_FIELDS) + [full, full.split("(")[0].strip()]
+
+
+def _token_source(tokens_table: str, table: str, tokens: list) -> tuple:
+    """(FROM clause, params) for the rows of table whose text has every token.
+
+    Joining the postings lets SQLite walk the first token's ids in order and
+    stop at the page it needs, instead of materializing the intersection.
+    """
+    joins = "".join(f" JOIN {tokens_table} k{i} ON k{i}.token = ? AND k{i}.id = k0.id" for i in range(1, len(tokens)))
+    return f"{tokens_table} k0{joins} JOIN {table} ON {table}.id = k0.id WHERE k0.token = ?", [*tokens[1:], tokens[0]]
+
+
+class SQLiteRows(Sequence):
+    """Result of one filter query, read a slice at a time.
+
+    The agents page their results, so len() is a COUNT over the index and
+    rows[a:b] fetches only that page with LIMIT/OFFSET; iterating reads the
+    whole result.
+    """
+
+    def __init__(self, backend, columns: str, fields: tuple, source: str, params=(), order: str = "id"):
+        self._backend = backend
+        self._select = f"SELECT {columns} FROM {source} ORDER BY {order}"
+        self._count = f"SELECT COUNT(*) FROM {source}"
+        self._fields = fields
+        self._params = tuple(params)
+        self._len = None
+
+    def _fetch(self, limit: int = -1, offset: int = 0) -> list:
+        rows = self._backend.connection().execute(
+            f"{self._select} LIMIT ? OFFSET ?", (*self._params, limit, offset)).fetchall()
+        return [_record(row, self._fields) for row in rows]
+
+    def __len__(self) -> int:
+        if self._len is None:
+            self._len = self._backend.connection().execute(self._count, self._params).fetchone()[0]
+        return self._len
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            start, stop, step = index.indices(len(self))
+            if step != 1:
+                return self._fetch()[index]
+            return self._fetch(max(stop - start, 0), start)
+        if index < 0:
+            index += len(self)
+        rows = self._fetch(1, index) if index >= 0 else []
+        if not rows:
+            raise IndexError("row index out of range")
+        return rows[0]
+
+    def __iter__(self):
+        return iter(self._fetch())
+
+
+class SQLiteTicketStore:
+    """TicketStore over the tickets table, returning the same ticket dicts"""
+
+    def __init__(self, backend):
+        self._backend = backend
+
+    def _query(self, where: str, params=()) -> SQLiteRows:
+        return SQLiteRows(self._backend, TICKET_COLUMNS, TICKET_FIELDS, f"tickets {where}", params)
+
+    def add(self, ticket: dict):
+        with self._backend.transaction() as conn:
+            conn.execute(UPSERT_TICKET, _ticket_values(ticket))
+            row_id = conn.execute("SELECT id FROM tickets WHERE ticket_id = ?", (ticket["ticket_id"],)).fetchone()[0]
+            conn.execute("DELETE FROM ticket_tokens WHERE id = ?", (row_id,))
+            conn.executemany("INSERT INTO ticket_tokens (token, id) VALUES (?, ?)", [
+                (token, row_id) for token in set(tokenize(f"{ticket['subject']} {ticket['description']}"))])
+
+    def __len__(self) -> int:
+        return self._backend.connection().execute("SELECT COUNT(*) FROM tickets").fetchone()[0]
+
+    def __iter__(self):
+        return iter(self._query(""))
+
+    def get(self, ticket_id: str):
+        """Ticket by ID, or None"""
+        tickets = self._query("WHERE ticket_id = ?", (ticket_id,))._fetch(1)
+        return tickets[0] if tickets else None
+
+    def by_status(self, status: str) -> list:
+        return self._query("WHERE status = ?", (status,))
+
+    def by_priority(self, priority: str) -> list:
+        return self._query("WHERE priority = ?", (priority,))
+
+    def by_raised_by(self, person: str) -> list:
+        """Tickets raised by a person, matched on full name or name without role"""
+        person = person.strip().lower()
+        return self._query("WHERE person_full = ? OR person = ?", (person, person))
+
+    def count_by_status(self, status: str) -> int:
+        return self._backend.connection().execute(
+            "SELECT COUNT(*) FROM tickets WHERE status = ?", (status,)).fetchone()[0]
+
+    def _matches(self, text: str):
+        """Rows whose subject/description contain every token of text, or None"""
+        tokens = sorted(set(tokenize(text)))
+        if not tokens:
+            return None
+        source, params = _token_source("ticket_tokens", "tickets", tokens)
+        return SQLiteRows(self._backend, TICKET_COLUMNS, TICKET_FIELDS, source, params, order="k0.id")
+
+    def search(self, text: str):
+        """All tickets whose subject/description mention every word of text"""
+        matches = self._matches(text)
+        return [] if matches is None else matches
+
+    def find(self, text: str):
+        """First ticket whose subject/description mention every word of text, or None"""
+        matches = self._matches(text)
+        tickets = [] if matches is None else matches._fetch(1)
+        return tickets[0] if tickets else None
+
+
+class SQLiteActivityStore:
+    """ActivityStore over the activities table; the Kanban board is a status query"""
+
+    def __init__(self, backend):
+        self._backend = backend
+
+    def _query(self, where: str, params=()) -> SQLiteRows:
+        return SQLiteRows(self._backend, ACTIVITY_COLUMNS, ACTIVITY_FIELDS, f"activities {where}", params)
+
+    def _reindex(self, conn, activity: dict):
+        row_id = conn.execute("SELECT id FROM activities WHERE activity_id = ?", (activity["activity_id"],)).fetchone()[0]
+        conn.execute("DELETE FROM activity_tokens WHERE id = ?", (row_id,))
+        conn.executemany("INSERT INTO activity_tokens (token, id) VALUES (?, ?)", [
+            (token, row_id) for token in set(tokenize(activity["task"]))])
+
+    def add(self, activity: dict):
+        """Add (or replace) an activity"""
+        with self._backend.transaction() as conn:
+            conn.execute(UPSERT_ACTIVITY, _row_values(activity, ACTIVITY_FIELDS))
+            self._reindex(conn, activity)
+
+    def update(self, activity_id: str, **changes) -> dict:
+        """Change fields of an activity, moving it between columns as needed"""
+        with self._backend.transaction() as conn:
+            row = conn.execute(f"SELECT {ACTIVITY_COLUMNS} FROM activities WHERE activity_id = ?", (activity_id,)).fetchone()
+            if row is None:
+                raise KeyError(activity_id)
+            activity = _record(row, ACTIVITY_FIELDS)
+            activity.update(changes)
+            conn.execute(UPSERT_ACTIVITY, _row_values(activity, ACTIVITY_FIELDS))
+            if "task" in changes:
+                self._reindex(conn, activity)
+        return activity
+
+    def __len__(self) -> int:
+        return self._backend.connection().execute("SELECT COUNT(*) FROM activities").fetchone()[0]
+
+    def __iter__(self):
+        return iter(self._query(""))
+
+    def get(self, activity_id: str):
+        activities = self._query("WHERE activity_id = ?", (activity_id,))._fetch(1)
+        return activities[0] if activities else None
+
+    def by_status(self, status: str) -> list:
+        return self._query("WHERE status = ?", (status,))
+
+    def by_priority(self, priority: str) -> list:
+        return self._query("WHERE priority = ?", (priority,))
+
+    def by_employee(self, name: str) -> list:
+        """Activities of every employee whose name contains name (case-insensitive)"""
+        name = name.strip().lower()
+        activities = self._query("WHERE employee = ?", (name,))
+        if len(activities):
+            return activities
+        # Partial names: match against the distinct employees, not every activity
+        return self._query("WHERE employee IN (SELECT name FROM employees WHERE instr(lower(name), ?) > 0)", (name,))
+
+    def find_task(self, text: str):
+        """First activity whose task mentions every word of text, or None"""
+        tokens = sorted(set(tokenize(text)))
+        if not tokens:
+            return None
+        source, params = _token_source("activity_tokens", "activities", tokens)
+        activities = SQLiteRows(self._backend, ACTIVITY_COLUMNS, ACTIVITY_FIELDS, source, params, order="k0.id")._fetch(1)
+        return activities[0] if activities else None
+
+    def kanban(self) -> dict:
+        """Kanban columns in board order, each a list of activities"""
+        return {column: self.by_status(column) for column in KANBAN_COLUMNS}
+
+    def column_counts(self) -> dict:
+        counts = dict.fromkeys(KANBAN_COLUMNS, 0)
+        counts.update(self._backend.connection().execute(
+            "SELECT status, COUNT(*) FROM activities GROUP BY status").fetchall())
+        return counts
+
+
+class MemoryBackend:
+    """Indexed in-memory stores, built from data.py unless data is given"""
+
+    name = "memory"
+    blocking = False  # queries never wait on I/O
+
+    def __init__(self, tickets=None, activities=None, costs=None):
+        if tickets is None or activities is None or costs is None:
+            from data import MOCK_TICKETS, MOCK_ACTIVITIES, INFRASTRUCTURE_COSTS
+            tickets = MOCK_TICKETS if tickets is None else tickets
+            activities = MOCK_ACTIVITIES if activities is None else activities
+            costs = INFRASTRUCTURE_COSTS if costs is None else costs
+        self.tickets = TicketStore(tickets)
+        self.activities = ActivityStore(activities)
+        self.cost_table = CostTable(costs)
+
+    def close(self):
+        pass
+
+    def stats(self) -> dict:
+        return {"backend": self.name, "tickets": len(self.tickets), "activities": len(self.activities),
+                "cost_services": len(self.cost_table)}
+
+
+class SQLiteBackend:
+    """Stores backed by a SQLite database file.
+
+    Each thread gets its own connection (WAL lets readers in every thread and
+    worker process run alongside a writer); the sqlite3 statement cache keeps
+    the fixed query strings prepared per connection. An empty database is
+    seeded from data.py unless seed is False. The cost table is small, so it
+    is read once into a CostTable.
+    """
+
+    name = "sqlite"
+    blocking = True  # queries and page renders read the database file
+
+    def __init__(self, path: str, seed: bool = True, cached_statements: int = 256):
+        self.path = path
+        self.cached_statements = cached_statements
+        self._local = threading.local()
+        self._connections = []
+        self._lock = threading.Lock()
+        conn = self.connection()
+        if path != ":memory:":
+            conn.execute("PRAGMA journal_mode = WAL")
+        conn.executescript(SCHEMA)
+        if seed:
+            self._seed()
+        self.tickets = SQLiteTicketStore(self)
+        self.activities = SQLiteActivityStore(self)
+        self.cost_table = CostTable(self.costs())
+
+    def connection(self) -> sqlite3.Connection:
+        """This thread's connection, opened on first use"""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            if self.path == ":memory:":
+                # One shared in-memory database for every thread of this backend
+                conn = sqlite3.connect(f"file:backend-{id(self)}?mode=memory&cache=shared", uri=True,
+                                       isolation_level=None, check_same_thread=False,
+                                       cached_statements=self.cached_statements)
+            else:
+                conn = sqlite3.connect(self.path, isolation_level=None, check_same_thread=False,
+                                       cached_statements=self.cached_statements, timeout=30)
+                conn.execute("PRAGMA synchronous = NORMAL")
+            self._local.conn = conn
+            with self._lock:
+                self._connections.append(conn)
+        return conn
+
+    @contextmanager
+    def transaction(self):
+        """Write transaction on this thread's connection, taken up front so
+        concurrent writers queue on the busy timeout instead of failing"""
+        conn = self.connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+
+    def _seed(self):
+        from data import MOCK_TICKETS, MOCK_ACTIVITIES, INFRASTRUCTURE_COSTS
+        with self.transaction() as conn:
+            if conn.execute("SELECT EXISTS (SELECT 1 FROM tickets)").fetchone()[0]:
+                return
+            self._load(conn, MOCK_TICKETS, MOCK_ACTIVITIES, INFRASTRUCTURE_COSTS)
+
+    def _load(self, conn, tickets=(), activities=(), costs=None):
+        conn.executemany(UPSERT_TICKET, (_ticket_values(ticket) for ticket in tickets))
+        conn.executemany(UPSERT_ACTIVITY, (_row_values(activity, ACTIVITY_FIELDS) for activity in activities))
+        # Rebuild the token tables in one pass rather than per inserted row
+        if tickets:
+            conn.execute("DELETE FROM ticket_tokens")
+            conn.executemany("INSERT INTO ticket_tokens (token, id) VALUES (?, ?)", (
+                (token, row_id)
+                for row_id, subject, description in conn.execute("SELECT id, subject, description FROM tickets").fetchall()
+                for token in set(tokenize(f"{subject} {description}"))))
+        if activities:
+            conn.execute("DELETE FROM activity_tokens")
+            conn.executemany("INSERT INTO activity_tokens (token, id) VALUES (?, ?)", (
+                (token, row_id)
+                for row_id, task in conn.execute("SELECT id, task FROM activities").fetchall()
+                for token in set(tokenize(task))))
+        for provider, data in (costs or {}).items():
+            conn.execute("INSERT INTO cost_providers (provider, total_monthly_estimate) VALUES (?, ?) "
+                         "ON CONFLICT (provider) DO UPDATE SET total_monthly_estimate = excluded.total_monthly_estimate",
+                         (provider, data.get("total_monthly_estimate")))
+            conn.execute("DELETE FROM cost_services WHERE provider = ?", (provider,))
+            conn.executemany("INSERT INTO cost_services (provider, category, name, service) VALUES (?, ?, ?, ?)", [
+                (provider, service["category"], service["name"], json.dumps(service)) for service in data["services"]])
+
+    def bulk_load(self, tickets=(), activities=(), costs=None) -> dict:
+        """Insert or replace records in one transaction; returns the counts loaded"""
+        tickets, activities = list(tickets), list(activities)
+        with self.transaction() as conn:
+            self._load(conn, tickets, activities, costs)
+        # Refresh the planner's index statistics after a large change
+        self.connection().execute("PRAGMA optimize")
+        if costs:
+            self.cost_table = CostTable(self.costs())
+        return {"tickets": len(tickets), "activities": len(activities), "cost_providers": len(costs or {})}
+
+    def costs(self) -> dict:
+        """Provider data in the INFRASTRUCTURE_COSTS shape"""
+        conn = self.connection()
+        costs = {
+            provider: {"services": [], "total_monthly_estimate": estimate}
+            for provider, estimate in conn.execute("SELECT provider, total_monthly_estimate FROM cost_providers ORDER BY id")
+        }
+        for provider, service in conn.execute("SELECT provider, service FROM cost_services ORDER BY id"):
+            costs.setdefault(provider, {"services": [], "total_monthly_estimate": ""})["services"].append(json.loads(service))
+        return costs
+
+    def close(self):
+        with self._lock:
+            for conn in self._connections:
+                conn.close()
+            self._connections.clear()
+        self._local = threading.local()
+
+    def stats(self) -> dict:
+        conn = self.connection()
+        return {
+            "backend": self.name,
+            "path": self.path,
+            "journal_mode": conn.execute("PRAGMA journal_mode").fetchone()[0],
+            "tickets": len(self.tickets),
+            "activities": len(self.activities),
+            "cost_services": len(self.cost_table),
+            "connections": len(self._connections)
+        }
+
+
+BACKENDS = {"memory": MemoryBackend, "sqlite": SQLiteBackend}
+
+
+def open_backend(name: str, path: str = "agents.db"):
+    """Backend by name: 'memory', 'sqlite' over the database at path, or
+    'snapshot' over the snapshot file at path"""
+    if name == "snapshot":
+        # Imported here because snapshot.py builds on this module
+        from snapshot import SnapshotBackend
+        return SnapshotBackend(path)
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown data backend '{name}', expected one of {', '.join(BACKENDS)}, snapshot")
+    return BACKENDS[name]() if name == "memory" else BACKENDS[name](path)
+
+
+# ==================== BULK LOADING ====================
+
+def _kind(record: dict) -> str:
+    if "ticket_id" in record:
+        return "tickets"
+    if "activity_id" in record:
+        return "activities"
+    raise ValueError(f"Can't tell whether a record is a ticket or an activity: {sorted(record)}")
+
+
+def read_export(path: str) -> dict:
+    """Records from a JSON or CSV export: {"tickets": [...], "activities": [...], "costs": {...}}.
+
+    JSON may be a list of tickets or activities, or an object with "tickets",
+    "activities" and/or "infrastructure_costs" (shaped like data.py). CSV files
+    hold tickets or activities, one per row, with the data.py field names as
+    headers.
+    """
+    loaded = {"tickets": [], "activities": [], "costs": {}}
+    with open(path, newline="", encoding="utf-8") as f:
+        if os.path.splitext(path)[1].lower() == ".csv":
+            records = [{key: value for key, value in row.items() if value != ""} for row in csv.DictReader(f)]
+        else:
+            payload = json.load(f)
+            if isinstance(payload, dict):
+                loaded["tickets"] = payload.get("tickets", [])
+                loaded["activities"] = payload.get("activities", [])
+                loaded["costs"] = payload.get("infrastructure_costs", {})
+                return loaded
+            records = payload
+    for record in records:
+        loaded[_kind(record)].append(record)
+    return loaded
+
+
+def load_exports(db_path: str, paths: list) -> dict:
+    """Bulk-load export files into the SQLite database at db_path"""
+    backend = SQLiteBackend(db_path, seed=False)
+    try:
+        totals = {"tickets": 0, "activities": 0, "cost_providers": 0}
+        for path in paths:
+            loaded = read_export(path)
+            counts = backend.bulk_load(loaded["tickets"], loaded["activities"], loaded["costs"])
+            for key, count in counts.items():
+                totals[key] += count
+        return totals
+    finally:
+        backend.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("database", help="SQLite database to create or update")
+    parser.add_argument("exports", nargs="+", help="JSON or CSV export files")
+    args = parser.parse_args()
+    print(json.dumps(load_exports(args.database, args.exports)))
@@ -0,0 +1,452 @@
+"""
+Micro-benchmarks for the graph nodes and the compiled graph.
+
+The OpenAI client is replaced by an in-process fake chat model with a fixed
+latency and canned replies, and the ticket/activity stores are rebuilt from
+synthetic datasets of each requested size. Cold-start cost (importing main,
+first use of the LLM client and graphs, per-package import time) is measured
+in fresh interpreters. Results are written as JSON so runs can be compared;
+with --baseline the run fails when a benchmark's median regresses by more
+than --threshold.
+
+Usage:
+    python benchmark.py
+    python benchmark.py --sizes 10 10000 --latency 0.05 --output bench.json
+    python benchmark.py --backends sqlite --sizes 10000
+    python benchmark.py --baseline bench.json --threshold 1.25
+"""
+
+import os
+os.environ.setdefault("OPENAI_API_KEY", "sk-benchmark")
+# Keep caches in-process so runs don't read results persisted by earlier ones
+os.environ.setdefault("SHARED_CACHE_PATH", "")
+
+import argparse
+import asyncio
+import json
+import logging
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+from langchain_core.messages import AIMessage, AIMessageChunk
+
+import main
+import news_stub
+from news_client import NewsClient, DEFAULT_NEWSDATA_URL
+from backends import SQLiteBackend
+from snapshot import SnapshotBackend, write_snapshot
+from stores import TicketStore, ActivityStore
+
+DEFAULT_SIZES = (10, 10_000, 1_000_000)
+DEFAULT_BACKENDS = ("memory", "sqlite", "snapshot")
+
+# ==================== FAKE LLM ====================
+
+ROUTER_PLAN = {
+    "agents": ["TicketAnalyzerAgent", "ActivityTrackerAgent"],
+    "intents": {
+        "TicketAnalyzerAgent": {"query_type": "filter_by_status", "filter_value": "Open", "question_type": "list"},
+        "ActivityTrackerAgent": {"query_type": "filter_by_status", "filter_value": "In Progress", "question_type": "list"}
+    }
+}
+
+# (prompt marker, reply) pairs; the first marker found in the prompt wins
+CANNED_REPLIES = [
+    ("intelligent router", json.dumps(ROUTER_PLAN)),
+    ("ticket query and extract the intent", '{"query_type": "overview", "filter_value": "", "question_type": "list"}'),
+    ("activity/task query and extract the intent", '{"query_type": "overview", "filter_value": "", "question_type": "list"}'),
+    ("cost query and extract the intent", '{"query_type": "overview", "provider": "", "question_type": "list"}'),
+    ("general query and extract the intent", '{"query_type": "general_question", "specific_topic": "", "question_type": "what"}'),
+    ("Raw data response", "There are 3 matching items."),
+    ("news aggregator", "1. **Headline** - Summary of the article. Source: Example News"),
+]
+DEFAULT_REPLY = "- Key point one\n- Key point two\n- Key point three"
+
+
+class FakeChatModel:
+    """Stand-in for ChatOpenAI: canned replies after a fixed latency"""
+
+    def __init__(self, latency: float = 0.0, replies=CANNED_REPLIES, default: str = DEFAULT_REPLY):
+        self.latency = latency
+        self.replies = list(replies)
+        self.default = default
+        self.calls = 0
+
+    def _reply(self, messages) -> str:
+        self.calls += 1
+        prompt = messages[-1].content
+        return next((reply for marker, reply in self.replies if marker in prompt), self.default)
+
+    @staticmethod
+    def _usage(messages, reply: str) -> dict:
+        # Rough whitespace token counts so the token metrics get exercised
+        prompt_tokens = sum(len(m.content.split()) for m in messages)
+        completion_tokens = len(reply.split())
+        return {"input_tokens": prompt_tokens, "output_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens}
+
+    def invoke(self, messages, **kwargs) -> AIMessage:
+        if self.latency:
+            time.sleep(self.latency)
+        reply = self._reply(messages)
+        return AIMessage(content=reply, usage_metadata=self._usage(messages, reply))
+
+    async def ainvoke(self, messages, **kwargs) -> AIMessage:
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        reply = self._reply(messages)
+        return AIMessage(content=reply, usage_metadata=self._usage(messages, reply))
+
+    async def astream(self, messages, **kwargs):
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        for word in self._reply(messages).split(" "):
+            yield AIMessageChunk(content=word + " ")
+
+
+# ==================== SYNTHETIC DATA ====================
+
+FIRST_NAMES = ["Priya", "Arun", "Kavya", "Rahul", "Meena", "John", "Sara", "Vikram", "Divya", "Karthik",
+               "Anita", "Ravi", "Deepa", "Suresh", "Lakshmi", "Ganesh", "Nisha", "Manoj", "Pooja", "Ajay"]
+LAST_NAMES = ["Kumar", "Sharma", "Iyer", "Nair", "Reddy", "Das", "Menon", "Rao", "Pillai", "Singh"]
+ROLES = ["Coach", "Player", "Parent", "Employee"]
+CATEGORIES = ["IT Support", "Facilities", "Training", "Billing", "Equipment", "Scheduling"]
+SUBJECT_WORDS = ["laptop", "wifi", "projector", "invoice", "schedule", "printer", "access", "email",
+                 "equipment", "payment", "session", "login", "network", "refund", "booking", "camera"]
+TASK_WORDS = ["implement", "design", "review", "update", "migrate", "test", "document", "deploy",
+              "authentication", "dashboard", "api", "database", "reports", "onboarding", "billing", "search"]
+TICKET_STATUSES = ["Open", "In Progress", "Resolved"]
+ACTIVITY_STATUSES = ["To Do", "In Progress", "Completed"]
+PRIORITIES = ["High", "Medium", "Low"]
+
+
+def synthetic_tickets(n: int, seed: int = 7) -> list:
+    rng = random.Random(seed)
+    return [{
+        "ticket_id": f"TKT-{i:03d}",
+        "raised_by": f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)} ({rng.choice(ROLES)})",
+        "category": rng.choice(CATEGORIES),
+        "subject": " ".join(rng.sample(SUBJECT_WORDS, 3)).capitalize(),
+        "description": " ".join(rng.sample(SUBJECT_WORDS, 6)),
+        "status": rng.choice(TICKET_STATUSES),
+        "priority": rng.choice(PRIORITIES),
+        "created_at": f"2025-12-{rng.randint(1, 28):02d} {rng.randint(0, 23):02d}:00:00"
+    } for i in range(1, n + 1)]
+
+
+def synthetic_activities(n: int, seed: int = 11) -> list:
+    rng = random.Random(seed)
+    activities = []
+    for i in range(1, n + 1):
+        status = rng.choice(ACTIVITY_STATUSES)
+        activities.append({
+            "activity_id": f"ACT-{i:03d}",
+            "employee": f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}",
+            "task": " ".join(rng.sample(TASK_WORDS, 3)).capitalize(),
+            "status": status,
+            "priority": rng.choice(PRIORITIES),
+            "start_date": f"2025-12-{rng.randint(1, 14):02d}",
+            "due_date": f"2025-12-{rng.randint(15, 28):02d}",
+            "progress": "100%" if status == "Completed" else f"{rng.randint(0, 9) * 10}%"
+        })
+    return activities
+
+
+# ==================== RUNNER ====================
+
+def measure(fn, min_time: float = 0.2, min_iters: int = 3, max_iters: int = 10_000) -> dict:
+    """Call fn repeatedly for at least min_time seconds and summarize the timings"""
+    timings = []
+    deadline = time.perf_counter() + min_time
+    while len(timings) < max_iters and (len(timings) < min_iters or time.perf_counter() < deadline):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return summarize(timings)
+
+
+def summarize(timings: list) -> dict:
+    timings = sorted(timings)
+    return {
+        "iterations": len(timings),
+        "mean_s": statistics.fmean(timings),
+        "median_s": statistics.median(timings),
+        "p95_s": timings[min(len(timings) - 1, int(len(timings) * 0.95))],
+        "min_s": timings[0],
+        "max_s": timings[-1]
+    }
+
+
+def state(user_input: str, intents: dict = None, **extra) -> dict:
+    """Graph state for a node benchmark, optionally with router-planned intents"""
+    return {**main.new_state(user_input), "agent_intents": intents or {}, **extra}
+
+
+def cold(caches, fn):
+    """Wrap fn so every run starts with empty caches (one cache or a tuple)"""
+    caches = caches if isinstance(caches, tuple) else (caches,)
+
+    def run():
+        for cache in caches:
+            cache.clear()
+        return fn()
+    return run
+
+
+# Caches of generated text, cleared for benchmarks that measure the model path
+LLM_CACHES = (main.intent_cache, main.answer_cache)
+
+
+# Cold-start probe run in a fresh interpreter: importing main, then the first
+# use of the lazily built LLM client and graphs
+STARTUP_PROBE = """
+import json, time
+start = time.perf_counter()
+import main
+timings = {"import_main": time.perf_counter() - start}
+start = time.perf_counter()
+main.get_llm()
+timings["first_get_llm"] = time.perf_counter() - start
+for name in main.GRAPH_VARIANTS:
+    start = time.perf_counter()
+    main.get_graph(name)
+    timings["first_get_graph/" + name] = time.perf_counter() - start
+print(json.dumps(timings))
+"""
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+
+def startup_timings(runs: int = 3) -> dict:
+    """Cold-start step name -> timings over fresh interpreter runs"""
+    timings = {}
+    for _ in range(runs):
+        probe = subprocess.run([sys.executable, "-c", STARTUP_PROBE], cwd=HERE,
+                               capture_output=True, text=True, check=True)
+        for step, seconds in json.loads(probe.stdout.strip().splitlines()[-1]).items():
+            timings.setdefault(step, []).append(seconds)
+    return timings
+
+
+def import_breakdown(top: int = 15) -> dict:
+    """Seconds spent importing each top-level package for `import main` (python -X importtime)"""
+    probe = subprocess.run([sys.executable, "-X", "importtime", "-c", "import main"], cwd=HERE,
+                           capture_output=True, text=True, check=True)
+    per_package = {}
+    for line in probe.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, _, module = line[len("import time:"):].split("|")
+        package = module.strip().split(".")[0]
+        per_package[package] = per_package.get(package, 0) + int(self_us) / 1e6
+    ranked = sorted(per_package.items(), key=lambda item: item[1], reverse=True)
+    return {package: round(seconds, 4) for package, seconds in ranked[:top]}
+
+
+def fixed_benchmarks() -> list:
+    """Benchmarks that don't depend on the dataset size"""
+    short_text = "\n".join(f"line {i}" for i in range(5))
+    long_text = "\n".join(f"line {i}" for i in range(1000))
+    one_agent = state("show open tickets", agents_to_run=["TicketAnalyzerAgent"])
+    all_agents = state("full overview", agents_to_run=[
+        "TicketAnalyzerAgent", "NewsAggregatorAgent", "ActivityTrackerAgent", "InfrastructureCostMonitorAgent"])
+    multi_responses = {"ticket_analyzer": long_text, "activity_tracker": short_text}
+
+    return [
+        ("limit_response/short", lambda: main.limit_response(short_text)),
+        ("limit_response/1000_lines", lambda: main.limit_response(long_text)),
+        ("should_continue/one_agent", lambda: main.should_continue(one_agent)),
+        ("should_continue/all_agents", lambda: main.should_continue(all_agents)),
+        ("router_node/overview_keywords", lambda: main.router_node(state("give me a full overview"))),
+        ("router_node/planning_call", cold(main.router_cache, lambda: main.router_node(state("open tickets and tasks")))),
+        ("router_node/cached_plan", lambda: main.router_node(state("open tickets and tasks"))),
+        ("news_aggregator_node/generation", cold(main.news_cache, lambda: main.news_aggregator_node(state("latest AI news")))),
+        ("news_aggregator_node/cached", lambda: main.news_aggregator_node(state("latest AI news"))),
+        ("infrastructure_cost_monitor_node/cheapest", lambda: main.infrastructure_cost_monitor_node(state("cheapest database"))),
+        ("infrastructure_cost_monitor_node/compare", lambda: main.infrastructure_cost_monitor_node(state("compare AWS vs Azure"))),
+        ("infrastructure_cost_monitor_node/overview", lambda: main.infrastructure_cost_monitor_node(state("show infrastructure costs"))),
+        ("chat_node/greeting", cold(LLM_CACHES, lambda: main.chat_node(state("hello")))),
+        ("chat_node/company_fact", lambda: main.chat_node(state("where is the company located"))),
+        ("chat_node/company_open_ended", cold(LLM_CACHES, lambda: main.chat_node(state("why should I pick your bootcamps")))),
+        ("chat_node/llm_intent", cold(LLM_CACHES, lambda: main.chat_node(state("tell me something interesting")))),
+        ("chat_node/cached_answer", lambda: main.chat_node(state("tell me something interesting"))),
+        ("summarize_node/single_agent", lambda: main.summarize_node(state("open tickets", agent_responses={"ticket_analyzer": short_text}))),
+        ("summarize_node/multi_agent", cold(LLM_CACHES, lambda: main.summarize_node(state("open tickets and tasks", agent_responses=multi_responses)))),
+    ]
+
+
+def news_benchmarks() -> list:
+    """NewsClient against the in-process stub API, and the news node fetching through it"""
+    cached = NewsClient(DEFAULT_NEWSDATA_URL, "stub", transport=news_stub.transport())
+    revalidated = NewsClient(DEFAULT_NEWSDATA_URL, "stub", ttl=0, transport=news_stub.transport())
+    revalidated.fetch("artificial intelligence")
+
+    def with_client(fn):
+        def run():
+            previous, main.news_client = main.news_client, cached
+            try:
+                return fn()
+            finally:
+                main.news_client = previous
+        return run
+
+    return [
+        ("news_client/fetch", cold(cached, lambda: cached.fetch("artificial intelligence"))),
+        ("news_client/cached", lambda: cached.fetch("artificial intelligence")),
+        ("news_client/not_modified", lambda: revalidated.fetch("artificial intelligence")),
+        ("news_aggregator_node/summarize_fetched",
+         cold(main.news_cache, with_client(lambda: main.news_aggregator_node(state("latest AI news"))))),
+        ("news_aggregator_node/fetched_cached", with_client(lambda: main.news_aggregator_node(state("latest AI news")))),
+    ]
+
+
+def sized_benchmarks(size: int) -> list:
+    """Benchmarks over the synthetic ticket and activity stores"""
+    last_ticket = f"TKT-{size:03d}"
+    overview = {"query_type": "overview", "filter_value": "", "question_type": "list"}
+
+    return [
+        ("ticket_analyzer_node/specific_ticket", lambda: main.ticket_analyzer_node(state(f"show {last_ticket}"))),
+        ("ticket_analyzer_node/filter_by_status", lambda: main.ticket_analyzer_node(state("show open tickets"))),
+        ("ticket_analyzer_node/filter_by_priority", lambda: main.ticket_analyzer_node(state("list high priority tickets"))),
+        ("ticket_analyzer_node/who_raised", cold(LLM_CACHES, lambda: main.ticket_analyzer_node(state("who raised the laptop wifi ticket")))),
+        ("ticket_analyzer_node/overview", lambda: main.ticket_analyzer_node(state("tickets", {"ticket_analyzer": overview}))),
+        ("activity_tracker_node/filter_by_status", lambda: main.activity_tracker_node(state("show in progress tasks"))),
+        ("activity_tracker_node/filter_by_employee", lambda: main.activity_tracker_node(state("show activities for Priya"))),
+        ("activity_tracker_node/who_assigned", cold(LLM_CACHES, lambda: main.activity_tracker_node(state("who is working on deploy dashboard")))),
+        ("activity_tracker_node/overview", lambda: main.activity_tracker_node(state("show the kanban board"))),
+        ("graph/single_agent", cold((main.router_cache, *LLM_CACHES), lambda: main.graph.invoke(state("show open tickets")))),
+        ("graph/overview", cold((main.news_cache, *LLM_CACHES), lambda: main.graph.invoke(state("give me a full overview")))),
+        ("async_graph/overview", cold((main.news_cache, *LLM_CACHES), lambda: asyncio.run(main.async_graph.ainvoke(state("give me a full overview"))))),
+    ]
+
+
+def build_stores(backend: str, size: int, directory: str):
+    """Point main at ticket/activity stores of the given backend holding size synthetic rows"""
+    tickets, activities = synthetic_tickets(size), synthetic_activities(size)
+    if backend == "memory":
+        main.ticket_store = TicketStore(tickets)
+        main.activity_store = ActivityStore(activities)
+        return None
+    if backend == "snapshot":
+        path = os.path.join(directory, f"bench-{size}.snap")
+        write_snapshot(path, tickets, activities)
+        database = SnapshotBackend(path)
+    else:
+        database = SQLiteBackend(os.path.join(directory, f"bench-{size}.db"), seed=False)
+        database.bulk_load(tickets, activities)
+    main.ticket_store, main.activity_store = database.tickets, database.activities
+    return database
+
+
+def check_cost_rankings(table):
+    """Fail fast if cheapest/most expensive disagree with a category's public ranking"""
+    cheapest, most_expensive = table.cheapest(), table.most_expensive()
+    for category in table.categories:
+        ranked = table.ranking(category)
+        if not ranked:
+            continue
+        if (cheapest[category], most_expensive[category]) != (ranked[0], ranked[-1]) or \
+                (len(ranked) > 1 and ranked[0] == ranked[-1]):
+            raise SystemExit(f"Cost ranking check failed for {category}")
+
+
+def run(sizes, latency: float, min_time: float, backends=DEFAULT_BACKENDS) -> dict:
+    check_cost_rankings(main.cost_table)
+    main.llm = FakeChatModel(latency=latency)
+    results = []
+
+    def record(name, size, stats):
+        results.append({"name": name, "size": size, **stats})
+        size_label = "-" if size is None else f"{size:,}"
+        print(f"{name:<48} {size_label:>10} {stats['median_s'] * 1e6:>14,.1f} us  ({stats['iterations']} runs)")
+
+    print(f"{'benchmark':<48} {'size':>10} {'median':>17}")
+    for step, timings in startup_timings().items():
+        record(f"startup/{step}", None, summarize(timings))
+    breakdown = import_breakdown()
+
+    for name, fn in fixed_benchmarks() + news_benchmarks():
+        record(name, None, measure(fn, min_time=min_time))
+
+    # Memory results keep their plain names; other backends are prefixed
+    with tempfile.TemporaryDirectory() as directory:
+        for backend in backends:
+            prefix = "" if backend == "memory" else f"{backend}:"
+            for size in sizes:
+                start = time.perf_counter()
+                database = build_stores(backend, size, directory)
+                build = time.perf_counter() - start
+                record(f"{prefix}stores/build", size, summarize([build]))
+                for name, fn in sized_benchmarks(size):
+                    record(prefix + name, size, measure(fn, min_time=min_time))
+                if database is not None:
+                    database.close()
+
+    return {
+        "meta": {
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+            "llm_latency_s": latency,
+            "sizes": list(sizes),
+            "backends": list(backends),
+            "llm_calls": main.llm.calls
+        },
+        "import_breakdown_s": breakdown,
+        "results": results
+    }
+
+
+def compare(report: dict, baseline: dict, threshold: float) -> list:
+    """Benchmarks whose median grew by more than threshold times the baseline"""
+    previous = {(r["name"], r["size"]): r["median_s"] for r in baseline["results"]}
+    regressions = []
+    for result in report["results"]:
+        before = previous.get((result["name"], result["size"]))
+        if before and result["median_s"] / before > threshold:
+            regressions.append((result["name"], result["size"], before, result["median_s"]))
+    return regressions
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(DEFAULT_SIZES),
+                        help="synthetic ticket/activity counts (default: 10 10000 1000000)")
+    parser.add_argument("--backends", nargs="+", choices=DEFAULT_BACKENDS, default=list(DEFAULT_BACKENDS),
+                        help="data backends to run the sized benchmarks against (default: memory sqlite snapshot)")
+    parser.add_argument("--latency", type=float, default=0.0, help="fake LLM latency per call in seconds")
+    parser.add_argument("--min-time", type=float, default=0.2, help="minimum seconds spent on each benchmark")
+    parser.add_argument("--output", default="benchmark_results.json", help="where to write the JSON results")
+    parser.add_argument("--baseline", help="previous results file to check for regressions")
+    parser.add_argument("--threshold", type=float, default=1.25, help="allowed median slowdown vs the baseline")
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+    report = run(args.sizes, args.latency, args.min_time, args.backends)
+
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print("\nSlowest imports for `import main`:")
+    for package, seconds in report["import_breakdown_s"].items():
+        print(f"  {package:<30} {seconds * 1e3:>10,.1f} ms")
+    print(f"\nResults written to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(report, json.load(f), args.threshold)
+        for name, size, before, after in regressions:
+            print(f"REGRESSION {name} (size {size}): {before * 1e6:,.1f} us -> {after * 1e6:,.1f} us")
+        if regressions:
+            sys.exit(1)
+        print(f"No regressions beyond {args.threshold}x of {args.baseline}")
+
+
+if __name__ == "__main__":
+    main_cli()
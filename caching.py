@@ -0,0 +1,541 @@
+"""
+Caching helpers for the Multi-Agent System
+"""
+
+import asyncio
+import atexit
+import json
+import logging
+import os
+import queue
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+
+
+def normalize_query(text: str) -> str:
+    """Normalize a user query so trivially different phrasings share a cache key"""
+    text = re.sub(r"['’]", "", text.lower())
+    text = re.sub(r"[^\w\s-]", " ", text)
+    return " ".join(text.split())
+
+
+class TTLCache:
+    """Bounded LRU cache whose entries expire ttl seconds after being stored.
+
+    get_or_compute/aget_or_compute add single-flight loading: concurrent
+    misses for the same key share one computation instead of each running it.
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 3600.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self._inflight = {}
+        self._ainflight = {}
+        self.hits = 0
+        self.misses = 0
+        self.shared = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def _lookup(self, key) -> tuple:
+        """(found, value) for a key; the caller holds the lock"""
+        entry = self._data.get(key)
+        if entry is None:
+            return False, None
+        value, expires_at = entry
+        if expires_at <= time.monotonic():
+            del self._data[key]
+            self.expirations += 1
+            return False, None
+        self._data.move_to_end(key)
+        return True, value
+
+    def get(self, key, default=None):
+        """Return the cached value, or default on a miss or expired entry"""
+        with self._lock:
+            found, value = self._lookup(key)
+            if not found:
+                self.misses += 1
+                return default
+            self.hits += 1
+            return value
+
+    def __contains__(self, key) -> bool:
+        """Whether a live entry exists, without counting a hit or miss"""
+        with self._lock:
+            return self._lookup(key)[0]
+
+    def _put(self, key, value, expires_at: float):
+        """Store an entry, evicting the least recently used when full; lock held"""
+        self._data[key] = (value, expires_at)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+            self.evictions += 1
+
+    def set(self, key, value):
+        """Store a value, evicting the least recently used entries when full"""
+        with self._lock:
+            self._put(key, value, time.monotonic() + self.ttl)
+
+    def get_or_compute(self, key, compute):
+        """Cached value for key, calling compute() on a miss.
+
+        Threads missing the same key while it is being computed wait for
+        that result. Failures are not cached; a waiter retries instead.
+        """
+        while True:
+            with self._lock:
+                found, value = self._lookup(key)
+                if found:
+                    self.hits += 1
+                    return value
+                event = self._inflight.get(key)
+                owner = event is None
+                if owner:
+                    event = self._inflight[key] = threading.Event()
+                    self.misses += 1
+                else:
+                    self.shared += 1
+            if not owner:
+                event.wait()
+                continue
+            try:
+                return self._fill(key, compute)
+            finally:
+                with self._lock:
+                    self._inflight.pop(key, None)
+                event.set()
+
+    async def aget_or_compute(self, key, compute):
+        """Async get_or_compute: compute is a coroutine function"""
+        while True:
+            with self._lock:
+                found, value = self._lookup(key)
+                if found:
+                    self.hits += 1
+                    return value
+                future = self._ainflight.get(key)
+                owner = future is None
+                if owner:
+                    future = self._ainflight[key] = asyncio.get_running_loop().create_future()
+                    self.misses += 1
+                else:
+                    self.shared += 1
+            if not owner:
+                await asyncio.shield(future)
+                continue
+            try:
+                return await self._afill(key, compute)
+            finally:
+                with self._lock:
+                    self._ainflight.pop(key, None)
+                if not future.done():
+                    future.set_result(None)
+
+    def _fill(self, key, compute):
+        """Value for a key that missed, computed and stored; called without the lock"""
+        value = compute()
+        self.set(key, value)
+        return value
+
+    async def _afill(self, key, compute):
+        value = await compute()
+        self.set(key, value)
+        return value
+
+    def pop(self, key, default=None):
+        with self._lock:
+            entry = self._data.pop(key, None)
+            return default if entry is None else entry[0]
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "ttl": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+            "shared_inflight": self.shared,
+            "evictions": self.evictions,
+            "expirations": self.expirations
+        }
+
+
+SHARED_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    namespace TEXT NOT NULL,
+    key TEXT NOT NULL,
+    value TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    expires_at REAL NOT NULL,
+    accessed_at REAL NOT NULL,
+    PRIMARY KEY (namespace, key)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS entries_accessed_at ON entries (accessed_at);
+CREATE INDEX IF NOT EXISTS entries_expires_at ON entries (expires_at);
+CREATE TABLE IF NOT EXISTS counters (
+    namespace TEXT NOT NULL,
+    name TEXT NOT NULL,
+    value INTEGER NOT NULL,
+    PRIMARY KEY (namespace, name)
+) WITHOUT ROWID;
+"""
+
+
+class SharedStore:
+    """Cache entries in a SQLite file shared by every worker process on the host.
+
+    Entries live in namespaces, hold JSON values, and expire by wall-clock
+    time. When the stored values grow past max_bytes, the least recently
+    read entries are evicted (reads refresh an entry's access time at most
+    every touch_interval seconds). The file is opened on first use.
+
+    Only reads run in the caller's thread. Writes, access-time touches,
+    counter updates and pruning are queued to one writer thread per
+    process, which applies them in batched transactions, so a caller never
+    waits for another worker's write lock. Any database error is logged
+    and treated as a miss, so the shared tier can never fail a request.
+    """
+
+    WRITE_BATCH = 256
+
+    def __init__(self, path: str, max_bytes: int = 256 * 2**20, touch_interval: float = 30.0,
+                 prune_interval: float = 5.0, timeout: float = 1.0):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.touch_interval = touch_interval
+        self.prune_interval = prune_interval
+        self.timeout = timeout
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._ready_pid = None
+        self._writer_pid = None
+        self._queue = None
+        self._thread = None
+        self._pruned_at = 0.0
+        self.errors = 0
+        self.evictions = 0
+
+    def _connection(self) -> sqlite3.Connection:
+        """This thread's connection; reopened in a forked child"""
+        conn = getattr(self._local, "conn", None)
+        if conn is None or self._local.pid != os.getpid():
+            if self._ready_pid != os.getpid():
+                with self._lock:
+                    if self._ready_pid != os.getpid():
+                        setup = sqlite3.connect(self.path, isolation_level=None, timeout=self.timeout)
+                        setup.execute("PRAGMA journal_mode = WAL")
+                        setup.executescript(SHARED_SCHEMA)
+                        setup.close()
+                        self._ready_pid = os.getpid()
+            conn = sqlite3.connect(self.path, isolation_level=None, check_same_thread=False, timeout=self.timeout)
+            conn.execute("PRAGMA synchronous = NORMAL")
+            self._local.conn, self._local.pid = conn, os.getpid()
+        return conn
+
+    def _failed(self, action: str, e: Exception):
+        self.errors += 1
+        logging.warning(f"Shared cache {action} failed: {e}")
+
+    @staticmethod
+    def encode_key(key) -> str:
+        return json.dumps(key, separators=(",", ":"), default=str)
+
+    # ---- writer thread ----
+
+    def _enqueue(self, sql: str, params: tuple):
+        if self._writer_pid != os.getpid():
+            with self._lock:
+                if self._writer_pid != os.getpid():
+                    self._queue = queue.Queue()
+                    self._thread = threading.Thread(target=self._write_loop, args=(self._queue,),
+                                                    name="shared-cache-writer", daemon=True)
+                    self._thread.start()
+                    self._writer_pid = os.getpid()
+                    atexit.register(self.close)
+        self._queue.put((sql, params))
+
+    def _write_loop(self, pending: "queue.Queue"):
+        while True:
+            batch = [pending.get()]
+            while len(batch) < self.WRITE_BATCH and batch[-1] is not None:
+                try:
+                    batch.append(pending.get_nowait())
+                except queue.Empty:
+                    break
+            stop = batch[-1] is None
+            writes = batch[:-1] if stop else batch
+            try:
+                if writes:
+                    self._apply(writes)
+                if time.monotonic() - self._pruned_at > self.prune_interval:
+                    self._pruned_at = time.monotonic()
+                    self.prune()
+            except (sqlite3.Error, ValueError) as e:
+                self._failed("write", e)
+            finally:
+                for _ in batch:
+                    pending.task_done()
+            if stop:
+                return
+
+    def _apply(self, writes: list):
+        conn = self._connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            for sql, params in writes:
+                conn.execute(sql, params)
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+
+    def flush(self):
+        """Wait until this process's queued writes are applied"""
+        if self._writer_pid == os.getpid():
+            self._queue.join()
+
+    def close(self):
+        """Apply queued writes and stop the writer thread"""
+        if self._writer_pid == os.getpid():
+            self._queue.put(None)
+            self._thread.join()
+            self._writer_pid = None
+
+    # ---- entries ----
+
+    def get(self, namespace: str, key) -> tuple:
+        """(found, value, seconds left) for a live entry"""
+        now = time.time()
+        encoded_key = self.encode_key(key)
+        try:
+            row = self._connection().execute(
+                "SELECT value, expires_at, accessed_at FROM entries WHERE namespace = ? AND key = ?",
+                (namespace, encoded_key)).fetchone()
+            if row is None or row[1] <= now:
+                return False, None, 0.0
+            value = json.loads(row[0])
+        except (sqlite3.Error, ValueError) as e:
+            self._failed("read", e)
+            return False, None, 0.0
+        if now - row[2] > self.touch_interval:
+            self._enqueue("UPDATE entries SET accessed_at = ? WHERE namespace = ? AND key = ?",
+                          (now, namespace, encoded_key))
+        return True, value, row[1] - now
+
+    def set(self, namespace: str, key, value, ttl: float):
+        try:
+            encoded = json.dumps(value)
+        except (TypeError, ValueError):
+            return  # Not shareable; the local tier still has it
+        now = time.time()
+        self._enqueue(
+            "INSERT OR REPLACE INTO entries (namespace, key, value, size, expires_at, accessed_at) VALUES (?, ?, ?, ?, ?, ?)",
+            (namespace, self.encode_key(key), encoded, len(encoded), now + ttl, now))
+
+    def delete(self, namespace: str, key):
+        self._enqueue("DELETE FROM entries WHERE namespace = ? AND key = ?", (namespace, self.encode_key(key)))
+
+    def clear(self, namespace: str):
+        self._enqueue("DELETE FROM entries WHERE namespace = ?", (namespace,))
+
+    def add_counters(self, namespace: str, deltas: dict):
+        """Add this worker's new hits/misses to the namespace's shared totals"""
+        for name, value in deltas.items():
+            if value:
+                self._enqueue("INSERT INTO counters (namespace, name, value) VALUES (?, ?, ?) "
+                              "ON CONFLICT (namespace, name) DO UPDATE SET value = value + excluded.value",
+                              (namespace, name, value))
+
+    def prune(self):
+        """Drop expired entries, then the least recently read ones while over max_bytes"""
+        conn = self._connection()
+        conn.execute("DELETE FROM entries WHERE expires_at <= ?", (time.time(),))
+        excess = conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0] - self.max_bytes
+        if excess <= 0:
+            return
+        # Free a tenth more than needed so the next writes don't prune again
+        target = excess + self.max_bytes // 10
+        freed = 0
+        victims = []
+        for namespace, key, size in conn.execute("SELECT namespace, key, size FROM entries ORDER BY accessed_at"):
+            victims.append((namespace, key))
+            freed += size
+            if freed >= target:
+                break
+        conn.executemany("DELETE FROM entries WHERE namespace = ? AND key = ?", victims)
+        self.evictions += len(victims)
+
+    def stats(self) -> dict:
+        """Entries, bytes and hit/miss totals per namespace, across all workers (reads the file)"""
+        try:
+            conn = self._connection()
+            namespaces = {
+                namespace: {"entries": entries, "bytes": size}
+                for namespace, entries, size in conn.execute(
+                    "SELECT namespace, COUNT(*), SUM(size) FROM entries WHERE expires_at > ? GROUP BY namespace",
+                    (time.time(),))
+            }
+            for namespace, name, value in conn.execute("SELECT namespace, name, value FROM counters"):
+                namespaces.setdefault(namespace, {"entries": 0, "bytes": 0})[name] = value
+        except sqlite3.Error as e:
+            self._failed("stats", e)
+            namespaces = {}
+        for counters in namespaces.values():
+            lookups = counters.get("hits", 0) + counters.get("misses", 0)
+            counters["hit_rate"] = round(counters.get("hits", 0) / lookups, 3) if lookups else 0.0
+        return {"path": self.path, "max_bytes": self.max_bytes, "evictions": self.evictions,
+                "errors": self.errors, "pending_writes": self._queue.qsize() if self._queue is not None else 0,
+                "namespaces": namespaces}
+
+
+class SharedCache(TTLCache):
+    """TTLCache with a SharedStore namespace behind it.
+
+    A local miss falls through to the shared store, so a value computed by
+    any worker is a hit in all of them; a hit there is copied into the
+    local LRU until the shared entry expires. Sets write through. The store
+    is only read outside the cache lock, from an executor thread in
+    aget_or_compute, and its writes are queued, so neither other threads
+    nor the event loop wait on the file. Single-flight loading still only
+    spans one process, and `in` only checks the local LRU. Without a store
+    it is a plain TTLCache.
+    """
+
+    COUNTERS = ("hits", "misses", "shared_hits")
+    FLUSH_INTERVAL = 5.0
+
+    def __init__(self, store: Optional["SharedStore"], namespace: str, maxsize: int = 1024, ttl: float = 3600.0):
+        super().__init__(maxsize, ttl)
+        self.store = store
+        self.namespace = namespace
+        self.shared_hits = 0
+        self._flushed = dict.fromkeys(self.COUNTERS, 0)
+        self._flushed_at = time.monotonic()
+
+    def _flush_counters(self, force: bool = False):
+        """Queue counter increments since the last flush to the store"""
+        with self._lock:
+            if not force and time.monotonic() - self._flushed_at < self.FLUSH_INTERVAL:
+                return
+            deltas = {name: getattr(self, name) - self._flushed[name] for name in self.COUNTERS}
+            self._flushed = {name: getattr(self, name) for name in self.COUNTERS}
+            self._flushed_at = time.monotonic()
+        self.store.add_counters(self.namespace, deltas)
+
+    def _shared_hit(self, key, value, remaining: float, counted_miss: bool):
+        """Copy a shared entry into the local LRU and count the lookup as a hit"""
+        with self._lock:
+            self._put(key, value, time.monotonic() + min(remaining, self.ttl))
+            self.shared_hits += 1
+            self.hits += 1
+            if counted_miss:
+                self.misses -= 1
+
+    def get(self, key, default=None):
+        if self.store is None:
+            return super().get(key, default)
+        with self._lock:
+            found, value = self._lookup(key)
+            if found:
+                self.hits += 1
+                return value
+        found, value, remaining = self.store.get(self.namespace, key)
+        if found:
+            self._shared_hit(key, value, remaining, counted_miss=False)
+        else:
+            with self._lock:
+                self.misses += 1
+        self._flush_counters()
+        return value if found else default
+
+    def _fill(self, key, compute):
+        if self.store is None:
+            return super()._fill(key, compute)
+        found, value, remaining = self.store.get(self.namespace, key)
+        self._flush_counters()
+        if found:
+            self._shared_hit(key, value, remaining, counted_miss=True)
+            return value
+        return super()._fill(key, compute)
+
+    async def _afill(self, key, compute):
+        if self.store is None:
+            return await super()._afill(key, compute)
+        found, value, remaining = await asyncio.get_running_loop().run_in_executor(
+            None, self.store.get, self.namespace, key)
+        self._flush_counters()
+        if found:
+            self._shared_hit(key, value, remaining, counted_miss=True)
+            return value
+        return await super()._afill(key, compute)
+
+    def set(self, key, value):
+        super().set(key, value)
+        if self.store is not None:
+            self.store.set(self.namespace, key, value, self.ttl)
+
+    def pop(self, key, default=None):
+        if self.store is not None:
+            self.store.delete(self.namespace, key)
+        return super().pop(key, default)
+
+    def clear(self):
+        super().clear()
+        if self.store is not None:
+            self.store.clear(self.namespace)
+
+    def stats(self) -> dict:
+        stats = super().stats()
+        if self.store is not None:
+            self._flush_counters(force=True)
+            stats["shared_hits"] = self.shared_hits
+        return stats
+
+
+class RequestCoalescer:
+    """Shares one in-flight execution between identical concurrent requests.
+
+    The shared task is shielded, so a caller that disconnects doesn't cancel
+    the run the other callers are waiting on.
+    """
+
+    def __init__(self):
+        self._inflight = {}
+        self.executions = 0
+        self.coalesced = 0
+
+    async def run(self, key, compute):
+        """Await the in-flight run for key, or start compute() as the run"""
+        task = self._inflight.get(key)
+        if task is not None:
+            self.coalesced += 1
+        else:
+            task = asyncio.ensure_future(compute())
+            self._inflight[key] = task
+            self.executions += 1
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        return await asyncio.shield(task)
+
+    def stats(self) -> dict:
+        return {
+            "executions": self.executions,
+            "coalesced": self.coalesced,
+            "in_flight": len(self._inflight)
+        }
@@ -0,0 +1,256 @@
+"""
+Rule-based intent engine for the agent nodes.
+
+Classifies common ticket, activity, cost and chat queries locally with a
+confidence score, so the per-agent intent LLM call is only needed when the
+rules are not sure.
+"""
+
+import re
+import threading
+from typing import NamedTuple
+
+
+class Intent(NamedTuple):
+    """Intent extracted from a user query"""
+    query_type: str
+    filter_value: str
+    question_type: str
+    confidence: float
+
+    def to_json(self, agent: str) -> dict:
+        """Intent in the same JSON shape the agent's LLM intent prompt returns"""
+        return {
+            "query_type": self.query_type,
+            FILTER_FIELDS.get(agent, "filter_value"): self.filter_value,
+            "question_type": self.question_type
+        }
+
+
+# Agents whose intent JSON names the filter field differently
+FILTER_FIELDS = {
+    "infrastructure_cost_monitor": "provider",
+    "chat": "specific_topic"
+}
+
+# Confidence levels used by the rules below
+EXACT = 0.95
+STRONG = 0.9
+LIKELY = 0.85
+WEAK = 0.5
+UNKNOWN = 0.3
+
+COUNT_PATTERN = re.compile(r'\b(how many|count|number of|total)\b', re.IGNORECASE)
+
+PROVIDER_KEYWORDS = {
+    'aws': 'AWS',
+    'amazon': 'AWS',
+    'azure': 'Azure',
+    'microsoft': 'Azure',
+    'google': 'Google Cloud',
+    'gcp': 'Google Cloud',
+    'firebase': 'Firebase',
+    'digitalocean': 'DigitalOcean',
+    'ocean': 'DigitalOcean',
+    'vercel': 'Vercel',
+    'heroku': 'Heroku'
+}
+
+COMPANY_TOPICS = [
+    ("location", r'\b(where|located|location|headquarter(?:s|ed)?|based|office)\b'),
+    ("founded", r'\b(founded|established|started|since when)\b'),
+    ("services", r'\b(services?|offer(?:ings?)?|programs?|bootcamps?)\b'),
+    ("team", r'\b(team|employees|staff|coaches|people work)\b'),
+    ("mission", r'\bmission\b'),
+    ("vision", r'\bvision\b'),
+    ("values", r'\bvalues\b'),
+    ("clients", r'\b(clients|customers)\b'),
+    ("industries", r'\b(industr(?:y|ies)|sectors?)\b')
+]
+
+
+def _list_or_count(user_input: str) -> str:
+    return "count" if COUNT_PATTERN.search(user_input) else "list"
+
+
+def _wh_word(user_input: str, default: str) -> str:
+    match = re.match(r'\s*(what|who|where|when|how|why)\b', user_input, re.IGNORECASE)
+    return match.group(1).lower() if match else default
+
+
+def classify_ticket(user_input: str) -> Intent:
+    """Classify a ticket query"""
+    ticket_id = re.search(r'(TKT-\d+)', user_input, re.IGNORECASE)
+    if ticket_id:
+        question_type = _wh_word(user_input, "details")
+        if question_type not in ("who", "when", "what"):
+            question_type = "details"
+        return Intent("specific_ticket", ticket_id.group(1).upper(), question_type, EXACT)
+
+    who = re.search(r'who\s+(?:raised|created|opened|submitted)\s+(?:the\s+|a\s+|an\s+)?(.+?)\s+(?:ticket|issue|request)s?\b', user_input, re.IGNORECASE)
+    if who:
+        return Intent("filter_by_person", who.group(1).strip(), "who", LIKELY)
+    if re.search(r'who\s+(?:raised|created|opened|submitted)', user_input, re.IGNORECASE):
+        return Intent("filter_by_person", "", "who", WEAK)
+
+    priority = re.search(r'(high|medium|low)\s*priority', user_input, re.IGNORECASE)
+    if priority:
+        return Intent("filter_by_priority", priority.group(1).title(), _list_or_count(user_input), STRONG)
+
+    status = re.search(r'(open|pending|in progress|resolved|closed)', user_input, re.IGNORECASE)
+    if status:
+        value = status.group(1).title()
+        if value == "Pending":
+            value = "Open"
+        return Intent("filter_by_status", value, _list_or_count(user_input), STRONG)
+
+    if re.search(r'\b(all|every|show|list|what)\b.*\btickets?\b|\btickets?\s+overview\b', user_input, re.IGNORECASE):
+        return Intent("overview", "", _list_or_count(user_input), LIKELY)
+
+    return Intent("overview", "", "list", UNKNOWN)
+
+
+def classify_activity(user_input: str) -> Intent:
+    """Classify an activity/task query"""
+    who = re.search(r'who\s*(?:is|\'s)?\s+(?:assigned|working|responsible|doing|handling)\s+(?:to|for|on)?\s*["\']?(.+?)["\']?(?:\?|$)', user_input, re.IGNORECASE)
+    if who:
+        return Intent("who_assigned", who.group(1).strip(), "who", LIKELY)
+
+    status = re.search(r'(to do|todo|pending|in progress|completed|done)', user_input, re.IGNORECASE)
+    employee = re.search(r'(?:for|by) ([A-Za-z ]+)', user_input, re.IGNORECASE) or \
+        re.search(r'(?:[Ww]hat(?:\'s| is)|[Ss]how)\s+([A-Z][a-z]+)\s+working on', user_input)
+    if employee:
+        return Intent("filter_by_employee", employee.group(1).strip(), _list_or_count(user_input), LIKELY)
+
+    if status:
+        value = status.group(1).lower()
+        if value in ('todo', 'pending', 'to do'):
+            value = "To Do"
+        elif value in ('completed', 'done'):
+            value = "Completed"
+        else:
+            value = "In Progress"
+        return Intent("filter_by_status", value, _list_or_count(user_input), STRONG)
+
+    if re.search(r'\b(kanban|board)\b|\ball\s+(?:activities|tasks)\b', user_input, re.IGNORECASE):
+        return Intent("overview", "", "list", STRONG)
+
+    return Intent("overview", "", "list", UNKNOWN)
+
+
+def classify_cost(user_input: str) -> Intent:
+    """Classify an infrastructure cost query"""
+    text = user_input.lower()
+    provider = next((name for keyword, name in PROVIDER_KEYWORDS.items() if keyword in text), "")
+
+    if re.search(r'\b(compare|comparison|vs\.?|versus|cheaper|pricier)\b', text):
+        return Intent("compare_all", "", "which" if 'which' in text else "compare", STRONG)
+    if re.search(r'\b(cheapest|lowest|least expensive|most affordable)\b', text):
+        return Intent("cheapest", provider, "which", LIKELY)
+    if re.search(r'\b(most expensive|priciest|highest)\b', text):
+        return Intent("most_expensive", provider, "which", LIKELY)
+
+    if provider:
+        if re.search(r'\bhow much\b', text):
+            question_type = "how_much"
+        elif re.search(r'\bwhat services\b', text):
+            question_type = "what"
+        else:
+            question_type = "breakdown"
+        return Intent("specific_provider", provider, question_type, STRONG)
+
+    if re.search(r'\b(infrastructure|cloud)\b.*\b(costs?|pricing|spend(?:ing)?)\b', text):
+        return Intent("overview", "", "list", LIKELY)
+
+    return Intent("overview", "", "list", UNKNOWN)
+
+
+def classify_chat(user_input: str) -> Intent:
+    """Classify a general conversation or company query"""
+    text = user_input.strip().lower()
+
+    if re.match(r'(hi|hello|hey|good (?:morning|afternoon|evening)|greetings)\b', text):
+        return Intent("greeting", "", "greeting", EXACT)
+    if re.match(r'(bye|goodbye|see you|thanks,? bye)\b', text):
+        return Intent("goodbye", "", "greeting", STRONG)
+    if re.search(r'\bwhat can you (?:help|do)\b|^help\b', text):
+        return Intent("help", "", "what", STRONG)
+
+    mentions_company = re.search(r'\b(company|technology-garage|technology garage|your|you)\b', text)
+    for topic, pattern in COMPANY_TOPICS:
+        if re.search(pattern, text):
+            confidence = LIKELY if mentions_company else WEAK
+            return Intent("company_info", topic, _wh_word(text, "what"), confidence)
+
+    if re.search(r'\b(tell me about|who is|what is|what does)\b.*\b(company|technology-garage|technology garage)\b', text):
+        return Intent("company_info", "", _wh_word(text, "what"), LIKELY)
+
+    return Intent("general_question", "", _wh_word(text, "what"), UNKNOWN)
+
+
+# Follow-ups asking to expand the previous answer ("full details", "show more")
+FOLLOW_UP_PATTERN = re.compile(
+    r'^(?:(?:ok|okay|yes|sure|please) )?(?:(?:show|give|send|tell|get|display)(?: me)? )?(?:the )?'
+    r'(?:(?:full|more|complete|all|entire)(?: details?| info(?:rmation)?| results?| list| response)?|details?)'
+    r'(?: please)?$'
+)
+
+
+def is_follow_up(user_input: str) -> bool:
+    """Whether the message only asks for more of the previous answer"""
+    text = " ".join(re.sub(r"[^\w\s]", " ", user_input.lower()).split())
+    return bool(FOLLOW_UP_PATTERN.match(text))
+
+
+def wants_next_page(user_input: str) -> bool:
+    """Whether a follow-up asks to continue ("show more") rather than for the full details"""
+    text = " ".join(re.sub(r"[^\w\s]", " ", user_input.lower()).split())
+    return bool(re.search(r'\bmore\b(?! details?\b| info)', text))
+
+
+# Where an agent's intent came from: the router's plan, the local rules, or
+# the agent's own intent LLM call
+INTENT_SOURCES = ("planned", "fast_path", "llm")
+
+CLASSIFIERS = {
+    "ticket_analyzer": classify_ticket,
+    "activity_tracker": classify_activity,
+    "infrastructure_cost_monitor": classify_cost,
+    "chat": classify_chat
+}
+
+
+class IntentEngine:
+    """Local intent classifier with fast-path accounting per agent"""
+
+    def __init__(self, threshold: float = 0.8):
+        self.threshold = threshold
+        self._lock = threading.Lock()
+        self._counts = {agent: dict.fromkeys(INTENT_SOURCES, 0) for agent in CLASSIFIERS}
+
+    def classify(self, agent: str, user_input: str) -> Intent:
+        return CLASSIFIERS[agent](user_input)
+
+    def is_confident(self, intent: Intent) -> bool:
+        return intent.confidence >= self.threshold
+
+    def record(self, agent: str, source: str):
+        """Count where an agent's intent came from (one of INTENT_SOURCES)"""
+        with self._lock:
+            self._counts[agent][source] += 1
+
+    def stats(self) -> dict:
+        """Intent source counters per agent and overall"""
+        with self._lock:
+            per_agent = {agent: dict(counts) for agent, counts in self._counts.items()}
+        totals = {source: sum(c[source] for c in per_agent.values()) for source in INTENT_SOURCES}
+        for counts in per_agent.values():
+            lookups = sum(counts.values())
+            counts["fast_path_ratio"] = round(counts["fast_path"] / lookups, 3) if lookups else 0.0
+        lookups = sum(totals.values())
+        return {
+            "threshold": self.threshold,
+            **totals,
+            "fast_path_ratio": round(totals["fast_path"] / lookups, 3) if lookups else 0.0,
+            "agents": per_agent
+        }
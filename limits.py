@@ -0,0 +1,219 @@
+"""
+Backpressure for the Multi-Agent System: a shared limiter around every LLM
+call and a bounded admission queue in front of the chat endpoints
+"""
+
+import asyncio
+import math
+import threading
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+
+
+class LLMCapacityError(TimeoutError):
+    """No LLM capacity became free within the call's timeout"""
+
+
+class QueueFull(Exception):
+    """The admission queue is full; retry_after is a hint in seconds"""
+
+    def __init__(self, retry_after: int):
+        super().__init__(f"Server busy, retry after {retry_after}s")
+        self.retry_after = retry_after
+
+
+class LLMLimiter:
+    """Caps LLM calls in flight and tokens spent per minute.
+
+    Shared by the sync graph's worker threads and the async graph's event
+    loop. A call reserves its estimated tokens up front and settles the
+    difference with the reported usage when it finishes; the token budget
+    refills continuously (a token bucket holding one minute's worth). A
+    limit of 0 disables it. After a provider rate-limit error, backoff()
+    pauses new calls instead of letting them fail the same way.
+    """
+
+    def __init__(self, max_concurrency: int = 0, tokens_per_minute: int = 0):
+        self.max_concurrency = max_concurrency
+        self.tokens_per_minute = tokens_per_minute
+        self.in_flight = 0
+        self._tokens = float(tokens_per_minute)
+        self._refilled_at = time.monotonic()
+        self._paused_until = 0.0
+        self._cond = threading.Condition()
+        self._async_waiters = deque()
+        self.calls = 0
+        self.waited = 0
+        self.wait_seconds = 0.0
+        self.rejected = 0
+        self.backoffs = 0
+
+    def _try_acquire(self, cost: float):
+        """Take a slot and cost tokens. Returns 0 when acquired, else the seconds
+        until a retry can succeed (None: until a call finishes). Lock held."""
+        now = time.monotonic()
+        if self._paused_until > now:
+            return self._paused_until - now
+        if self.max_concurrency and self.in_flight >= self.max_concurrency:
+            return None
+        if self.tokens_per_minute:
+            rate = self.tokens_per_minute / 60.0
+            self._tokens = min(self.tokens_per_minute, self._tokens + (now - self._refilled_at) * rate)
+            self._refilled_at = now
+            cost = min(cost, self.tokens_per_minute)
+            if self._tokens < cost:
+                return (cost - self._tokens) / rate
+            self._tokens -= cost
+        self.in_flight += 1
+        self.calls += 1
+        return 0
+
+    def _admitted(self, started: float) -> float:
+        waited = time.monotonic() - started
+        if waited > 0.001:
+            self.waited += 1
+            self.wait_seconds += waited
+        return waited
+
+    def _rejected(self, timeout: float):
+        self.rejected += 1
+        return LLMCapacityError(f"No LLM capacity within {timeout:.2f}s")
+
+    def acquire(self, cost: float, timeout: float) -> float:
+        """Block until the call may start; returns the seconds waited"""
+        started = time.monotonic()
+        with self._cond:
+            while True:
+                wait = self._try_acquire(cost)
+                if wait == 0:
+                    return self._admitted(started)
+                remaining = started + timeout - time.monotonic()
+                if remaining <= 0:
+                    raise self._rejected(timeout)
+                self._cond.wait(remaining if wait is None else min(wait, remaining))
+
+    async def aacquire(self, cost: float, timeout: float) -> float:
+        """Wait without blocking the event loop until the call may start"""
+        loop = asyncio.get_running_loop()
+        started = time.monotonic()
+        while True:
+            with self._cond:
+                wait = self._try_acquire(cost)
+                if wait == 0:
+                    return self._admitted(started)
+                remaining = started + timeout - time.monotonic()
+                if remaining <= 0:
+                    raise self._rejected(timeout)
+                waiter = (loop, loop.create_future())
+                self._async_waiters.append(waiter)
+            try:
+                await asyncio.wait_for(waiter[1], remaining if wait is None else min(wait, remaining))
+            except asyncio.TimeoutError:
+                pass
+            finally:
+                with self._cond:
+                    if waiter in self._async_waiters:
+                        self._async_waiters.remove(waiter)
+
+    def release(self, reserved: float, used: float = None):
+        """Finish a call, settling its token reservation against the reported usage"""
+        with self._cond:
+            self.in_flight -= 1
+            if self.tokens_per_minute and used is not None:
+                self._tokens -= used - min(reserved, self.tokens_per_minute)
+            self._wake()
+
+    def backoff(self, seconds: float):
+        """Hold new calls for a while, e.g. after the provider answered 429"""
+        with self._cond:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+            self.backoffs += 1
+
+    def _wake(self):
+        """Let every waiter retry; lock held"""
+        self._cond.notify_all()
+        while self._async_waiters:
+            loop, future = self._async_waiters.popleft()
+            loop.call_soon_threadsafe(_resolve, future)
+
+    def stats(self) -> dict:
+        with self._cond:
+            return {
+                "in_flight": self.in_flight,
+                "max_concurrency": self.max_concurrency,
+                "tokens_per_minute": self.tokens_per_minute,
+                "tokens_available": round(self._tokens) if self.tokens_per_minute else None,
+                "calls": self.calls,
+                "waited": self.waited,
+                "avg_wait_seconds": round(self.wait_seconds / self.waited, 4) if self.waited else 0,
+                "rejected": self.rejected,
+                "backoffs": self.backoffs
+            }
+
+
+def _resolve(future):
+    if not future.done():
+        future.set_result(None)
+
+
+class AdmissionQueue:
+    """Bounded queue of graph runs: max_active run at once, max_waiting wait.
+
+    Beyond that, new requests are rejected at once with QueueFull instead of
+    queueing up latency. Used from the event loop only, so plain counters
+    suffice.
+    """
+
+    def __init__(self, max_active: int, max_waiting: int):
+        self.max_active = max(1, max_active)
+        self.max_waiting = max(0, max_waiting)
+        self.active = 0
+        self.waiting = 0
+        self.admitted = 0
+        self.rejected = 0
+        self._semaphore = None  # created on first use, inside the running loop
+        self._avg_run_seconds = 1.0
+
+    def retry_after(self) -> int:
+        """Seconds until the queue has likely drained a slot"""
+        return max(1, math.ceil(self._avg_run_seconds * (self.waiting + 1) / self.max_active))
+
+    def check(self):
+        """Raise QueueFull if a new request would be rejected"""
+        if self.active >= self.max_active and self.waiting >= self.max_waiting:
+            self.rejected += 1
+            raise QueueFull(self.retry_after())
+
+    @asynccontextmanager
+    async def slot(self):
+        """Hold one of the max_active slots, waiting in the queue if there is room"""
+        self.check()
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_active)
+        self.waiting += 1
+        try:
+            await self._semaphore.acquire()
+        finally:
+            self.waiting -= 1
+        self.active += 1
+        self.admitted += 1
+        start = time.monotonic()
+        try:
+            yield
+        finally:
+            self.active -= 1
+            self._semaphore.release()
+            # Moving average of run time for Retry-After
+            self._avg_run_seconds = 0.8 * self._avg_run_seconds + 0.2 * (time.monotonic() - start)
+
+    def stats(self) -> dict:
+        return {
+            "active": self.active,
+            "waiting": self.waiting,
+            "max_active": self.max_active,
+            "max_waiting": self.max_waiting,
+            "admitted": self.admitted,
+            "rejected": self.rejected,
+            "avg_run_seconds": round(self._avg_run_seconds, 3)
+        }
@@ -2,32 +2,57 @@ import os
 from dotenv import load_dotenv
 load_dotenv()
 
-import requests
-from typing import TypedDict, Annotated, Sequence
+from typing import TypedDict, Annotated, Sequence, NamedTuple, Generator, Optional, Any, List
 from langchain_core.messages import BaseMessage, HumanMessage, AIMessage
-from langchain_openai import ChatOpenAI
-from langgraph.graph import StateGraph, END
-from langgraph.prebuilt import ToolNode
 import operator
 from fastapi import FastAPI, HTTPException
-from fastapi.responses import JSONResponse, PlainTextResponse
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
+from fastapi.encoders import jsonable_encoder
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
 import uvicorn
+import asyncio
 import logging
+import threading
 import time
 import re
 import json
+import uuid
+import hashlib
+from contextlib import asynccontextmanager
 from datetime import datetime
 
 # Import data from external file
-from data import MOCK_TICKETS, MOCK_ACTIVITIES, COMPANY_INFO, INFRASTRUCTURE_COSTS
+from data import COMPANY_INFO
+from intent import IntentEngine, is_follow_up, wants_next_page
+from caching import TTLCache, SharedCache, SharedStore, RequestCoalescer, normalize_query
+from limits import LLMLimiter, AdmissionQueue, LLMCapacityError, QueueFull
+from news_client import NewsClient, DEFAULT_NEWSDATA_URL, format_articles
+from paging import LazyResult, Section, render_page, page_note
+from stores import CompanyIndex, format_price, format_estimate
+from backends import open_backend
+import metrics
+import prompts
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='[%(asctime)s] %(levelname)s - %(message)s')
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Warm up in the background so the server accepts connections right away
+    warmup_task = asyncio.ensure_future(warm_up()) if WARMUP_ON_STARTUP else None
+    yield
+    if warmup_task is not None and not warmup_task.done():
+        warmup_task.cancel()
+    if news_client is not None:
+        news_client.close()
+        await news_client.aclose()
+    data_backend.close()
+    if shared_cache is not None:
+        shared_cache.close()
+
 # Initialize FastAPI
-app = FastAPI(title="Technology-Garage Multi-Agent System")
+app = FastAPI(title="Technology-Garage Multi-Agent System", lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -46,8 +71,128 @@ app.add_middleware(
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
 NEWSDATA_API_KEY = os.getenv("NEWSDATA_API_KEY")
 
-# Initialize LLM
-llm = ChatOpenAI(model="gpt-5.1", temperature=0.7, api_key=OPENAI_API_KEY)
+# The LLM client and the compiled graphs are built on first use (or by the
+# startup warm-up), so importing this module stays cheap
+WARMUP_ON_STARTUP = os.getenv("WARMUP_ON_STARTUP", "true").lower() in ("1", "true", "yes")
+
+llm = None
+_init_lock = threading.Lock()
+
+
+def get_llm():
+    """The shared chat model client, created on first use"""
+    global llm
+    if llm is None:
+        with _init_lock:
+            if llm is None:
+                from langchain_openai import ChatOpenAI
+                llm = ChatOpenAI(model="gpt-5.1", temperature=0.7, api_key=OPENAI_API_KEY)
+    return llm
+
+# Local intent engine; the intent LLM call is skipped above this confidence
+INTENT_CONFIDENCE_THRESHOLD = float(os.getenv("INTENT_CONFIDENCE_THRESHOLD", "0.8"))
+intent_engine = IntentEngine(threshold=INTENT_CONFIDENCE_THRESHOLD)
+
+# Cache tier shared by all worker processes on the host: the LLM result
+# caches below fall through to this SQLite file, so a result computed by one
+# uvicorn worker is reused by the others. The file is opened on first use.
+# Empty SHARED_CACHE_PATH keeps every cache local to its process.
+SHARED_CACHE_PATH = os.getenv("SHARED_CACHE_PATH", "agent_cache.db")
+SHARED_CACHE_MAX_MB = float(os.getenv("SHARED_CACHE_MAX_MB", "256"))
+shared_cache = SharedStore(SHARED_CACHE_PATH, max_bytes=int(SHARED_CACHE_MAX_MB * 2**20)) if SHARED_CACHE_PATH else None
+
+# Routing decisions keyed on the normalized user input
+ROUTER_CACHE_SIZE = int(os.getenv("ROUTER_CACHE_SIZE", "512"))
+ROUTER_CACHE_TTL = float(os.getenv("ROUTER_CACHE_TTL", "3600"))
+router_cache = SharedCache(shared_cache, "router", maxsize=ROUTER_CACHE_SIZE, ttl=ROUTER_CACHE_TTL)
+
+# Intent extractions keyed on the intent template and normalized user input
+INTENT_CACHE_SIZE = int(os.getenv("INTENT_CACHE_SIZE", "1024"))
+INTENT_CACHE_TTL = float(os.getenv("INTENT_CACHE_TTL", "3600"))
+intent_cache = SharedCache(shared_cache, "intent", maxsize=INTENT_CACHE_SIZE, ttl=INTENT_CACHE_TTL)
+
+# News summaries keyed on the fetched articles (or, without a news API, on
+# normalized topic and date)
+NEWS_CACHE_SIZE = int(os.getenv("NEWS_CACHE_SIZE", "256"))
+NEWS_CACHE_TTL = float(os.getenv("NEWS_CACHE_TTL", "1800"))
+news_cache = SharedCache(shared_cache, "news", maxsize=NEWS_CACHE_SIZE, ttl=NEWS_CACHE_TTL)
+
+# Generated answers (chat replies, enhanced agent answers, summaries) keyed on
+# a hash of the full prompt, so any change in the data or question misses
+ANSWER_CACHE_SIZE = int(os.getenv("ANSWER_CACHE_SIZE", "512"))
+ANSWER_CACHE_TTL = float(os.getenv("ANSWER_CACHE_TTL", "900"))
+answer_cache = SharedCache(shared_cache, "answers", maxsize=ANSWER_CACHE_SIZE, ttl=ANSWER_CACHE_TTL)
+
+# With NEWSDATA_API_KEY set, articles are fetched from NEWSDATA_URL (NewsData
+# or the local news_stub.py) through a pooled client and the LLM only
+# summarizes them. Fetched responses are revalidated after NEWS_FETCH_TTL.
+NEWSDATA_URL = os.getenv("NEWSDATA_URL", DEFAULT_NEWSDATA_URL)
+NEWS_ARTICLES = int(os.getenv("NEWS_ARTICLES", "5"))
+NEWS_FETCH_TTL = float(os.getenv("NEWS_FETCH_TTL", "600"))
+NEWS_FETCH_TIMEOUT = float(os.getenv("NEWS_FETCH_TIMEOUT", "10"))
+NEWS_MAX_CONNECTIONS = int(os.getenv("NEWS_MAX_CONNECTIONS", "20"))
+news_client = NewsClient(
+    NEWSDATA_URL, NEWSDATA_API_KEY, ttl=NEWS_FETCH_TTL, timeout=NEWS_FETCH_TIMEOUT,
+    max_connections=NEWS_MAX_CONNECTIONS
+) if NEWSDATA_API_KEY else None
+
+# Last untruncated agent results per chat session, for "full details" follow-ups
+SESSION_STORE_SIZE = int(os.getenv("SESSION_STORE_SIZE", "1024"))
+SESSION_TTL = float(os.getenv("SESSION_TTL", "1800"))
+session_store = TTLCache(maxsize=SESSION_STORE_SIZE, ttl=SESSION_TTL)
+
+# Agent results are rendered a page at a time; cursor tokens map to the
+# unrendered rest of a result
+SUMMARY_PAGE_LINES = 10
+DETAILS_PAGE_LINES = int(os.getenv("DETAILS_PAGE_LINES", "200"))
+CURSOR_STORE_SIZE = int(os.getenv("CURSOR_STORE_SIZE", "4096"))
+CURSOR_TTL = float(os.getenv("CURSOR_TTL", "1800"))
+cursor_store = TTLCache(maxsize=CURSOR_STORE_SIZE, ttl=CURSOR_TTL)
+
+# Identical in-flight /chat requests share one graph execution
+chat_coalescer = RequestCoalescer()
+
+# /chat/batch limits: graph runs in flight per batch, messages per batch, and
+# messages planned together in one routing call
+BATCH_CONCURRENCY = int(os.getenv("BATCH_CONCURRENCY", "8"))
+BATCH_MAX_MESSAGES = int(os.getenv("BATCH_MAX_MESSAGES", "500"))
+BATCH_ROUTING_CHUNK = int(os.getenv("BATCH_ROUTING_CHUNK", "20"))
+
+# Per-request latency budget in seconds. Every LLM call is capped by the time
+# left, and optional steps (enhance, multi-agent summary) are shed when less
+# than OPTIONAL_STEP_MIN_BUDGET remains.
+REQUEST_DEADLINE = float(os.getenv("REQUEST_DEADLINE", "30"))
+LLM_CALL_TIMEOUT = float(os.getenv("LLM_CALL_TIMEOUT", "20"))
+OPTIONAL_STEP_MIN_BUDGET = float(os.getenv("OPTIONAL_STEP_MIN_BUDGET", "5"))
+
+# Shared limit on LLM calls across all requests (0 disables a limit). A call
+# reserves its prompt tokens plus LLM_EXPECTED_COMPLETION_TOKENS, and waits
+# for capacity within its own timeout. A provider 429 pauses new calls for
+# its Retry-After, or LLM_RATE_LIMIT_BACKOFF seconds.
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "16"))
+LLM_TOKENS_PER_MINUTE = int(os.getenv("LLM_TOKENS_PER_MINUTE", "0"))
+LLM_EXPECTED_COMPLETION_TOKENS = int(os.getenv("LLM_EXPECTED_COMPLETION_TOKENS", "400"))
+LLM_RATE_LIMIT_BACKOFF = float(os.getenv("LLM_RATE_LIMIT_BACKOFF", "5"))
+llm_limiter = LLMLimiter(LLM_MAX_CONCURRENCY, LLM_TOKENS_PER_MINUTE)
+
+# Graph runs admitted at once for /chat and /chat/stream, and how many more
+# may wait; beyond that requests get 429 with Retry-After
+CHAT_MAX_CONCURRENCY = int(os.getenv("CHAT_MAX_CONCURRENCY", "32"))
+CHAT_QUEUE_SIZE = int(os.getenv("CHAT_QUEUE_SIZE", "64"))
+chat_admission = AdmissionQueue(CHAT_MAX_CONCURRENCY, CHAT_QUEUE_SIZE)
+
+# Data backend the agents query: "memory" builds indexed stores from data.py
+# at startup, "sqlite" queries the database at DATA_DB (seeded from data.py
+# when empty; load exports with `python backends.py`), "snapshot" maps the
+# read-only columnar file at DATA_SNAPSHOT (build with `python snapshot.py`)
+DATA_BACKEND = os.getenv("DATA_BACKEND", "memory").lower()
+DATA_DB = os.getenv("DATA_DB", "agents.db")
+DATA_SNAPSHOT = os.getenv("DATA_SNAPSHOT", "agents.snap")
+data_backend = open_backend(DATA_BACKEND, DATA_SNAPSHOT if DATA_BACKEND == "snapshot" else DATA_DB)
+ticket_store = data_backend.tickets
+activity_store = data_backend.activities
+cost_table = data_backend.cost_table
+company_index = CompanyIndex(COMPANY_INFO)
 
 # Terminal output storage
 latest_agent_output = "(No agent output yet)"
@@ -61,54 +206,381 @@ def limit_response(response: str, max_lines: int = 10) -> str:
         return f"{truncated}\n\n[Response limited to summary. Ask for 'details' or 'full details' for complete information]"
     return response
 
+def paginate(agent: str, result: LazyResult, wants_details: bool) -> tuple:
+    """Render the first page of an agent's result.
+    
+    Returns (text to show, state update). The update holds the page without
+    its footer and the whole result for follow-ups and, when lines remain, a
+    (result, offset) cursor for the next page.
+    """
+    page = render_page(result, 0, DETAILS_PAGE_LINES if wants_details else SUMMARY_PAGE_LINES)
+    update = {"raw_responses": {agent: page.text}, "results": {agent: result}}
+    if page.next_offset is not None:
+        update["cursors"] = {agent: (result, page.next_offset)}
+    return page.text + page_note(page), update
+
+
+def register_cursor(cursors: dict) -> Optional[str]:
+    """Token for a set of per-agent page cursors, or None when nothing remains"""
+    if not cursors:
+        return None
+    token = uuid.uuid4().hex
+    cursor_store.set(token, dict(cursors))
+    return token
+
+
+def next_pages(token: str, max_lines: int) -> Optional[tuple]:
+    """(agent responses, next token) for the page after a cursor, or None if it expired.
+    
+    Cursors are immutable, so a token can be fetched again (e.g. on retry)
+    and the coalesced callers sharing it don't move each other's position.
+    """
+    cursors = cursor_store.get(token)
+    if cursors is None:
+        return None
+    responses, remaining = {}, {}
+    for agent, (result, offset) in cursors.items():
+        page = render_page(result, offset, max_lines)
+        responses[agent] = page.text + page_note(page)
+        if page.next_offset is not None:
+            remaining[agent] = (result, page.next_offset)
+    return responses, register_cursor(remaining)
+
+
+def detail_pages(responses: dict, results: dict) -> tuple:
+    """(agent responses, next token) with every paged result from its first line at the details size"""
+    responses, remaining = dict(responses), {}
+    for agent, result in results.items():
+        page = render_page(result, 0, DETAILS_PAGE_LINES)
+        responses[agent] = page.text + page_note(page)
+        if page.next_offset is not None:
+            remaining[agent] = (result, page.next_offset)
+    return responses, register_cursor(remaining)
+
+
+# ==================== LLM CALLS ====================
+class LLMCall(NamedTuple):
+    """A model call requested by a node's step generator.
+    
+    With a cache, the output is stored under cache_key and concurrent
+    identical calls share a single in-flight request. Optional calls are
+    skipped when the request is short on time; the step then receives None.
+    """
+    prompt: str
+    purpose: str
+    cache: Optional[TTLCache] = None
+    cache_key: Any = None
+    optional: bool = False
+
+
+def answer_call(prompt: str, purpose: str, optional: bool = False) -> LLMCall:
+    """LLMCall whose output is cached in answer_cache under a hash of the prompt"""
+    digest = hashlib.sha256(prompt.encode("utf-8")).hexdigest()
+    return LLMCall(prompt, purpose, cache=answer_cache, cache_key=(purpose, digest), optional=optional)
+
+
+class NewsFetch(NamedTuple):
+    """A news API fetch requested by a node's step generator; receives a list of Articles"""
+    query: str
+    limit: int = 5
+    purpose: str = "fetch"
+    optional: bool = False
+
+
+def time_left(deadline: Optional[float]) -> Optional[float]:
+    """Seconds until the request deadline, or None without one"""
+    return None if deadline is None else deadline - time.monotonic()
+
+
+def has_budget(deadline: Optional[float]) -> bool:
+    """Whether there is still time for an optional step"""
+    remaining = time_left(deadline)
+    return remaining is None or remaining >= OPTIONAL_STEP_MIN_BUDGET
+
+
+def call_timeout(deadline: Optional[float]) -> float:
+    """Timeout for the next LLM call: the per-call cap or the time left"""
+    remaining = time_left(deadline)
+    if remaining is None:
+        return LLM_CALL_TIMEOUT
+    if remaining <= 0:
+        raise TimeoutError("Request deadline exceeded")
+    return min(LLM_CALL_TIMEOUT, remaining)
+
+
+def llm_cost(prompt: str) -> int:
+    """Tokens a call reserves from the limiter before its usage is known"""
+    return prompts.count_tokens(prompt) + LLM_EXPECTED_COMPLETION_TOKENS
+
+
+def used_tokens(usage: Optional[dict]) -> Optional[int]:
+    return usage.get("total_tokens") if usage else None
+
+
+def note_llm_error(e: Exception):
+    """Pause the limiter when the provider reports a rate limit"""
+    if getattr(e, "status_code", None) != 429:
+        return
+    headers = getattr(getattr(e, "response", None), "headers", None) or {}
+    try:
+        seconds = float(headers.get("retry-after", LLM_RATE_LIMIT_BACKOFF))
+    except ValueError:
+        seconds = LLM_RATE_LIMIT_BACKOFF
+    logging.warning(f"LLM rate limited, pausing calls for {seconds:.1f}s")
+    llm_limiter.backoff(seconds)
+
+
+def call_llm(prompt: str, node: str = "", purpose: str = "", timeout: float = LLM_CALL_TIMEOUT) -> str:
+    """Blocking model call used by the sync graph"""
+    cost = llm_cost(prompt)
+    try:
+        waited = llm_limiter.acquire(cost, timeout)
+    except LLMCapacityError:
+        metrics.LLM_REJECTED.inc(node=node, purpose=purpose)
+        raise
+    metrics.LLM_LIMITER_WAIT.observe(waited, node=node)
+    usage = None
+    start = time.perf_counter()
+    try:
+        response = get_llm().invoke([HumanMessage(content=prompt)], timeout=timeout - waited)
+        usage = response.usage_metadata
+    except Exception as e:
+        metrics.record_llm_call(node, purpose, time.perf_counter() - start, ok=False)
+        note_llm_error(e)
+        raise
+    finally:
+        llm_limiter.release(cost, used_tokens(usage))
+    metrics.record_llm_call(node, purpose, time.perf_counter() - start, usage)
+    return response.content
+
+
+async def acall_llm(prompt: str, node: str = "", purpose: str = "", timeout: float = LLM_CALL_TIMEOUT) -> str:
+    """Non-blocking model call used by the async graph"""
+    cost = llm_cost(prompt)
+    try:
+        waited = await llm_limiter.aacquire(cost, timeout)
+    except LLMCapacityError:
+        metrics.LLM_REJECTED.inc(node=node, purpose=purpose)
+        raise
+    metrics.LLM_LIMITER_WAIT.observe(waited, node=node)
+    timeout -= waited
+    usage = None
+    start = time.perf_counter()
+    try:
+        response = await asyncio.wait_for(get_llm().ainvoke([HumanMessage(content=prompt)], timeout=timeout), timeout)
+        usage = response.usage_metadata
+    except Exception as e:
+        metrics.record_llm_call(node, purpose, time.perf_counter() - start, ok=False)
+        note_llm_error(e)
+        if isinstance(e, asyncio.TimeoutError):
+            raise TimeoutError(f"LLM call timed out after {timeout:.2f}s") from e
+        raise
+    finally:
+        llm_limiter.release(cost, used_tokens(usage))
+    metrics.record_llm_call(node, purpose, time.perf_counter() - start, usage)
+    return response.content
+
+
+def serve_llm_call(call: LLMCall, node: str = "", timeout: float = LLM_CALL_TIMEOUT) -> str:
+    if call.cache is not None:
+        return call.cache.get_or_compute(call.cache_key, lambda: call_llm(call.prompt, node, call.purpose, timeout))
+    return call_llm(call.prompt, node, call.purpose, timeout)
+
+
+async def aserve_llm_call(call: LLMCall, node: str = "", timeout: float = LLM_CALL_TIMEOUT) -> str:
+    if call.cache is not None:
+        return await call.cache.aget_or_compute(call.cache_key, lambda: acall_llm(call.prompt, node, call.purpose, timeout))
+    return await acall_llm(call.prompt, node, call.purpose, timeout)
+
+
+def shed_step(node: str, call: LLMCall, shed: list):
+    """Record an optional call skipped to stay within the request deadline"""
+    logging.info(f"Shedding optional {call.purpose} step of {node}: request deadline is near")
+    metrics.SHED_STEPS.inc(node=node, step=call.purpose)
+    shed.append(f"{node}.{call.purpose}")
+
+
+def with_shed_steps(update: dict, shed: list) -> dict:
+    return {**update, "shed_steps": shed} if shed else update
+
+
+def serve_step(call, node: str = "", timeout: float = LLM_CALL_TIMEOUT):
+    """Perform one step request (an LLM call or a news fetch) with blocking I/O"""
+    if isinstance(call, NewsFetch):
+        return news_client.fetch(call.query, call.limit, min(timeout, NEWS_FETCH_TIMEOUT))
+    return serve_llm_call(call, node, timeout)
+
+
+async def aserve_step(call, node: str = "", timeout: float = LLM_CALL_TIMEOUT):
+    if isinstance(call, NewsFetch):
+        return await news_client.afetch(call.query, call.limit, min(timeout, NEWS_FETCH_TIMEOUT))
+    return await aserve_llm_call(call, node, timeout)
+
+
+# Node logic is written once as a generator that yields LLMCall (or NewsFetch)
+# requests and receives the result back (or the raised exception). The drivers
+# below serve those requests with either the blocking or the async clients, so
+# every node has a sync variant for graph.invoke and an async one for
+# graph.ainvoke.
+# The drivers also time the node, attribute its LLM calls to it, and enforce
+# the request deadline: calls time out with the budget and optional ones are
+# shed (answered with None) when too little of it is left.
+def run_steps(steps: Generator, node: str = "", deadline: Optional[float] = None) -> dict:
+    """Drive a node's step generator with blocking calls"""
+    start = time.perf_counter()
+    shed = []
+    try:
+        call = next(steps)
+        while True:
+            if call.optional and not has_budget(deadline):
+                shed_step(node, call, shed)
+                call = steps.send(None)
+                continue
+            try:
+                content = serve_step(call, node, call_timeout(deadline))
+            except Exception as e:
+                call = steps.throw(e)
+            else:
+                call = steps.send(content)
+    except StopIteration as done:
+        return with_shed_steps(done.value, shed)
+    finally:
+        metrics.NODE_LATENCY.observe(time.perf_counter() - start, node=node)
+
+
+def resume_steps(resume, value) -> tuple:
+    """(done, next request or node result) after resuming a step generator"""
+    try:
+        return False, resume(value)
+    except StopIteration as done:
+        return True, done.value
+
+
+async def arun_steps(steps: Generator, node: str = "", deadline: Optional[float] = None,
+                     offload: bool = False) -> dict:
+    """Drive a node's step generator with async calls.
+    
+    With offload, the generator's own code between requests runs in the
+    default executor, for nodes whose logic does blocking reads (SQLite
+    data, the shared cache) that must not stall the event loop.
+    """
+    start = time.perf_counter()
+    shed = []
+    loop = asyncio.get_running_loop()
+    
+    async def resume(method, value):
+        if offload:
+            return await loop.run_in_executor(None, resume_steps, method, value)
+        return resume_steps(method, value)
+    
+    try:
+        done, call = await resume(steps.send, None)
+        while not done:
+            if call.optional and not has_budget(deadline):
+                shed_step(node, call, shed)
+                done, call = await resume(steps.send, None)
+                continue
+            try:
+                content = await aserve_step(call, node, call_timeout(deadline))
+            except Exception as e:
+                done, call = await resume(steps.throw, e)
+            else:
+                done, call = await resume(steps.send, content)
+        return with_shed_steps(call, shed)
+    finally:
+        metrics.NODE_LATENCY.observe(time.perf_counter() - start, node=node)
+
+
+def resolve_intent(agent: str, state: dict, template: str) -> Generator:
+    """Step helper that finds an agent's intent with as few LLM calls as possible.
+    
+    Uses the intent planned by the router when there is one, then the local
+    rules when they are confident, and only then renders and sends the
+    agent's intent prompt template.
+    """
+    user_input = state.get("user_input", "")
+    planned_intent = (state.get("agent_intents") or {}).get(agent)
+    if isinstance(planned_intent, dict) and planned_intent.get("query_type"):
+        intent_engine.record(agent, "planned")
+        return planned_intent
+    
+    local_intent = intent_engine.classify(agent, user_input)
+    if intent_engine.is_confident(local_intent):
+        intent_engine.record(agent, "fast_path")
+        return local_intent.to_json(agent)
+    
+    intent_engine.record(agent, "llm")
+    try:
+        intent_content = yield LLMCall(prompts.render(template, user_input=user_input), "intent",
+                                       cache=intent_cache, cache_key=(template, normalize_query(user_input)))
+        return json.loads(intent_content.strip())
+    except Exception:
+        # Fall back to the rule-based guess
+        metrics.FALLBACKS.inc(node=agent, step="intent")
+        return local_intent.to_json(agent)
+
+
 # ==================== STATE DEFINITION ====================
+def merge_dicts(left: dict, right: dict) -> dict:
+    """Reducer that merges agent results written by parallel branches"""
+    return {**(left or {}), **(right or {})}
+
+
 class AgentState(TypedDict):
     """State passed between agents in the graph"""
     messages: Annotated[Sequence[BaseMessage], operator.add]
     user_input: str
-    agent_responses: dict
+    agent_responses: Annotated[dict, merge_dicts]
+    raw_responses: Annotated[dict, merge_dicts]
+    results: Annotated[dict, merge_dicts]
+    cursors: Annotated[dict, merge_dicts]
     next_agent: str
     agents_to_run: list
+    agent_intents: dict
+    deadline: float
+    shed_steps: Annotated[list, operator.add]
+
+
+# Router agent names -> graph node names
+AGENT_NODE_MAP = {
+    "TicketAnalyzerAgent": "ticket_analyzer",
+    "NewsAggregatorAgent": "news_aggregator",
+    "ActivityTrackerAgent": "activity_tracker",
+    "InfrastructureCostMonitorAgent": "infrastructure_cost_monitor",
+    "ChatAgent": "chat"
+}
+
+# Intents planned for every agent on a complete overview request
+OVERVIEW_INTENTS = {
+    "ticket_analyzer": {"query_type": "overview", "filter_value": "", "question_type": "list"},
+    "news_aggregator": {"topic": "technology"},
+    "activity_tracker": {"query_type": "overview", "filter_value": "", "question_type": "list"},
+    "infrastructure_cost_monitor": {"query_type": "overview", "provider": "", "question_type": "list"}
+}
+
+def is_company_fact(user_input: str) -> bool:
+    """Whether the question is a single company fact and nothing else"""
+    if company_index.answer(user_input) is None:
+        return False
+    return not any(
+        intent_engine.is_confident(intent_engine.classify(agent, user_input))
+        for agent in ("ticket_analyzer", "activity_tracker", "infrastructure_cost_monitor")
+    )
 
 
 # ==================== AGENT FUNCTIONS ====================
 
-def ticket_analyzer_node(state: AgentState) -> AgentState:
+def _ticket_analyzer_steps(state: AgentState):
     """Ticket Analyzer Agent Node"""
     logging.info("Executing Ticket Analyzer Agent")
     
     user_input = state.get("user_input", "")
     
     # Use LLM to understand user's intent for better query understanding
-    intent_prompt = f"""Analyze this ticket query and extract the intent in JSON format:
-    
-User query: "{user_input}"
-
-Available ticket data fields: ticket_id, raised_by, category, subject, description, status (Open/In Progress/Resolved), priority (High/Medium/Low), created_at
-
-Return JSON with:
-- "query_type": "specific_ticket" | "filter_by_status" | "filter_by_priority" | "filter_by_person" | "count" | "overview"
-- "filter_value": the specific value if filtering (e.g., "High", "Open", person name, or ticket ID)
-- "question_type": "who" | "what" | "how_many" | "when" | "list" | "details"
-
-Examples:
-"Show TKT-001" -> {{"query_type": "specific_ticket", "filter_value": "TKT-001", "question_type": "details"}}
-"How many high priority tickets?" -> {{"query_type": "filter_by_priority", "filter_value": "High", "question_type": "count"}}
-"Who raised the WiFi ticket?" -> {{"query_type": "filter_by_person", "filter_value": "WiFi", "question_type": "who"}}
-"Show open tickets" -> {{"query_type": "filter_by_status", "filter_value": "Open", "question_type": "list"}}
-"""
-    
-    try:
-        intent_response = llm.invoke([HumanMessage(content=intent_prompt)])
-        intent = json.loads(intent_response.content.strip())
-        query_type = intent.get("query_type", "overview")
-        filter_value = intent.get("filter_value", "")
-        question_type = intent.get("question_type", "list")
-    except:
-        # Fallback to regex patterns
-        query_type = "overview"
-        filter_value = ""
-        question_type = "list"
+    intent = yield from resolve_intent("ticket_analyzer", state, "ticket_intent")
+    query_type = intent.get("query_type", "overview")
+    filter_value = intent.get("filter_value", "")
+    question_type = intent.get("question_type", "list")
     
     # Check if user is asking about specific ticket or general overview
     ticket_id_match = re.search(r'(TKT-\d+)', user_input, re.IGNORECASE)
@@ -116,16 +588,12 @@ Examples:
     priority_match = re.search(r'(high|medium|low)\s*priority', user_input, re.IGNORECASE)
     who_match = re.search(r'who\s+(?:raised|created|opened|submitted)', user_input, re.IGNORECASE)
     
+    lazy = None
     try:
         # Handle "who raised" questions first
         if who_match and filter_value:
             # Find ticket by subject/description matching
-            matched_ticket = None
-            search_term = filter_value.lower()
-            for ticket in MOCK_TICKETS:
-                if search_term in ticket['subject'].lower() or search_term in ticket['description'].lower():
-                    matched_ticket = ticket
-                    break
+            matched_ticket = ticket_store.find(filter_value)
             
             if matched_ticket:
                 result = f"{matched_ticket['raised_by']} raised the ticket '{matched_ticket['subject']}' (ID: {matched_ticket['ticket_id']}, Status: {matched_ticket['status']}, Priority: {matched_ticket['priority']})"
@@ -135,7 +603,7 @@ Examples:
         elif ticket_id_match:
             # Find specific ticket
             ticket_id = ticket_id_match.group(1).upper()
-            ticket = next((t for t in MOCK_TICKETS if t["ticket_id"] == ticket_id), None)
+            ticket = ticket_store.get(ticket_id)
             
             if ticket:
                 result = f"""Ticket Details: {ticket['ticket_id']}
@@ -152,13 +620,13 @@ Created: {ticket['created_at']}"""
         elif priority_match:
             # Filter by priority
             priority = priority_match.group(1).title()
-            filtered = [t for t in MOCK_TICKETS if t["priority"].lower() == priority.lower()]
+            filtered = ticket_store.by_priority(priority)
             
             if filtered:
-                output = [f"{priority} Priority Tickets ({len(filtered)}):"]
-                for ticket in filtered:
-                    output.append(f"[{ticket['ticket_id']}] {ticket['subject']} | Raised By: {ticket['raised_by']} | Status: {ticket['status']} | Created: {ticket['created_at']}")
-                result = "\n".join(output)
+                lazy = LazyResult([Section(
+                    f"{priority} Priority Tickets ({len(filtered)}):", filtered,
+                    lambda ticket: f"[{ticket['ticket_id']}] {ticket['subject']} | Raised By: {ticket['raised_by']} | Status: {ticket['status']} | Created: {ticket['created_at']}"
+                )])
             else:
                 result = f"No tickets found with priority: {priority}"
         
@@ -167,74 +635,58 @@ Created: {ticket['created_at']}"""
             status = status_match.group(1).title()
             if status.lower() == "pending":
                 status = "Open"
-            filtered = [t for t in MOCK_TICKETS if t["status"].lower() == status.lower()]
+            filtered = ticket_store.by_status(status)
             
             if filtered:
-                output = [f"{status} Tickets ({len(filtered)}):"]
-                for ticket in filtered:
-                    output.append(f"[{ticket['ticket_id']}] {ticket['subject']} | Raised By: {ticket['raised_by']} | Priority: {ticket['priority']} | Created: {ticket['created_at']}")
-                result = "\n".join(output)
+                lazy = LazyResult([Section(
+                    f"{status} Tickets ({len(filtered)}):", filtered,
+                    lambda ticket: f"[{ticket['ticket_id']}] {ticket['subject']} | Raised By: {ticket['raised_by']} | Priority: {ticket['priority']} | Created: {ticket['created_at']}"
+                )])
             else:
                 result = f"No tickets found with status: {status}"
         
         else:
             # Show all tickets grouped by status
-            open_tickets = [t for t in MOCK_TICKETS if t["status"] == "Open"]
-            in_progress = [t for t in MOCK_TICKETS if t["status"] == "In Progress"]
-            resolved = [t for t in MOCK_TICKETS if t["status"] == "Resolved"]
-            
-            output = [f"Tickets Overview (Total: {len(MOCK_TICKETS)})"]
-            
-            output.append(f"OPEN/PENDING ({len(open_tickets)}):")
-            for t in open_tickets:
-                output.append(f"[{t['ticket_id']}] {t['subject']} | Priority: {t['priority']}")
+            open_tickets = ticket_store.by_status("Open")
+            in_progress = ticket_store.by_status("In Progress")
+            resolved = ticket_store.by_status("Resolved")
             
-            output.append(f"IN PROGRESS ({len(in_progress)}):")
-            for t in in_progress:
-                output.append(f"[{t['ticket_id']}] {t['subject']} | Priority: {t['priority']}")
-            
-            output.append(f"RESOLVED ({len(resolved)}):")
-            for t in resolved:
-                output.append(f"[{t['ticket_id']}] {t['subject']}")
-            
-            result = "\n".join(output)
+            with_priority = lambda t: f"[{t['ticket_id']}] {t['subject']} | Priority: {t['priority']}"
+            lazy = LazyResult([
+                Section(f"Tickets Overview (Total: {len(ticket_store)})"),
+                Section(f"OPEN/PENDING ({len(open_tickets)}):", open_tickets, with_priority),
+                Section(f"IN PROGRESS ({len(in_progress)}):", in_progress, with_priority),
+                Section(f"RESOLVED ({len(resolved)}):", resolved, lambda t: f"[{t['ticket_id']}] {t['subject']}")
+            ])
     
     except Exception as e:
+        metrics.FALLBACKS.inc(node="ticket_analyzer", step="data")
+        lazy = None
         result = f"Error analyzing tickets: {str(e)}"
     
     # Check if user wants detailed response
     wants_details = any(word in user_input.lower() for word in ['detail', 'full', 'complete', 'comprehensive'])
     
-    # Limit response to 10 lines if not requesting details
-    if not wants_details:
-        result = limit_response(result, max_lines=10)
+    # Render only the first page (10 lines unless details were requested);
+    # the rest stays behind a page cursor
+    result, page_update = paginate("ticket_analyzer", lazy if lazy is not None else LazyResult.from_text(result), wants_details)
     
     # Enhance result with LLM for natural language questions
     if question_type in ["who", "what", "when", "count"] and result:
-        enhance_prompt = f"""User asked: "{user_input}"
-
-Raw data response:
-{result}
-
-Provide a direct, natural answer to the user's specific question. Be concise and precise.
-- If they asked "who", tell them the person's name
-- If they asked "how many", give the count
-- If they asked "what", describe the item
-- If they asked "when", give the date/time
-- If they asked about status, tell them the status clearly"""
+        enhance_prompt = prompts.render("ticket_enhance", user_input=user_input, result=result)
         
         try:
-            enhanced = llm.invoke([HumanMessage(content=enhance_prompt)])
-            result = enhanced.content.strip()
-        except:
+            enhanced = yield answer_call(enhance_prompt, "enhance", optional=True)
+            if enhanced is not None:
+                result = enhanced.strip()
+        except Exception:
+            metrics.FALLBACKS.inc(node="ticket_analyzer", step="enhance")
             pass  # Keep original result if enhancement fails
     
-    state["agent_responses"]["ticket_analyzer"] = result
-    state["messages"].append(AIMessage(content=result))
-    return state
+    return {"agent_responses": {"ticket_analyzer": result}, **page_update, "messages": [AIMessage(content=result)]}
 
 
-def news_aggregator_node(state: AgentState) -> AgentState:
+def _news_aggregator_steps(state: AgentState):
     """News Article Aggregator Agent Node"""
     logging.info("Executing News Aggregator Agent")
     
@@ -264,66 +716,66 @@ def news_aggregator_node(state: AgentState) -> AgentState:
         if about_match:
             topic_match = about_match
     
-    query = topic_match.group(1).strip() if topic_match else "technology"
+    # Otherwise use the topic planned by the router
+    planned_intent = (state.get("agent_intents") or {}).get("news_aggregator")
+    planned_topic = str((planned_intent.get("topic") if isinstance(planned_intent, dict) else None) or "")
+    
+    query = topic_match.group(1).strip() if topic_match else (planned_topic.strip() or "technology")
+    
+    heading = f"Latest News about '{query}':\n{'=' * 70}\n\n"
+    
+    if news_client is not None:
+        try:
+            fetched = yield NewsFetch(query, NEWS_ARTICLES)
+        except Exception as e:
+            metrics.FALLBACKS.inc(node="news_aggregator", step="fetch")
+            result = f"Error fetching news: {str(e)}"
+            return {"agent_responses": {"news_aggregator": result}, "messages": [AIMessage(content=result)]}
+        
+        if not fetched:
+            result = f"No recent news found about '{query}'."
+            return {"agent_responses": {"news_aggregator": result}, "messages": [AIMessage(content=result)]}
+        
+        # The LLM only summarizes the fetched articles; the same articles reuse
+        # the cached summary. Without time or on errors, the list itself is shown
+        article_list = format_articles(fetched)
+        try:
+            prompt = prompts.render("news_summary", topic=query, articles=article_list)
+            cache_key = (normalize_query(query), tuple(article.link or article.title for article in fetched))
+            summary = yield LLMCall(prompt, "summary", cache=news_cache, cache_key=cache_key, optional=True)
+        except Exception:
+            metrics.FALLBACKS.inc(node="news_aggregator", step="summary")
+            summary = None
+        result = heading + (summary if summary is not None else article_list)
+        return {"agent_responses": {"news_aggregator": result}, "messages": [AIMessage(content=result)]}
     
     try:
-        # Use GPT API to generate news summary
-        prompt = f"""You are a news summarizer. Provide a professional news summary about '{query}' as if reporting current events for the date {datetime.now().strftime('%Y-%m-%d')}.
-
-Create 5 realistic news articles with:
-- Clear article titles
-- 2-3 sentence summaries each
-- Credible source names (Reuters, TechCrunch, Bloomberg, etc.)
-- Recent dates (this week, yesterday, Dec 2025, etc.)
-
-Format cleanly with numbered articles. Do NOT include any disclaimers about live news access or training data cutoffs. Write as a professional news aggregator would."""
+        # No news API configured: use GPT API to generate news summary
+        today = datetime.now().strftime('%Y-%m-%d')
+        prompt = prompts.render("news", topic=query, today=today)
         
-        response = llm.invoke([HumanMessage(content=prompt)])
-        result = f"Latest News about '{query}':\n{'=' * 70}\n\n{response.content}"
+        # The prompt only depends on topic and date, so the articles are cached on those
+        articles = yield LLMCall(prompt, "generation", cache=news_cache, cache_key=(normalize_query(query), today))
+        result = heading + articles
     
     except Exception as e:
+        metrics.FALLBACKS.inc(node="news_aggregator", step="generation")
         result = f"Error fetching news: {str(e)}"
     
-    state["agent_responses"]["news_aggregator"] = result
-    state["messages"].append(AIMessage(content=result))
-    return state
+    return {"agent_responses": {"news_aggregator": result}, "messages": [AIMessage(content=result)]}
 
 
-def activity_tracker_node(state: AgentState) -> AgentState:
+def _activity_tracker_steps(state: AgentState):
     """Activity Tracker Agent Node (Kanban Board)"""
     logging.info("Executing Activity Tracker Agent")
     
     user_input = state.get("user_input", "")
     
     # Use LLM to understand user's intent
-    intent_prompt = f"""Analyze this activity/task query and extract the intent in JSON format:
-    
-User query: "{user_input}"
-
-Available activity fields: activity_id, task, employee, status (To Do/In Progress/Completed), priority (High/Medium/Low), progress, due_date
-
-Return JSON with:
-- "query_type": "who_assigned" | "filter_by_status" | "filter_by_employee" | "filter_by_priority" | "count" | "overview" | "task_details"
-- "filter_value": the specific value if filtering
-- "question_type": "who" | "what" | "how_many" | "when" | "list" | "details" | "status_check"
-
-Examples:
-"Who is assigned to design landing page?" -> {{"query_type": "who_assigned", "filter_value": "design landing page", "question_type": "who"}}
-"Show completed tasks" -> {{"query_type": "filter_by_status", "filter_value": "Completed", "question_type": "list"}}
-"What is John working on?" -> {{"query_type": "filter_by_employee", "filter_value": "John", "question_type": "list"}}
-"How many tasks are pending?" -> {{"query_type": "filter_by_status", "filter_value": "To Do", "question_type": "count"}}
-"""
-    
-    try:
-        intent_response = llm.invoke([HumanMessage(content=intent_prompt)])
-        intent = json.loads(intent_response.content.strip())
-        query_type = intent.get("query_type", "overview")
-        filter_value = intent.get("filter_value", "")
-        question_type = intent.get("question_type", "list")
-    except:
-        query_type = "overview"
-        filter_value = ""
-        question_type = "list"
+    intent = yield from resolve_intent("activity_tracker", state, "activity_intent")
+    query_type = intent.get("query_type", "overview")
+    filter_value = intent.get("filter_value", "")
+    question_type = intent.get("question_type", "list")
     
     # Check for "who" questions about specific tasks
     who_match = re.search(r'who\s+(?:is\s+)?(?:assigned|working|responsible|doing|handling)\s+(?:for|on)?\s*["\']?(.+?)["\']?(?:\?|$)', user_input, re.IGNORECASE)
@@ -332,16 +784,13 @@ Examples:
     employee_match = re.search(r'(?:for|by) ([A-Za-z ]+)', user_input, re.IGNORECASE)
     status_match = re.search(r'(to do|todo|pending|in progress|completed|done)', user_input, re.IGNORECASE)
     
+    lazy = None
     try:
         if who_match:
             # Extract task description from "who" question
             task_query = who_match.group(1).strip().lower()
             # Find matching activity by task description
-            matched_activity = None
-            for activity in MOCK_ACTIVITIES:
-                if task_query in activity['task'].lower():
-                    matched_activity = activity
-                    break
+            matched_activity = activity_store.find_task(task_query)
             
             if matched_activity:
                 result = f"{matched_activity['employee']} is assigned to '{matched_activity['task']}' (Status: {matched_activity['status']}, Priority: {matched_activity['priority']}, Progress: {matched_activity['progress']})"
@@ -351,13 +800,13 @@ Examples:
         elif employee_match:
             # Filter by employee
             employee_name = employee_match.group(1).strip()
-            filtered = [a for a in MOCK_ACTIVITIES if employee_name.lower() in a["employee"].lower()]
+            filtered = activity_store.by_employee(employee_name)
             
             if filtered:
-                output = [f"\nActivities for {employee_name} ({len(filtered)} tasks):"]
-                for activity in filtered:
-                    output.append(f"[{activity['activity_id']}] {activity['task']} | Status: {activity['status']} | Priority: {activity['priority']} | Progress: {activity['progress']} | Due: {activity['due_date']}")
-                result = "\n".join(output)
+                lazy = LazyResult([Section(
+                    f"\nActivities for {employee_name} ({len(filtered)} tasks):", filtered,
+                    lambda activity: f"[{activity['activity_id']}] {activity['task']} | Status: {activity['status']} | Priority: {activity['priority']} | Progress: {activity['progress']} | Due: {activity['due_date']}"
+                )])
             else:
                 result = f"No activities found for employee: {employee_name}"
         
@@ -373,105 +822,70 @@ Examples:
             else:
                 status = status_input.title()
             
-            filtered = [a for a in MOCK_ACTIVITIES if a["status"] == status]
+            filtered = activity_store.by_status(status)
             
             if filtered:
-                output = [f"\nActivities - {status} ({len(filtered)} tasks):"]
-                for activity in filtered:
-                    output.append(f"[{activity['activity_id']}] {activity['task']} | Employee: {activity['employee']} | Priority: {activity['priority']} | Progress: {activity['progress']} | Due: {activity['due_date']}")
-                result = "\n".join(output)
+                lazy = LazyResult([Section(
+                    f"\nActivities - {status} ({len(filtered)} tasks):", filtered,
+                    lambda activity: f"[{activity['activity_id']}] {activity['task']} | Employee: {activity['employee']} | Priority: {activity['priority']} | Progress: {activity['progress']} | Due: {activity['due_date']}"
+                )])
             else:
                 result = f"No activities found with status: {status}"
         
         else:
             # Show Kanban board view with all statuses
-            todo = [a for a in MOCK_ACTIVITIES if a["status"] == "To Do"]
-            in_progress = [a for a in MOCK_ACTIVITIES if a["status"] == "In Progress"]
-            completed = [a for a in MOCK_ACTIVITIES if a["status"] == "Completed"]
+            board = activity_store.kanban()
+            todo = board["To Do"]
+            in_progress = board["In Progress"]
+            completed = board["Completed"]
             
-            output = [f"\nActivity Kanban Board (Total: {len(MOCK_ACTIVITIES)} tasks)\n"]
-            
-            output.append(f"TO DO / PENDING ({len(todo)}):")
-            for a in todo:
-                output.append(f"  [{a['activity_id']}] {a['task']} | Employee: {a['employee']} | Priority: {a['priority']} | Due: {a['due_date']}")
-            
-            output.append(f"\nIN PROGRESS ({len(in_progress)}):")
-            for a in in_progress:
-                output.append(f"  [{a['activity_id']}] {a['task']} | Employee: {a['employee']} | Progress: {a['progress']} | Priority: {a['priority']}")
-            
-            output.append(f"\nCOMPLETED ({len(completed)}):")
-            for a in completed:
-                output.append(f"  [{a['activity_id']}] {a['task']} | Employee: {a['employee']} | Completed: 100%")
-            
-            result = "\n".join(output)
+            lazy = LazyResult([
+                Section(f"\nActivity Kanban Board (Total: {len(activity_store)} tasks)\n"),
+                Section(f"TO DO / PENDING ({len(todo)}):", todo,
+                        lambda a: f"  [{a['activity_id']}] {a['task']} | Employee: {a['employee']} | Priority: {a['priority']} | Due: {a['due_date']}"),
+                Section(f"\nIN PROGRESS ({len(in_progress)}):", in_progress,
+                        lambda a: f"  [{a['activity_id']}] {a['task']} | Employee: {a['employee']} | Progress: {a['progress']} | Priority: {a['priority']}"),
+                Section(f"\nCOMPLETED ({len(completed)}):", completed,
+                        lambda a: f"  [{a['activity_id']}] {a['task']} | Employee: {a['employee']} | Completed: 100%")
+            ])
     
     except Exception as e:
+        metrics.FALLBACKS.inc(node="activity_tracker", step="data")
+        lazy = None
         result = f"Error fetching activities: {str(e)}"
     
     # Check if user wants detailed response
     wants_details = any(word in user_input.lower() for word in ['detail', 'full', 'complete', 'comprehensive'])
     
-    # Limit response to 10 lines if not requesting details
-    if not wants_details:
-        result = limit_response(result, max_lines=10)
+    # Render only the first page (10 lines unless details were requested);
+    # the rest stays behind a page cursor
+    result, page_update = paginate("activity_tracker", lazy if lazy is not None else LazyResult.from_text(result), wants_details)
     
     # Enhance result with LLM for natural language questions
     if question_type in ["who", "what", "when", "count", "status_check"] and result:
-        enhance_prompt = f"""User asked: "{user_input}"
-
-Raw data response:
-{result}
-
-Provide a direct, natural answer to the user's specific question. Be concise and precise.
-- If they asked "who", tell them the person's name and what they're doing
-- If they asked "how many", give the count number
-- If they asked "what status", tell them the current status
-- If they asked "when", give the due date
-- Keep it conversational and direct"""
+        enhance_prompt = prompts.render("activity_enhance", user_input=user_input, result=result)
         
         try:
-            enhanced = llm.invoke([HumanMessage(content=enhance_prompt)])
-            result = enhanced.content.strip()
-        except:
+            enhanced = yield answer_call(enhance_prompt, "enhance", optional=True)
+            if enhanced is not None:
+                result = enhanced.strip()
+        except Exception:
+            metrics.FALLBACKS.inc(node="activity_tracker", step="enhance")
             pass  # Keep original result if enhancement fails
     
-    state["agent_responses"]["activity_tracker"] = result
-    state["messages"].append(AIMessage(content=result))
-    return state
+    return {"agent_responses": {"activity_tracker": result}, **page_update, "messages": [AIMessage(content=result)]}
 
 
-def infrastructure_cost_monitor_node(state: AgentState) -> AgentState:
+def _infrastructure_cost_monitor_steps(state: AgentState):
     """Infrastructure Cost Monitor Agent Node"""
     logging.info("Executing Infrastructure Cost Monitor Agent")
     
     user_input = state.get("user_input", "")
     
     # Use LLM to understand user's intent
-    intent_prompt = f"""Analyze this infrastructure cost query and extract the intent in JSON format:
-    
-User query: "{user_input}"
-
-Available providers: AWS, Azure, Google Cloud, Firebase, DigitalOcean, Vercel, Heroku
-
-Return JSON with:
-- "query_type": "specific_provider" | "compare_all" | "overview" | "cheapest" | "most_expensive"
-- "provider": specific provider name if mentioned
-- "question_type": "how_much" | "what" | "which" | "compare" | "list" | "breakdown"
-
-Examples:
-"How much does AWS cost?" -> {{"query_type": "specific_provider", "provider": "AWS", "question_type": "how_much"}}
-"Which is cheaper, AWS or Azure?" -> {{"query_type": "compare_all", "provider": "", "question_type": "which"}}
-"Show me Firebase pricing" -> {{"query_type": "specific_provider", "provider": "Firebase", "question_type": "breakdown"}}
-"""
-    
-    try:
-        intent_response = llm.invoke([HumanMessage(content=intent_prompt)])
-        intent = json.loads(intent_response.content.strip())
-        query_type = intent.get("query_type", "overview")
-        question_type = intent.get("question_type", "list")
-    except:
-        query_type = "overview"
-        question_type = "list"
+    intent = yield from resolve_intent("infrastructure_cost_monitor", state, "cost_intent")
+    query_type = intent.get("query_type", "overview")
+    question_type = intent.get("question_type", "list")
     
     # Extract provider name from user input
     provider_keywords = {
@@ -488,16 +902,88 @@ Examples:
         'heroku': 'Heroku'
     }
     
-    requested_provider = None
+    mentioned_providers = []
     for keyword, provider in provider_keywords.items():
-        if keyword in user_input.lower():
-            requested_provider = provider
-            break
-    
+        if keyword in user_input.lower() and provider not in mentioned_providers:
+            mentioned_providers.append(provider)
+    requested_provider = mentioned_providers[0] if mentioned_providers else None
+    
+    # Cheapest/most expensive/comparison questions are answered directly from
+    # the parsed cost table, so they need no enhance call
+    answered_from_table = False
+    requested_category = cost_table.category_in(user_input)
+    is_comparison = query_type == "compare_all" or 'compare' in user_input.lower() or 'comparison' in user_input.lower() \
+        or len(mentioned_providers) > 1
+    
+    lazy = None
     try:
-        if requested_provider and requested_provider in INFRASTRUCTURE_COSTS:
+        if query_type in ["cheapest", "most_expensive"]:
+            most_expensive = query_type == "most_expensive"
+            label = "Most expensive" if most_expensive else "Cheapest"
+            ranked = cost_table.rank_providers(mentioned_providers or None, descending=most_expensive)
+            picks = (cost_table.most_expensive if most_expensive else cost_table.cheapest)(
+                requested_category, mentioned_providers or None
+            )
+            
+            output = []
+            if not requested_category:
+                top = ranked[0]
+                output.append(f"{label} provider by estimated monthly spend: {top['provider']} "
+                              f"({format_estimate(top['low'], top['high'], '/month')})")
+            if picks:
+                output.append(f"\n{label} option{'' if requested_category else ' per category'}:")
+            else:
+                output.append(f"\nNo provider{' among ' + ', '.join(mentioned_providers) if mentioned_providers else ''} "
+                              f"lists {requested_category} services.")
+            for category, pick in picks.items():
+                output.append(f"{category}: {pick['provider']} {pick['service']} - {format_price(pick['price'], pick['unit'])}")
+            
+            result = "\n".join(output)
+            answered_from_table = True
+        
+        elif is_comparison and requested_category:
+            # Rank the providers that offer the category by its price
+            comparison = cost_table.compare_in_category(requested_category, mentioned_providers or None)
+            output = [f"\nCloud Infrastructure Cost Comparison: {requested_category}"]
+            output.append("=" * 70)
+            if not comparison:
+                output.append(f"No provider{' among ' + ', '.join(mentioned_providers) if mentioned_providers else ''} "
+                              f"lists {requested_category} services.")
+            else:
+                cheapest, priciest = comparison[0], comparison[-1]
+                output.append(f"Cheapest: {cheapest['provider']} {cheapest['service']} ({format_price(cheapest['price'], cheapest['unit'])})")
+                if len(comparison) > 1:
+                    output.append(f"Most expensive: {priciest['provider']} {priciest['service']} ({format_price(priciest['price'], priciest['unit'])})")
+                output.append(f"RANKING BY {requested_category.upper()} PRICE ({cheapest['unit'].replace('/', 'per ', 1)}):")
+                for rank, entry in enumerate(comparison, start=1):
+                    output.append(f"{rank}. {entry['provider']}: {entry['service']} - {format_price(entry['price'], entry['unit'])}")
+            
+            result = "\n".join(output)
+            answered_from_table = True
+        
+        elif is_comparison:
+            # Rank the mentioned providers (or all of them) by estimated spend
+            output = [f"\nCloud Infrastructure Cost Comparison"]
+            output.append("=" * 70)
+            comparison = cost_table.compare(mentioned_providers or None, ["Compute", "Database"])
+            cheapest, priciest = comparison[0], comparison[-1]
+            output.append(f"Cheapest: {cheapest['provider']} ({format_estimate(cheapest['low'], cheapest['high'], '/month')})")
+            if len(comparison) > 1:
+                output.append(f"Most expensive: {priciest['provider']} ({format_estimate(priciest['low'], priciest['high'], '/month')})")
+            output.append("RANKING BY ESTIMATED MONTHLY SPEND:")
+            
+            for rank, entry in enumerate(comparison, start=1):
+                line = f"{rank}. {entry['provider']}: {format_estimate(entry['low'], entry['high'], '/month')}"
+                for category, pick in entry["cheapest"].items():
+                    line += f" | {category}: {format_price(pick['price'], pick['unit'])}"
+                output.append(line)
+            
+            result = "\n".join(output)
+            answered_from_table = True
+        
+        elif requested_provider and requested_provider in cost_table.costs:
             # Show specific provider costs with spending breakdown
-            provider_data = INFRASTRUCTURE_COSTS[requested_provider]
+            provider_data = cost_table.costs[requested_provider]
             output = [f"\n{requested_provider} Infrastructure Cost Analysis"]
             output.append("=" * 70)
             output.append(f"\nESTIMATED MONTHLY SPENDING: {provider_data['total_monthly_estimate']}")
@@ -531,31 +1017,6 @@ Examples:
             
             result = "\n".join(output)
         
-        elif 'compare' in user_input.lower() or 'comparison' in user_input.lower():
-            # Compare all providers
-            output = [f"\nCloud Infrastructure Cost Comparison"]
-            output.append("=" * 70)
-            output.append("\nPROVIDER COST OVERVIEW:")
-            output.append("-" * 70)
-            
-            for provider, data in INFRASTRUCTURE_COSTS.items():
-                output.append(f"\n{provider}")
-                output.append(f"Monthly Spending Estimate: {data['total_monthly_estimate']}")
-                output.append(f"Services Tracked: {len(data['services'])}")
-                
-                # Show key services
-                compute = next((s for s in data['services'] if s['category'] == 'Compute'), None)
-                if compute:
-                    output.append(f"Compute Cost: {compute.get('price_per_month', compute.get('price_per_hour', 'N/A'))}")
-                
-                database = next((s for s in data['services'] if s['category'] == 'Database'), None)
-                if database:
-                    output.append(f"Database Cost: {database.get('price_per_month', 'Varies')}")
-                
-                output.append("-" * 70)
-            
-            result = "\n".join(output)
-        
         else:
             # Show all providers overview with spending summary
             output = [f"\nInfrastructure Cost Monitor - All Providers Overview"]
@@ -563,7 +1024,7 @@ Examples:
             output.append("\nAVAILABLE CLOUD PROVIDERS:")
             output.append("-" * 70)
             
-            for provider, data in INFRASTRUCTURE_COSTS.items():
+            for provider, data in cost_table.costs.items():
                 output.append(f"\n{provider}")
                 output.append(f"Monthly Spending Estimate: {data['total_monthly_estimate']}")
                 output.append(f"Services Monitored: {len(data['services'])}")
@@ -576,69 +1037,48 @@ Examples:
             result = "\n".join(output)
     
     except Exception as e:
+        metrics.FALLBACKS.inc(node="infrastructure_cost_monitor", step="data")
+        lazy = None
         result = f"Error fetching infrastructure costs: {str(e)}"
     
     # Check if user wants detailed response
     wants_details = any(word in user_input.lower() for word in ['detail', 'full', 'complete', 'comprehensive'])
     
-    # Limit response to 10 lines if not requesting details
-    if not wants_details:
-        result = limit_response(result, max_lines=10)
+    # Render only the first page (10 lines unless details were requested);
+    # the rest stays behind a page cursor
+    result, page_update = paginate("infrastructure_cost_monitor", lazy if lazy is not None else LazyResult.from_text(result), wants_details)
     
     # Enhance result with LLM for natural language questions
-    if question_type in ["how_much", "what", "which", "compare"] and result:
-        enhance_prompt = f"""User asked: "{user_input}"
-
-Raw data response:
-{result}
-
-Provide a direct, natural answer to the user's specific question. Be concise and precise.
-- If they asked "how much", give the specific cost/estimate
-- If they asked "which is cheaper", compare and state which one
-- If they asked "what services", list the key services
-- Keep it conversational and direct"""
+    if question_type in ["how_much", "what", "which", "compare"] and result and not answered_from_table:
+        enhance_prompt = prompts.render("cost_enhance", user_input=user_input, result=result)
         
         try:
-            enhanced = llm.invoke([HumanMessage(content=enhance_prompt)])
-            result = enhanced.content.strip()
-        except:
+            enhanced = yield answer_call(enhance_prompt, "enhance", optional=True)
+            if enhanced is not None:
+                result = enhanced.strip()
+        except Exception:
+            metrics.FALLBACKS.inc(node="infrastructure_cost_monitor", step="enhance")
             pass  # Keep original result if enhancement fails
     
-    state["agent_responses"]["infrastructure_cost_monitor"] = result
-    state["messages"].append(AIMessage(content=result))
-    return state
+    return {"agent_responses": {"infrastructure_cost_monitor": result}, **page_update, "messages": [AIMessage(content=result)]}
 
 
-def chat_node(state: AgentState) -> AgentState:
+def _chat_steps(state: AgentState):
     """Chat Agent Node - General conversation and company information"""
     logging.info("Executing Chat Agent")
     
     user_input = state.get("user_input", "")
     
-    # Use LLM to understand user's intent
-    intent_prompt = f"""Analyze this general query and extract the intent in JSON format:
-    
-User query: "{user_input}"
-
-Return JSON with:
-- "query_type": "company_info" | "greeting" | "help" | "general_question" | "goodbye"
-- "specific_topic": what they're asking about (e.g., "services", "team", "mission", "location", etc.)
-- "question_type": "what" | "who" | "where" | "when" | "how" | "why" | "greeting"
-
-Examples:
-"What services do you offer?" -> {{"query_type": "company_info", "specific_topic": "services", "question_type": "what"}}
-"Hello" -> {{"query_type": "greeting", "specific_topic": "", "question_type": "greeting"}}
-"Where is Technology-Garage located?" -> {{"query_type": "company_info", "specific_topic": "location", "question_type": "where"}}
-"""
+    # Single facts ("Where is Technology-Garage located?") are answered from
+    # the company index without an intent or generation call
+    if is_company_fact(user_input):
+        fact = company_index.answer(user_input)
+        return {"agent_responses": {"chat": fact}, "messages": [AIMessage(content=fact)]}
     
-    try:
-        intent_response = llm.invoke([HumanMessage(content=intent_prompt)])
-        intent = json.loads(intent_response.content.strip())
-        query_type = intent.get("query_type", "general_question")
-        specific_topic = intent.get("specific_topic", "")
-    except:
-        query_type = "general_question"
-        specific_topic = ""
+    # Use LLM to understand user's intent
+    intent = yield from resolve_intent("chat", state, "chat_intent")
+    query_type = intent.get("query_type", "general_question")
+    specific_topic = intent.get("specific_topic", "")
     
     # Check if user is asking about company information
     company_keywords = ['company', 'technology-garage', 'about', 'services', 'team', 'mission', 'vision']
@@ -646,267 +1086,510 @@ Examples:
     
     try:
         if is_company_query:
-            # Provide company information
-            prompt = f"""
-            You are a helpful assistant for Technology-Garage company.
-            
-            Company Information:
-            {json.dumps(COMPANY_INFO, indent=2)}
-            
-            User question: {user_input}
-            
-            Provide a direct, specific answer to their question based on the company information above.
-            If they ask about something specific (e.g., location, services, team size), answer that directly.
-            Be friendly, professional, and concise.
-            """
+            # Provide only the company fields the question is about
+            company_info = company_index.excerpt(user_input, specific_topic)
+            prompt = prompts.render("company_chat", company_info=company_info, user_input=user_input)
         else:
             # General conversation
-            prompt = f"""
-            You are a helpful assistant for Technology-Garage, a technology solutions company.
-            You can help with general questions and conversations.
-            
-            User: {user_input}
-            
-            Provide a helpful, friendly, and natural response.
-            If it's a greeting, respond warmly.
-            If they need help, guide them on what you can assist with.
-            """
+            prompt = prompts.render("general_chat", user_input=user_input)
         
-        response = llm.invoke([HumanMessage(content=prompt)])
-        result = response.content
+        result = yield answer_call(prompt, "generation")
     
     except Exception as e:
+        metrics.FALLBACKS.inc(node="chat", step="generation")
         result = f"Chat error: {str(e)}"
     
-    state["agent_responses"]["chat"] = result
-    state["messages"].append(AIMessage(content=result))
-    return state
+    return {"agent_responses": {"chat": result}, "messages": [AIMessage(content=result)]}
+
+
+# Phrases asking for a complete overview, which runs every agent without a planning call
+ROUTER_OVERVIEW_KEYWORDS = [
+    'summary of everything', 'everything happening', 'complete summary', 'full overview',
+    'everything going on', 'all updates', 'comprehensive summary', 'overall status',
+    'whats happening', "what's happening", 'status of everything', 'complete update',
+    'full status', 'everything status', 'overall summary'
+]
+
+
+def is_overview_request(user_input: str) -> bool:
+    return any(keyword in user_input.lower() for keyword in ROUTER_OVERVIEW_KEYWORDS)
+
 
+def needs_routing_call(user_input: str) -> bool:
+    """Whether the router would have to make a planning LLM call for this input"""
+    if is_overview_request(user_input) or is_company_fact(user_input):
+        return False
+    return normalize_query(user_input) not in router_cache
 
-def router_node(state: AgentState) -> AgentState:
+
+def store_plan(cache_key: str, parsed: dict) -> tuple:
+    """Turn a planning reply into (agents_to_run, agent_intents) and cache it"""
+    agents_to_run = parsed.get("agents", ["ChatAgent"])
+    agent_intents = {
+        AGENT_NODE_MAP[agent]: intent
+        for agent, intent in (parsed.get("intents") or {}).items()
+        if agent in AGENT_NODE_MAP and isinstance(intent, dict)
+    }
+    router_cache.set(cache_key, {"agents": list(agents_to_run), "intents": dict(agent_intents)})
+    return agents_to_run, agent_intents
+
+
+def _router_steps(state: AgentState):
     """Router node to determine which agents to run"""
     logging.info("Executing Router Node")
     
     user_input = state["user_input"]
     
     # Check if user wants a complete overview/summary of everything
-    overview_keywords = [
-        'summary of everything', 'everything happening', 'complete summary', 'full overview',
-        'everything going on', 'all updates', 'comprehensive summary', 'overall status',
-        'whats happening', "what's happening", 'status of everything', 'complete update',
-        'full status', 'everything status', 'overall summary'
-    ]
+    if is_overview_request(user_input):
+        # User wants everything - invoke all agents, each with its overview intent
+        logging.info("Complete overview requested - activating all agents")
+        return {
+            "agents_to_run": [
+                "TicketAnalyzerAgent",
+                "NewsAggregatorAgent", 
+                "ActivityTrackerAgent",
+                "InfrastructureCostMonitorAgent"
+            ],
+            "agent_intents": dict(OVERVIEW_INTENTS)
+        }
     
-    is_complete_overview = any(keyword in user_input.lower() for keyword in overview_keywords)
+    # A single company fact only needs the chat agent's index
+    if is_company_fact(user_input):
+        logging.info("Company fact - routing to ChatAgent")
+        return {"agents_to_run": ["ChatAgent"], "agent_intents": {}}
     
-    if is_complete_overview:
-        # User wants everything - invoke all agents
-        logging.info("Complete overview requested - activating all agents")
-        state["agents_to_run"] = [
-            "TicketAnalyzerAgent",
-            "NewsAggregatorAgent", 
-            "ActivityTrackerAgent",
-            "InfrastructureCostMonitorAgent"
-        ]
-        return state
-    
-    prompt = f"""
-    You are an intelligent router AI for Technology-Garage company assistant. Decide which agents should handle this input:
-
-    Available agents:
-    - TicketAnalyzerAgent: Handles ticket queries (employees, players, parents tickets)
-    - NewsAggregatorAgent: Fetches latest news articles
-    - ActivityTrackerAgent: Shows employee activities and task tracking
-    - InfrastructureCostMonitorAgent: Monitors cloud infrastructure costs (AWS, Azure, Google Cloud, Firebase, DigitalOcean, Vercel, Heroku)
-    - ChatAgent: General conversation and company information
-
-    User input: "{user_input}"
-
-    Respond in JSON format with the agents that should handle this query:
-    {{"agents": ["AgentName1", "AgentName2", ...]}}
-    
-    Examples:
-    - "Show me all tickets" -> {{"agents": ["TicketAnalyzerAgent"]}}
-    - "What's the latest news?" -> {{"agents": ["NewsAggregatorAgent"]}}
-    - "Show activities for John" -> {{"agents": ["ActivityTrackerAgent"]}}
-    - "AWS costs" or "infrastructure pricing" -> {{"agents": ["InfrastructureCostMonitorAgent"]}}
-    - "Tell me about the company" -> {{"agents": ["ChatAgent"]}}
-    - "What tickets are open and latest news" -> {{"agents": ["TicketAnalyzerAgent", "NewsAggregatorAgent"]}}
-    """
+    # Repeated phrasings reuse the cached plan
+    cache_key = normalize_query(user_input)
+    cached_plan = router_cache.get(cache_key)
+    if cached_plan is not None:
+        logging.info("Router cache hit")
+        return {"agents_to_run": list(cached_plan["agents"]), "agent_intents": dict(cached_plan["intents"])}
+    
+    # One planning call returns both the agents to run and each agent's intent,
+    # so the agent nodes don't need their own intent LLM calls
+    prompt = prompts.render("router", user_input=user_input)
     
     try:
-        response = llm.invoke([HumanMessage(content=prompt)])
-        parsed = json.loads(response.content.strip())
-        
-        state["agents_to_run"] = parsed.get("agents", ["ChatAgent"])
+        routing = yield LLMCall(prompt, "routing")
+        agents_to_run, agent_intents = store_plan(cache_key, json.loads(routing.strip()))
         
     except Exception as e:
         logging.error(f"Router error: {e}")
-        state["agents_to_run"] = ["ChatAgent"]
+        metrics.FALLBACKS.inc(node="router", step="routing")
+        agents_to_run = ["ChatAgent"]
+        agent_intents = {}
     
-    return state
+    return {"agents_to_run": agents_to_run, "agent_intents": agent_intents}
 
 
-def should_continue(state: AgentState) -> str:
-    """Conditional edge to determine next agent"""
+def should_continue(state: AgentState) -> list:
+    """Conditional edge that fans out to every selected agent at once.
+    
+    The returned nodes run in the same LangGraph superstep, so their results
+    are merged into agent_responses and summarize runs once all are done.
+    """
     agents_to_run = state.get("agents_to_run", [])
     
-    if not agents_to_run:
-        return "summarize"
+    # Unknown agents fall back to chat; duplicates would run the same node twice
+    next_nodes = []
+    for agent in agents_to_run:
+        node = AGENT_NODE_MAP.get(agent, "chat")
+        if node not in next_nodes:
+            next_nodes.append(node)
+    
+    return next_nodes or ["summarize"]
+
+
+def combined_responses(agent_responses: dict) -> str:
+    """All agent responses under a heading each, unsummarized"""
+    return "\n\n".join([f"=== {k.upper().replace('_', ' ')} ===\n{v}" for k, v in agent_responses.items()])
+
+
+def summary_prompt(user_input: str, agent_responses: dict) -> tuple:
+    """Return (result, prompt) for the final answer.
     
-    next_agent = agents_to_run.pop(0)
-    state["agents_to_run"] = agents_to_run
+    The prompt is None when no LLM summary is needed and result is the
+    answer itself; otherwise result is None and the prompt must be sent.
+    """
+    if not agent_responses:
+        return "No responses to summarize.", None
+    if len(agent_responses) == 1:
+        # If only one agent responded, return its response directly without summarization
+        return list(agent_responses.values())[0], None
     
-    agent_map = {
-        "TicketAnalyzerAgent": "ticket_analyzer",
-        "NewsAggregatorAgent": "news_aggregator",
-        "ActivityTrackerAgent": "activity_tracker",
-        "InfrastructureCostMonitorAgent": "infrastructure_cost_monitor",
-        "ChatAgent": "chat"
-    }
+    # Multiple agents - create intelligent analysis
+    # Check if this is a complete overview request
+    overview_keywords = [
+        'summary of everything', 'everything happening', 'complete summary', 'full overview',
+        'everything going on', 'all updates', 'comprehensive summary', 'overall status',
+        'whats happening', "what's happening", 'status of everything', 'complete update'
+    ]
+    is_complete_overview = any(keyword in user_input.lower() for keyword in overview_keywords)
+    
+    # Format all agent responses
+    responses_text = combined_responses(agent_responses)
     
-    return agent_map.get(next_agent, "chat")
+    if is_complete_overview:
+        # Comprehensive analysis for "everything happening" requests
+        prompt = prompts.render("overview_summary", user_input=user_input, responses_text=responses_text)
+    else:
+        # Standard multi-agent summary
+        prompt = prompts.render("summary", responses_text=responses_text)
+    return None, prompt
 
 
-def summarize_node(state: AgentState) -> AgentState:
+def finalize_summary(user_input: str, summary: str) -> str:
+    """Trim a generated summary to 10 lines unless the user asked for details"""
+    result = summary.strip()
+    
+    # Check if user wants detailed response
+    wants_details = any(word in user_input.lower() for word in ['detail', 'full', 'complete', 'comprehensive', 'everything'])
+    
+    # Limit summary to 10 lines by default (for all cases unless user asks for details)
+    if not wants_details:
+        result = limit_response(result, max_lines=10)
+    return result
+
+
+def _summarize_steps(state: AgentState):
     """Summarize all agent responses"""
     logging.info("Executing Summarize Node")
     
     agent_responses = state.get("agent_responses", {})
     user_input = state.get("user_input", "")
     
-    if not agent_responses:
-        result = "No responses to summarize."
-    elif len(agent_responses) == 1:
-        # If only one agent responded, return its response directly without summarization
-        result = list(agent_responses.values())[0]
-    else:
-        # Multiple agents - create intelligent analysis
-        # Check if this is a complete overview request
-        overview_keywords = [
-            'summary of everything', 'everything happening', 'complete summary', 'full overview',
-            'everything going on', 'all updates', 'comprehensive summary', 'overall status',
-            'whats happening', "what's happening", 'status of everything', 'complete update'
-        ]
-        is_complete_overview = any(keyword in user_input.lower() for keyword in overview_keywords)
-        
-        # Format all agent responses
-        responses_text = "\n\n".join([f"=== {k.upper().replace('_', ' ')} ===\n{v}" for k, v in agent_responses.items()])
-        
-        if is_complete_overview:
-            # Comprehensive analysis for "everything happening" requests
-            prompt = f"""You are an intelligent business analyst for Technology-Garage company. 
+    result, prompt = summary_prompt(user_input, agent_responses)
+    if prompt:
+        try:
+            summary = yield answer_call(prompt, "summary", optional=True)
+            # Without time for a summary, answer with the raw agent responses
+            if summary is None:
+                result = combined_responses(agent_responses)
+            else:
+                result = finalize_summary(user_input, summary)
+        except Exception as e:
+            metrics.FALLBACKS.inc(node="summarize", step="summary")
+            result = f"Error creating summary: {str(e)}"
+    
+    return {"messages": [AIMessage(content=result)]}
 
-The user asked: "{user_input}"
 
-Here are reports from all departments:
+# ==================== NODE VARIANTS ====================
 
-{responses_text}
+def ticket_analyzer_node(state: AgentState) -> dict:
+    """Ticket Analyzer Agent Node"""
+    return run_steps(_ticket_analyzer_steps(state), "ticket_analyzer", state.get("deadline"))
 
-Create a CONCISE executive summary (max 10 lines) that covers:
-1. **Key Priorities & Issues** - Most critical blockers
-2. **Current Status** - Overall health snapshot
-3. **Notable Updates** - Top 1-2 recent developments
-4. **Quick Recommendations** - Top 1-2 immediate actions
 
-Format as bullet points. Be ultra-concise - assume busy executive reading in 30 seconds.
-NO long paragraphs. Each section: max 1-2 lines.
-"""
-        else:
-            # Standard multi-agent summary
-            prompt = f"""
-            You are a helpful assistant. Create a single, clear, and concise summary from these agent responses.
-            Include at least one key point from EVERY agent's response.
-            Do NOT repeat agent names in the summary.
-            Keep it within 10 lines maximum.
-            
-            {responses_text}
-            """
-        
-        try:
-            response = llm.invoke([HumanMessage(content=prompt)])
-            result = response.content.strip()
-            
-            # Check if user wants detailed response
-            wants_details = any(word in user_input.lower() for word in ['detail', 'full', 'complete', 'comprehensive', 'everything'])
-            
-            # Limit summary to 10 lines by default (for all cases unless user asks for details)
-            if not wants_details:
-                result = limit_response(result, max_lines=10)
-        except Exception as e:
-            result = f"Error creating summary: {str(e)}"
-    
-    state["messages"].append(AIMessage(content=result))
-    return state
+async def aticket_analyzer_node(state: AgentState) -> dict:
+    """Ticket Analyzer Agent Node (async)"""
+    return await arun_steps(_ticket_analyzer_steps(state), "ticket_analyzer", state.get("deadline"),
+                            offload=data_backend.blocking)
+
+
+def news_aggregator_node(state: AgentState) -> dict:
+    """News Article Aggregator Agent Node"""
+    return run_steps(_news_aggregator_steps(state), "news_aggregator", state.get("deadline"))
+
+
+async def anews_aggregator_node(state: AgentState) -> dict:
+    """News Article Aggregator Agent Node (async)"""
+    return await arun_steps(_news_aggregator_steps(state), "news_aggregator", state.get("deadline"))
+
+
+def activity_tracker_node(state: AgentState) -> dict:
+    """Activity Tracker Agent Node (Kanban Board)"""
+    return run_steps(_activity_tracker_steps(state), "activity_tracker", state.get("deadline"))
+
+
+async def aactivity_tracker_node(state: AgentState) -> dict:
+    """Activity Tracker Agent Node (Kanban Board) (async)"""
+    return await arun_steps(_activity_tracker_steps(state), "activity_tracker", state.get("deadline"),
+                            offload=data_backend.blocking)
+
+
+def infrastructure_cost_monitor_node(state: AgentState) -> dict:
+    """Infrastructure Cost Monitor Agent Node"""
+    return run_steps(_infrastructure_cost_monitor_steps(state), "infrastructure_cost_monitor", state.get("deadline"))
+
+
+async def ainfrastructure_cost_monitor_node(state: AgentState) -> dict:
+    """Infrastructure Cost Monitor Agent Node (async)"""
+    return await arun_steps(_infrastructure_cost_monitor_steps(state), "infrastructure_cost_monitor", state.get("deadline"))
+
+
+def chat_node(state: AgentState) -> dict:
+    """Chat Agent Node"""
+    return run_steps(_chat_steps(state), "chat", state.get("deadline"))
+
+
+async def achat_node(state: AgentState) -> dict:
+    """Chat Agent Node (async)"""
+    return await arun_steps(_chat_steps(state), "chat", state.get("deadline"))
+
+
+def router_node(state: AgentState) -> dict:
+    """Router node to determine which agents to run"""
+    return run_steps(_router_steps(state), "router", state.get("deadline"))
+
+
+async def arouter_node(state: AgentState) -> dict:
+    """Router node to determine which agents to run (async)"""
+    # The cached-plan lookup may read the shared cache file
+    return await arun_steps(_router_steps(state), "router", state.get("deadline"), offload=shared_cache is not None)
+
+
+def summarize_node(state: AgentState) -> dict:
+    """Summarize all agent responses"""
+    return run_steps(_summarize_steps(state), "summarize", state.get("deadline"))
+
+
+async def asummarize_node(state: AgentState) -> dict:
+    """Summarize all agent responses (async)"""
+    return await arun_steps(_summarize_steps(state), "summarize", state.get("deadline"))
+
+
+# Graph node name -> (sync variant, async variant)
+NODE_FUNCTIONS = {
+    "ticket_analyzer": (ticket_analyzer_node, aticket_analyzer_node),
+    "news_aggregator": (news_aggregator_node, anews_aggregator_node),
+    "activity_tracker": (activity_tracker_node, aactivity_tracker_node),
+    "infrastructure_cost_monitor": (infrastructure_cost_monitor_node, ainfrastructure_cost_monitor_node),
+    "chat": (chat_node, achat_node),
+    "router": (router_node, arouter_node),
+    "summarize": (summarize_node, asummarize_node)
+}
 
 
 # ==================== BUILD LANGGRAPH ====================
 
-def build_graph():
-    """Build the LangGraph workflow"""
+def build_graph(use_async: bool = False, with_summary: bool = True):
+    """Build the LangGraph workflow.
+    
+    With use_async the graph is made of the async node variants and must be
+    run with ainvoke, so model calls never block the event loop. Without
+    with_summary the graph ends after the agents, for callers that produce
+    the summary themselves (e.g. token streaming).
+    """
+    from langgraph.graph import StateGraph, END
+    
     workflow = StateGraph(AgentState)
     
     # Add nodes
-    workflow.add_node("router", router_node)
-    workflow.add_node("ticket_analyzer", ticket_analyzer_node)
-    workflow.add_node("news_aggregator", news_aggregator_node)
-    workflow.add_node("activity_tracker", activity_tracker_node)
-    workflow.add_node("infrastructure_cost_monitor", infrastructure_cost_monitor_node)
-    workflow.add_node("chat", chat_node)
-    workflow.add_node("summarize", summarize_node)
+    for name, (sync_node, async_node) in NODE_FUNCTIONS.items():
+        if name == "summarize" and not with_summary:
+            continue
+        workflow.add_node(name, async_node if use_async else sync_node)
     
     # Set entry point
     workflow.set_entry_point("router")
     
-    # Add conditional edges from router
+    # Fan out from router to all selected agents in parallel
+    after_agents = "summarize" if with_summary else END
     workflow.add_conditional_edges(
         "router",
         should_continue,
-        {
-            "ticket_analyzer": "ticket_analyzer",
-            "news_aggregator": "news_aggregator",
-            "activity_tracker": "activity_tracker",
-            "infrastructure_cost_monitor": "infrastructure_cost_monitor",
-            "chat": "chat",
-            "summarize": "summarize"
-        }
+        {**{node: node for node in AGENT_NODE_MAP.values()}, "summarize": after_agents}
     )
     
-    # Add edges from each agent back to conditional router
-    for agent in ["ticket_analyzer", "news_aggregator", "activity_tracker", "infrastructure_cost_monitor", "chat"]:
-        workflow.add_conditional_edges(
-            agent,
-            should_continue,
-            {
-                "ticket_analyzer": "ticket_analyzer",
-                "news_aggregator": "news_aggregator",
-                "activity_tracker": "activity_tracker",
-                "infrastructure_cost_monitor": "infrastructure_cost_monitor",
-                "chat": "chat",
-                "summarize": "summarize"
-            }
-        )
+    # Fan in: summarize waits for every agent that ran in this step
+    for agent in AGENT_NODE_MAP.values():
+        workflow.add_edge(agent, after_agents)
     
     # Summarize ends the workflow
-    workflow.add_edge("summarize", END)
+    if with_summary:
+        workflow.add_edge("summarize", END)
     
     return workflow.compile()
 
 
-# Create the graph
-graph = build_graph()
+# The graphs, compiled on first use: sync for scripts, async for the API,
+# and async without summary for token streaming
+GRAPH_VARIANTS = {
+    "graph": {},
+    "async_graph": {"use_async": True},
+    "stream_graph": {"use_async": True, "with_summary": False}
+}
+_graphs = {}
+
+
+def get_graph(name: str = "graph"):
+    """A compiled graph variant, built on first use"""
+    if name not in _graphs:
+        with _init_lock:
+            if name not in _graphs:
+                _graphs[name] = build_graph(**GRAPH_VARIANTS[name])
+    return _graphs[name]
+
+
+def __getattr__(name: str):
+    # Keeps main.graph / main.async_graph / main.stream_graph working for callers
+    if name in GRAPH_VARIANTS:
+        return get_graph(name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+async def warm_up() -> dict:
+    """Create the LLM client, compile the graphs and open the provider connection.
+    
+    Returns the seconds spent on each step. A failed connection is reported
+    rather than raised; requests then connect on demand as before.
+    """
+    timings = {}
+    loop = asyncio.get_running_loop()
+    
+    # Imports and compilation are blocking, so they run off the event loop
+    start = time.perf_counter()
+    client = await loop.run_in_executor(None, get_llm)
+    timings["llm_client"] = round(time.perf_counter() - start, 4)
+    
+    for name in GRAPH_VARIANTS:
+        start = time.perf_counter()
+        await loop.run_in_executor(None, get_graph, name)
+        timings[name] = round(time.perf_counter() - start, 4)
+    
+    # A cheap authenticated request opens the pooled TLS connection that the
+    # async client reuses for the first real model call
+    root_client = getattr(client, "root_async_client", None)
+    if root_client is not None:
+        start = time.perf_counter()
+        try:
+            await asyncio.wait_for(root_client.models.list(), LLM_CALL_TIMEOUT)
+            timings["provider_connection"] = round(time.perf_counter() - start, 4)
+        except Exception as e:
+            logging.warning(f"Warm-up could not reach the model provider: {e}")
+            timings["provider_connection_error"] = str(e)
+    
+    # Exact prompt token counts need the tokenizer, which may be downloaded
+    start = time.perf_counter()
+    await loop.run_in_executor(None, prompts.load_tokenizer, getattr(client, "model_name", "gpt-4o"))
+    timings["tokenizer"] = round(time.perf_counter() - start, 4)
+    
+    logging.info(f"Warm-up finished: {timings}")
+    return timings
 
 
 # ==================== FASTAPI ENDPOINTS ====================
 
+def new_state(user_input: str, budget: Optional[float] = None) -> dict:
+    """Initial graph state for a user message, due within budget seconds"""
+    return {
+        "messages": [HumanMessage(content=user_input)],
+        "user_input": user_input,
+        "agent_responses": {},
+        "raw_responses": {},
+        "results": {},
+        "cursors": {},
+        "next_agent": "",
+        "agents_to_run": [],
+        "agent_intents": {},
+        "deadline": time.monotonic() + (REQUEST_DEADLINE if budget is None else budget),
+        "shed_steps": []
+    }
+
+
+def sse_event(event: str, data: dict) -> str:
+    """Format one Server-Sent Event"""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
 class ChatMessage(BaseModel):
     message: str
+    budget: Optional[float] = None  # seconds; defaults to REQUEST_DEADLINE
+    session_id: Optional[str] = None  # a new one is issued when missing
 
 class ChatResponse(BaseModel):
     response: str
     query_type: str
     execution_time: str
     agent_responses: dict = None
+    shed_steps: list = []
+    session_id: Optional[str] = None
+    cursor: Optional[str] = None  # pass to /chat/next for the next page
+
+
+class BatchRequest(BaseModel):
+    messages: List[str]
+    budget: Optional[float] = None  # seconds per message; defaults to REQUEST_DEADLINE
+    concurrency: Optional[int] = None  # lowers BATCH_CONCURRENCY for this batch
+
+class BatchItem(BaseModel):
+    index: int
+    message: str
+    response: Optional[str] = None
+    query_type: Optional[str] = None
+    execution_time: str
+    agent_responses: dict = None
+    shed_steps: list = []
+    cursor: Optional[str] = None
+    duplicate_of: Optional[int] = None  # index of the identical message whose result this reuses
+    error: Optional[str] = None
+
+class BatchResponse(BaseModel):
+    results: List[BatchItem]
+    unique_messages: int
+    planned_routes: int
+    execution_time: str
+
+
+def page_response(responses: dict, cursor: Optional[str], start_time: float, session_id: Optional[str] = None) -> ChatResponse:
+    """ChatResponse for a page of stored agent results"""
+    return ChatResponse(
+        response=next(iter(responses.values())) if len(responses) == 1 else combined_responses(responses),
+        query_type=", ".join(responses.keys()),
+        execution_time=f"{(time.time() - start_time):.2f}s",
+        agent_responses=responses,
+        session_id=session_id,
+        cursor=cursor
+    )
+
+
+def remember_results(session_id: Optional[str], agent_responses: dict, raw_responses: dict, cursor: Optional[str],
+                     results: Optional[dict] = None) -> str:
+    """Keep a turn's agent answers, paged results and page cursor for the session; returns the session ID"""
+    session_id = session_id or uuid.uuid4().hex
+    responses = {**agent_responses, **raw_responses}
+    if responses:
+        session_store.set(session_id, {"responses": responses, "results": results or {}, "cursor": cursor})
+    return session_id
+
+
+async def off_data_loop(fn, *args):
+    """fn(*args), in the default executor when the data backend does blocking reads (page renders)"""
+    if data_backend.blocking:
+        return await asyncio.get_running_loop().run_in_executor(None, fn, *args)
+    return fn(*args)
+
+
+def follow_up_response(chat_message: ChatMessage) -> Optional[ChatResponse]:
+    """Answer a "full details"/"show more" follow-up from the session's last results.
+    
+    "Full details" renders every stored agent result again from its first
+    line with the details page size, and repeats the raw (un-rephrased)
+    answers of the other agents. "Show more" continues from the session's
+    page cursor when the last answer was cut short. Returns None when the
+    message isn't such a follow-up or nothing is stored for the session,
+    and the message goes through the graph instead.
+    """
+    if not chat_message.session_id or not is_follow_up(chat_message.message):
+        return None
+    stored = session_store.get(chat_message.session_id)
+    if not stored:
+        return None
+    
+    logging.info("Answering follow-up from the session's stored results")
+    start_time = time.time()
+    if wants_next_page(chat_message.message):
+        paged = next_pages(stored["cursor"], DETAILS_PAGE_LINES) if stored["cursor"] else None
+    else:
+        paged = detail_pages(stored["responses"], stored["results"])
+    if paged is None:
+        return page_response(stored["responses"], None, start_time, chat_message.session_id)
+    
+    responses, cursor = paged
+    session_store.set(chat_message.session_id, {"responses": responses, "results": stored["results"], "cursor": cursor})
+    return page_response(responses, cursor, start_time, chat_message.session_id)
 
 
 @app.get("/health")
@@ -914,52 +1597,369 @@ async def health_check():
     return {"status": "healthy", "service": "LangGraph Multi-Agent API"}
 
 
+@app.get("/warmup")
+async def warmup_endpoint():
+    """Warm the process up before it takes traffic (e.g. from a readiness probe)"""
+    return {"status": "warm", "timings": await warm_up()}
+
+
+@app.get("/stats")
+async def get_stats():
+    return {
+        "intent": intent_engine.stats(),
+        "router_cache": router_cache.stats(),
+        "intent_cache": intent_cache.stats(),
+        "news_cache": news_cache.stats(),
+        "answer_cache": answer_cache.stats(),
+        "shared_cache": await asyncio.get_running_loop().run_in_executor(None, shared_cache.stats) if shared_cache is not None else None,
+        "chat_coalescing": chat_coalescer.stats(),
+        "sessions": session_store.stats(),
+        "cursors": cursor_store.stats(),
+        "prompts": prompts.stats(),
+        "llm_limiter": llm_limiter.stats(),
+        "chat_admission": chat_admission.stats(),
+        "news_fetch": news_client.stats() if news_client is not None else None,
+        "data_backend": data_backend.stats()
+    }
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def get_metrics():
+    """Prometheus metrics in the text exposition format"""
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+
 @app.get("/terminal-output", response_class=PlainTextResponse)
 async def terminal_output():
     return latest_agent_output
 
 
-@app.post("/chat", response_model=ChatResponse)
-async def chat_endpoint(chat_message: ChatMessage):
+async def run_chat(user_input: str, budget: Optional[float] = None) -> dict:
+    """Run the async graph for one message.
+    
+    Returns the ChatResponse fields plus the raw_responses and paged results
+    kept for follow-ups; the caller adds its session, since coalesced callers share
+    this result.
+    """
     global latest_agent_output
     
+    start_time = time.time()
+    
+    # Initialize state
+    initial_state = new_state(user_input, budget)
+    
+    # Run the graph without blocking the event loop
+    result = await get_graph("async_graph").ainvoke(initial_state)
+    
+    # Extract final response
+    final_message = result["messages"][-1].content
+    agent_responses = result.get("agent_responses", {})
+    
+    execution_time = f"{(time.time() - start_time):.2f}s"
+    
+    latest_agent_output = final_message
+    
+    logging.info(f"Response generated in {execution_time}")
+    
+    return {
+        "response": final_message,
+        "query_type": ", ".join(agent_responses.keys()),
+        "execution_time": execution_time,
+        "agent_responses": agent_responses,
+        "shed_steps": result.get("shed_steps", []),
+        "cursor": register_cursor(result.get("cursors")),
+        "raw_responses": result.get("raw_responses", {}),
+        "results": result.get("results", {})
+    }
+
+
+async def admitted_chat(user_input: str, budget: Optional[float] = None) -> dict:
+    """run_chat once the admission queue has a slot for it"""
+    async with chat_admission.slot():
+        return await run_chat(user_input, budget)
+
+
+def busy_error(endpoint: str, e: QueueFull) -> HTTPException:
+    logging.warning(f"Rejecting {endpoint} request: admission queue full")
+    metrics.REQUESTS_REJECTED.inc(endpoint=endpoint)
+    return HTTPException(status_code=429, detail=str(e), headers={"Retry-After": str(e.retry_after)})
+
+
+@app.post("/chat", response_model=ChatResponse)
+async def chat_endpoint(chat_message: ChatMessage):
     try:
-        start_time = time.time()
+        global latest_agent_output
         user_input = chat_message.message
         logging.info(f"Received /chat request: {user_input}")
         
-        # Initialize state
-        initial_state = {
-            "messages": [HumanMessage(content=user_input)],
-            "user_input": user_input,
-            "agent_responses": {},
-            "next_agent": "",
-            "agents_to_run": []
-        }
+        # "full details" / "show more" is served from the previous turn
+        follow_up = await off_data_loop(follow_up_response, chat_message)
+        if follow_up is not None:
+            latest_agent_output = follow_up.response
+            return follow_up
         
-        # Run the graph
-        result = graph.invoke(initial_state)
+        # Identical messages arriving while a run is in flight share its result;
+        # each run waits for a slot in the admission queue
+        with metrics.REQUESTS_IN_FLIGHT.track(endpoint="/chat"):
+            budget = chat_message.budget
+            outcome = dict(await chat_coalescer.run((normalize_query(user_input), budget), lambda: admitted_chat(user_input, budget)))
         
-        # Extract final response
-        final_message = result["messages"][-1].content
-        agent_responses = result.get("agent_responses", {})
+        raw_responses = outcome.pop("raw_responses")
+        results = outcome.pop("results")
+        session_id = remember_results(chat_message.session_id, outcome["agent_responses"], raw_responses,
+                                      outcome["cursor"], results)
+        return ChatResponse(**outcome, session_id=session_id)
         
-        execution_time = f"{(time.time() - start_time):.2f}s"
+    except QueueFull as e:
+        raise busy_error("/chat", e)
+    except Exception as e:
+        logging.error(f"Error in /chat: {str(e)}", exc_info=True)
+        raise HTTPException(status_code=500, detail=f"Error processing message: {str(e)}")
+
+
+@app.get("/chat/next", response_model=ChatResponse)
+async def chat_next_page(cursor: str, lines: int = DETAILS_PAGE_LINES):
+    """Next page of a truncated answer, rendered from its cursor without re-running any agent"""
+    start_time = time.time()
+    # Pages are capped at the details size, so a request can't render a whole result at once
+    paged = await off_data_loop(next_pages, cursor, min(max(1, lines), DETAILS_PAGE_LINES))
+    if paged is None:
+        raise HTTPException(status_code=404, detail="Cursor not found or expired")
+    responses, next_cursor = paged
+    return page_response(responses, next_cursor, start_time)
+
+
+def plan_number(plan) -> Optional[int]:
+    """Input number a batch routing plan refers to, or None"""
+    try:
+        return int(plan["input"]) if isinstance(plan, dict) else None
+    except (KeyError, TypeError, ValueError):
+        return None
+
+
+async def plan_batch(messages: list) -> int:
+    """Plan the routing of many messages with one LLM call per chunk.
+    
+    Plans are stored in router_cache, where each message's router node picks
+    them up. Returns how many messages were planned; a chunk that fails is
+    left to the routers' own calls.
+    """
+    pending = [message for message in messages if needs_routing_call(message)]
+    chunks = [pending[i:i + BATCH_ROUTING_CHUNK] for i in range(0, len(pending), BATCH_ROUTING_CHUNK)]
+    
+    async def plan_chunk(chunk: list) -> int:
+        numbered_inputs = "\n".join(f"{i}. {json.dumps(message)}" for i, message in enumerate(chunk, 1))
+        prompt = prompts.render("batch_router", numbered_inputs=numbered_inputs)
+        try:
+            plans = json.loads((await acall_llm(prompt, "router", "batch_routing")).strip())
+        except Exception as e:
+            logging.warning(f"Batch routing failed, routing messages one by one: {e}")
+            metrics.FALLBACKS.inc(node="router", step="batch_routing")
+            return 0
+        # Plans are matched to inputs by their echoed number; a reply that
+        # drops, repeats or misnumbers any input is discarded as a whole
+        numbers = [plan_number(plan) for plan in plans] if isinstance(plans, list) else []
+        if len(numbers) != len(chunk) or set(numbers) != set(range(1, len(chunk) + 1)):
+            logging.warning(f"Batch routing plans don't match the {len(chunk)} inputs, routing them one by one")
+            metrics.FALLBACKS.inc(node="router", step="batch_routing")
+            return 0
+        planned = 0
+        for number, plan in zip(numbers, plans):
+            if plan.get("agents"):
+                store_plan(normalize_query(chunk[number - 1]), plan)
+                planned += 1
+        return planned
+    
+    return sum(await asyncio.gather(*(plan_chunk(chunk) for chunk in chunks)))
+
+
+@app.post("/chat/batch", response_model=BatchResponse)
+async def chat_batch_endpoint(batch: BatchRequest):
+    """Answer many messages at once, e.g. for reporting jobs.
+    
+    Identical messages run once, routing is planned for the whole batch up
+    front, and at most BATCH_CONCURRENCY graph runs are in flight. Each run
+    takes a slot in the /chat admission queue: the batch is rejected with
+    429 when the queue is already full, and a message that finds it full
+    later gets a per-item error. Results come back in input order; a failing
+    message gets an error instead of failing the batch.
+    """
+    if len(batch.messages) > BATCH_MAX_MESSAGES:
+        raise HTTPException(status_code=413, detail=f"At most {BATCH_MAX_MESSAGES} messages per batch")
+    try:
+        chat_admission.check()
+    except QueueFull as e:
+        raise busy_error("/chat/batch", e)
+    logging.info(f"Received /chat/batch request with {len(batch.messages)} messages")
+    start_time = time.time()
+    
+    # First index of every distinct message; the others reuse its result
+    first_index = {}
+    for index, message in enumerate(batch.messages):
+        first_index.setdefault(normalize_query(message), index)
+    unique = [batch.messages[index] for index in first_index.values()]
+    
+    concurrency = max(1, min(batch.concurrency or BATCH_CONCURRENCY, BATCH_CONCURRENCY))
+    semaphore = asyncio.Semaphore(concurrency)
+    
+    async def answer(message: str) -> dict:
+        async with semaphore:
+            item_start = time.time()
+            try:
+                outcome = dict(await chat_coalescer.run(
+                    (normalize_query(message), batch.budget), lambda: admitted_chat(message, batch.budget)))
+                outcome.pop("raw_responses", None)
+                outcome.pop("results", None)
+                return outcome
+            except QueueFull as e:
+                metrics.REQUESTS_REJECTED.inc(endpoint="/chat/batch")
+                return {"error": str(e), "execution_time": f"{(time.time() - item_start):.2f}s"}
+            except Exception as e:
+                logging.error(f"Error in /chat/batch for {message!r}: {str(e)}")
+                return {"error": str(e), "execution_time": f"{(time.time() - item_start):.2f}s"}
+    
+    with metrics.REQUESTS_IN_FLIGHT.track(endpoint="/chat/batch"):
+        planned_routes = await plan_batch(unique)
+        outcomes = dict(zip(first_index, await asyncio.gather(*(answer(message) for message in unique))))
+    
+    results = []
+    for index, message in enumerate(batch.messages):
+        key = normalize_query(message)
+        duplicate_of = first_index[key] if first_index[key] != index else None
+        results.append(BatchItem(index=index, message=message, duplicate_of=duplicate_of, **outcomes[key]))
+    
+    return BatchResponse(
+        results=results,
+        unique_messages=len(unique),
+        planned_routes=planned_routes,
+        execution_time=f"{(time.time() - start_time):.2f}s"
+    )
+
+
+@app.post("/chat/stream")
+async def chat_stream_endpoint(chat_message: ChatMessage):
+    """Stream the answer as Server-Sent Events.
+    
+    Events: "route" with the selected agents, one "agent" event per agent as
+    soon as it finishes, "token" events while a multi-agent summary is being
+    generated, then "done" with the full ChatResponse (or "error").
+    """
+    user_input = chat_message.message
+    logging.info(f"Received /chat/stream request: {user_input}")
+    
+    # Reject before the stream starts, while a 429 can still be returned
+    try:
+        chat_admission.check()
+    except QueueFull as e:
+        raise busy_error("/chat/stream", e)
+    
+    async def events():
+        global latest_agent_output
         
-        latest_agent_output = final_message
+        follow_up = await off_data_loop(follow_up_response, chat_message)
+        if follow_up is not None:
+            latest_agent_output = follow_up.response
+            yield sse_event("done", jsonable_encoder(follow_up))
+            return
         
-        logging.info(f"Response generated in {execution_time}")
+        start_time = time.time()
+        agent_responses = {}
+        raw_responses = {}
+        results = {}
+        cursors = {}
+        shed_steps = []
+        initial_state = new_state(user_input, chat_message.budget)
+        deadline = initial_state["deadline"]
         
-        return ChatResponse(
-            response=final_message,
-            query_type=", ".join(agent_responses.keys()),
-            execution_time=execution_time,
-            agent_responses=agent_responses
-        )
+        try:
+            metrics.REQUESTS_IN_FLIGHT.inc(endpoint="/chat/stream")
+            async with chat_admission.slot():
+                async for update in get_graph("stream_graph").astream(initial_state, stream_mode="updates"):
+                    for node, changes in update.items():
+                        changes = changes or {}
+                        shed_steps.extend(changes.get("shed_steps") or [])
+                        raw_responses.update(changes.get("raw_responses") or {})
+                        results.update(changes.get("results") or {})
+                        cursors.update(changes.get("cursors") or {})
+                        if node == "router":
+                            yield sse_event("route", {"agents": changes.get("agents_to_run", [])})
+                        for agent, response in (changes.get("agent_responses") or {}).items():
+                            agent_responses[agent] = response
+                            yield sse_event("agent", {"agent": agent, "response": response})
+            
+                # Stream the summary token by token as the model produces it
+                result, prompt = summary_prompt(user_input, agent_responses)
+                if prompt and not has_budget(deadline):
+                    # Without time for a summary, answer with the raw agent responses
+                    shed_steps.append("summarize.summary")
+                    metrics.SHED_STEPS.inc(node="summarize", step="summary")
+                    result = combined_responses(agent_responses)
+                elif prompt:
+                    tokens = []
+                    usage = {}
+                    cost = llm_cost(prompt)
+                    acquired = False
+                    summary_start = time.perf_counter()
+                    try:
+                        waited = await llm_limiter.aacquire(cost, call_timeout(deadline))
+                        acquired = True
+                        metrics.LLM_LIMITER_WAIT.observe(waited, node="summarize")
+                        summary_start = time.perf_counter()
+                        stream = get_llm().astream([HumanMessage(content=prompt)], timeout=call_timeout(deadline))
+                        async for chunk in stream:
+                            if time_left(deadline) <= 0:
+                                raise TimeoutError("Request deadline exceeded")
+                            for kind, count in (chunk.usage_metadata or {}).items():
+                                if isinstance(count, int):
+                                    usage[kind] = usage.get(kind, 0) + count
+                            if chunk.content:
+                                tokens.append(chunk.content)
+                                yield sse_event("token", {"token": chunk.content})
+                        metrics.record_llm_call("summarize", "summary", time.perf_counter() - summary_start, usage)
+                        result = finalize_summary(user_input, "".join(tokens))
+                    except Exception as e:
+                        if isinstance(e, LLMCapacityError):
+                            metrics.LLM_REJECTED.inc(node="summarize", purpose="summary")
+                        else:
+                            metrics.record_llm_call("summarize", "summary", time.perf_counter() - summary_start, ok=False)
+                            note_llm_error(e)
+                        metrics.FALLBACKS.inc(node="summarize", step="summary")
+                        result = f"Error creating summary: {str(e)}"
+                    finally:
+                        if acquired:
+                            llm_limiter.release(cost, used_tokens(usage))
+            
+            latest_agent_output = result
+            execution_time = f"{(time.time() - start_time):.2f}s"
+            logging.info(f"Streamed response generated in {execution_time}")
+            
+            cursor = register_cursor(cursors)
+            session_id = remember_results(chat_message.session_id, agent_responses, raw_responses, cursor, results)
+            yield sse_event("done", jsonable_encoder(ChatResponse(
+                response=result,
+                query_type=", ".join(agent_responses.keys()),
+                execution_time=execution_time,
+                agent_responses=agent_responses,
+                shed_steps=shed_steps,
+                session_id=session_id,
+                cursor=cursor
+            )))
         
-    except Exception as e:
-        logging.error(f"Error in /chat: {str(e)}", exc_info=True)
-        raise HTTPException(status_code=500, detail=f"Error processing message: {str(e)}")
+        except QueueFull as e:
+            metrics.REQUESTS_REJECTED.inc(endpoint="/chat/stream")
+            yield sse_event("error", {"detail": str(e), "retry_after": e.retry_after})
+        except Exception as e:
+            logging.error(f"Error in /chat/stream: {str(e)}", exc_info=True)
+            yield sse_event("error", {"detail": f"Error processing message: {str(e)}"})
+        
+        finally:
+            metrics.REQUESTS_IN_FLIGHT.dec(endpoint="/chat/stream")
+    
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
 
 
 @app.get("/agents")
@@ -0,0 +1,176 @@
+"""
+Prometheus text-format metrics for the Multi-Agent System
+"""
+
+import threading
+from contextlib import contextmanager
+
+# Latency buckets in seconds, from local fast paths up to slow generations
+LATENCY_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labels: tuple) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in labels) + "}"
+
+
+def _format_value(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+class Metric:
+    """Base for labelled metrics; each label combination is a separate series"""
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._series = {}
+        self._lock = threading.Lock()
+        REGISTRY.append(self)
+
+    def _key(self, labels: dict) -> tuple:
+        return tuple((name, labels.get(name, "")) for name in self.labelnames)
+
+    def samples(self):
+        """Yield (suffix, labels, value) for every sample of this metric"""
+        with self._lock:
+            series = list(self._series.items())
+        for labels, value in series:
+            yield "", labels, value
+
+    def render(self) -> list:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        for suffix, labels, value in self.samples():
+            lines.append(f"{self.name}{suffix}{_format_labels(labels)} {_format_value(value)}")
+        return lines
+
+
+class Counter(Metric):
+    kind = "counter"
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._series[key] = self._series.get(key, 0) + amount
+
+
+class Gauge(Metric):
+    kind = "gauge"
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._series[key] = self._series.get(key, 0) + amount
+
+    def dec(self, amount: float = 1, **labels):
+        self.inc(-amount, **labels)
+
+    def set(self, value: float, **labels):
+        with self._lock:
+            self._series[self._key(labels)] = value
+
+    @contextmanager
+    def track(self, **labels):
+        """Count the enclosed block as in progress"""
+        self.inc(**labels)
+        try:
+            yield
+        finally:
+            self.dec(**labels)
+
+
+class Histogram(Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames=(), buckets=LATENCY_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = {"counts": [0] * len(self.buckets), "sum": 0.0, "count": 0}
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series["counts"][i] += 1
+                    break
+            series["sum"] += value
+            series["count"] += 1
+
+    def samples(self):
+        with self._lock:
+            series = [(labels, dict(s, counts=list(s["counts"]))) for labels, s in self._series.items()]
+        for labels, s in series:
+            cumulative = 0
+            for bound, count in zip(self.buckets, s["counts"]):
+                cumulative += count
+                yield "_bucket", labels + (("le", _format_value(bound)),), cumulative
+            yield "_bucket", labels + (("le", "+Inf"),), s["count"]
+            yield "_sum", labels, s["sum"]
+            yield "_count", labels, s["count"]
+
+
+REGISTRY = []
+
+
+def render() -> str:
+    """All registered metrics in Prometheus text exposition format"""
+    lines = []
+    for metric in REGISTRY:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+# ==================== METRICS ====================
+
+NODE_LATENCY = Histogram(
+    "agent_node_duration_seconds", "Latency of graph node executions", ["node"]
+)
+LLM_CALLS = Counter(
+    "agent_llm_calls_total", "LLM calls by node, purpose and outcome", ["node", "purpose", "outcome"]
+)
+LLM_LATENCY = Histogram(
+    "agent_llm_call_duration_seconds", "Latency of LLM calls", ["node", "purpose"]
+)
+LLM_TOKENS = Counter(
+    "agent_llm_tokens_total", "Prompt and completion tokens reported by the model", ["node", "purpose", "kind"]
+)
+FALLBACKS = Counter(
+    "agent_fallbacks_total", "Exceptions handled by falling back to a default result", ["node", "step"]
+)
+SHED_STEPS = Counter(
+    "agent_shed_steps_total", "Optional steps skipped to stay within the request deadline", ["node", "step"]
+)
+PROMPT_TOKENS = Counter(
+    "agent_prompt_tokens_total", "Tokens in rendered prompts by template and part", ["template", "part"]
+)
+LLM_LIMITER_WAIT = Histogram(
+    "agent_llm_limiter_wait_seconds", "Time LLM calls waited for the shared concurrency and token limits", ["node"]
+)
+LLM_REJECTED = Counter(
+    "agent_llm_rejected_total", "LLM calls given up because no capacity freed up within their timeout", ["node", "purpose"]
+)
+REQUESTS_REJECTED = Counter(
+    "agent_requests_rejected_total", "Requests rejected with 429 because the admission queue was full", ["endpoint"]
+)
+REQUESTS_IN_FLIGHT = Gauge(
+    "agent_requests_in_flight", "Requests currently being processed", ["endpoint"]
+)
+
+
+def record_llm_call(node: str, purpose: str, seconds: float, usage: dict = None, ok: bool = True):
+    """Account one LLM call: count, latency and (when reported) token usage"""
+    LLM_CALLS.inc(node=node, purpose=purpose, outcome="ok" if ok else "error")
+    LLM_LATENCY.observe(seconds, node=node, purpose=purpose)
+    if usage:
+        LLM_TOKENS.inc(usage.get("input_tokens", 0), node=node, purpose=purpose, kind="prompt")
+        LLM_TOKENS.inc(usage.get("output_tokens", 0), node=node, purpose=purpose, kind="completion")
@@ -0,0 +1,240 @@
+"""
+Pooled client for NewsData-compatible news APIs
+
+One keep-alive httpx client per mode (blocking for the sync graph, async for
+the async graph) is shared by all requests, so news fetches reuse pooled
+connections instead of opening one per request. Responses are cached per
+query; once an entry is older than ttl it is revalidated with a conditional
+request (If-None-Match / If-Modified-Since), and a 304 renews it without a
+body. A stale entry is served if the API fails.
+"""
+
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import NamedTuple, Optional
+
+DEFAULT_NEWSDATA_URL = "https://newsdata.io/api/1/latest"
+
+
+class Article(NamedTuple):
+    title: str
+    description: str
+    source: str
+    published: str
+    link: str
+
+
+class NewsAPIError(Exception):
+    """The news API answered with an error status or an unusable body"""
+
+
+def parse_articles(payload: dict, limit: int) -> list:
+    """Articles from a NewsData response body"""
+    if payload.get("status") != "success":
+        results = payload.get("results")
+        message = results.get("message") if isinstance(results, dict) else payload.get("message")
+        raise NewsAPIError(f"News API error: {message or payload.get('status')}")
+    articles = []
+    for item in payload.get("results") or []:
+        if not isinstance(item, dict) or not item.get("title"):
+            continue
+        articles.append(Article(
+            title=item["title"].strip(),
+            description=(item.get("description") or "").strip(),
+            source=item.get("source_name") or item.get("source_id") or "",
+            published=item.get("pubDate") or "",
+            link=item.get("link") or ""
+        ))
+        if len(articles) >= limit:
+            break
+    return articles
+
+
+def _error_detail(response) -> str:
+    """': message' from a NewsData error body, if there is one"""
+    try:
+        results = response.json().get("results")
+    except Exception:
+        return ""
+    return f": {results['message']}" if isinstance(results, dict) and results.get("message") else ""
+
+
+class NewsClient:
+    """Keep-alive NewsData client with conditional requests and a response cache"""
+
+    def __init__(self, base_url: str, api_key: str, ttl: float = 600.0, timeout: float = 10.0,
+                 max_connections: int = 20, max_entries: int = 256, language: str = "en",
+                 transport=None, async_transport=None):
+        self.base_url = base_url
+        self.api_key = api_key
+        self.ttl = ttl
+        self.timeout = timeout
+        self.max_connections = max_connections
+        self.max_entries = max_entries
+        self.language = language
+        self._transport = transport
+        self._async_transport = async_transport
+        self._client = None
+        self._async_client = None
+        self._entries = OrderedDict()  # key -> {"articles", "etag", "last_modified", "fetched_at"}
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.not_modified = 0
+        self.cache_hits = 0
+        self.stale_served = 0
+        self.errors = 0
+
+    # ---- clients, created on first use ----
+
+    def _limits(self):
+        import httpx
+        return httpx.Limits(max_connections=self.max_connections, max_keepalive_connections=self.max_connections)
+
+    @property
+    def client(self):
+        if self._client is None:
+            import httpx
+            with self._lock:
+                if self._client is None:
+                    self._client = httpx.Client(limits=self._limits(), timeout=self.timeout, transport=self._transport)
+        return self._client
+
+    @property
+    def async_client(self):
+        if self._async_client is None:
+            import httpx
+            self._async_client = httpx.AsyncClient(limits=self._limits(), timeout=self.timeout,
+                                                   transport=self._async_transport)
+        return self._async_client
+
+    def close(self):
+        if self._client is not None:
+            self._client.close()
+            self._client = None
+
+    async def aclose(self):
+        if self._async_client is not None:
+            await self._async_client.aclose()
+            self._async_client = None
+
+    # ---- cache ----
+
+    def _fresh(self, key, limit: int):
+        """(cached articles if still fresh, entry for revalidation)"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None, None
+            self._entries.move_to_end(key)
+            if time.monotonic() - entry["fetched_at"] < self.ttl:
+                self.cache_hits += 1
+                return entry["articles"][:limit], entry
+            return None, entry
+
+    def _request(self, query: str, limit: int, entry: Optional[dict]) -> tuple:
+        params = {"apikey": self.api_key, "q": query, "language": self.language, "size": limit}
+        headers = {}
+        if entry is not None:
+            if entry.get("etag"):
+                headers["If-None-Match"] = entry["etag"]
+            if entry.get("last_modified"):
+                headers["If-Modified-Since"] = entry["last_modified"]
+        return params, headers
+
+    def _store(self, key, response, entry: Optional[dict], limit: int) -> list:
+        """Articles from a response, refreshing the cache entry"""
+        with self._lock:
+            self.requests += 1
+        if response.status_code == 304 and entry is not None:
+            with self._lock:
+                self.not_modified += 1
+                entry["fetched_at"] = time.monotonic()
+            return entry["articles"][:limit]
+        if response.status_code != 200:
+            raise NewsAPIError(f"News API returned HTTP {response.status_code}{_error_detail(response)}")
+        articles = parse_articles(response.json(), limit)
+        with self._lock:
+            self._entries[key] = {
+                "articles": articles,
+                "etag": response.headers.get("etag"),
+                "last_modified": response.headers.get("last-modified"),
+                "fetched_at": time.monotonic()
+            }
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return articles
+
+    def _failed(self, e: Exception, entry: Optional[dict], limit: int) -> list:
+        """Serve the stale entry when the API fails, else re-raise"""
+        with self._lock:
+            self.errors += 1
+        if entry is None:
+            raise e
+        logging.warning(f"News fetch failed, serving cached articles: {e}")
+        with self._lock:
+            self.stale_served += 1
+        return entry["articles"][:limit]
+
+    # ---- fetching ----
+
+    def fetch(self, query: str, limit: int = 5, timeout: Optional[float] = None) -> list:
+        """Latest articles for query (blocking)"""
+        key = (query.strip().lower(), self.language)
+        articles, entry = self._fresh(key, limit)
+        if articles is not None:
+            return articles
+        params, headers = self._request(query, limit, entry)
+        try:
+            response = self.client.get(self.base_url, params=params, headers=headers,
+                                       timeout=timeout or self.timeout)
+            return self._store(key, response, entry, limit)
+        except Exception as e:
+            return self._failed(e, entry, limit)
+
+    async def afetch(self, query: str, limit: int = 5, timeout: Optional[float] = None) -> list:
+        """Latest articles for query (non-blocking)"""
+        key = (query.strip().lower(), self.language)
+        articles, entry = self._fresh(key, limit)
+        if articles is not None:
+            return articles
+        params, headers = self._request(query, limit, entry)
+        try:
+            response = await self.async_client.get(self.base_url, params=params, headers=headers,
+                                                   timeout=timeout or self.timeout)
+            return self._store(key, response, entry, limit)
+        except Exception as e:
+            return self._failed(e, entry, limit)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "requests": self.requests,
+                "not_modified": self.not_modified,
+                "cache_hits": self.cache_hits,
+                "stale_served": self.stale_served,
+                "errors": self.errors
+            }
+
+
+def format_articles(articles: list, max_description: int = 300) -> str:
+    """Numbered article list used in the summary prompt and as the unsummarized answer"""
+    lines = []
+    for i, article in enumerate(articles, 1):
+        byline = ", ".join(part for part in (article.source, article.published) if part)
+        lines.append(f"{i}. {article.title}" + (f" ({byline})" if byline else ""))
+        if article.description:
+            description = article.description
+            if len(description) > max_description:
+                description = description[:max_description].rsplit(" ", 1)[0] + "..."
+            lines.append(f"   {description}")
+        if article.link:
+            lines.append(f"   {article.link}")
+    return "\n".join(lines)
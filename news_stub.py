@@ -0,0 +1,125 @@
+"""
+Local stand-in for the NewsData API, for offline tests and benchmarks
+
+Serves deterministic articles for any query from /api/1/latest, with ETag
+support so conditional requests get 304 responses:
+
+    python news_stub.py --port 8765 --latency 0.05
+    NEWSDATA_URL=http://127.0.0.1:8765/api/1/latest NEWSDATA_API_KEY=stub python main.py
+
+transport()/async_transport() serve the same responses in-process, without
+a socket, for NewsClient(..., transport=..., async_transport=...).
+"""
+
+import argparse
+import asyncio
+import hashlib
+import json
+import time
+from datetime import datetime, timedelta
+
+STUB_SOURCES = ["Reuters", "TechCrunch", "Bloomberg", "The Verge", "Wired", "Ars Technica"]
+STUB_ANGLES = [
+    ("{topic} funding reaches a new high", "Investors put record amounts into {topic} startups this quarter, led by several late-stage rounds."),
+    ("Regulators publish draft rules on {topic}", "A new consultation sets out how {topic} products would be supervised, with comments open for 60 days."),
+    ("Big tech doubles down on {topic}", "Several large vendors announced expanded {topic} offerings and partnerships at this week's conferences."),
+    ("Open-source {topic} projects gain traction", "Community-driven {topic} tools saw a sharp rise in contributors and enterprise adoption."),
+    ("Survey: companies struggle to hire for {topic}", "Employers report skills gaps in {topic}, pushing up salaries and demand for training programs."),
+    ("Researchers report a {topic} breakthrough", "A peer-reviewed study describes results that could cut costs for {topic} applications."),
+    ("{topic} adoption in education grows", "Schools and bootcamps are adding {topic} modules as student demand increases."),
+    ("Security concerns around {topic} rise", "Analysts warn about new attack techniques targeting {topic} deployments.")
+]
+
+
+def _sentence(text: str) -> str:
+    return text[:1].upper() + text[1:]
+
+
+def stub_articles(query: str, size: int) -> list:
+    """NewsData-shaped result items for query, stable within a day"""
+    topic = query.strip() or "technology"
+    today = datetime.now().replace(hour=8, minute=0, second=0, microsecond=0)
+    seed = int(hashlib.sha1(topic.lower().encode()).hexdigest(), 16)
+    items = []
+    for i in range(min(size, len(STUB_ANGLES))):
+        title, description = STUB_ANGLES[(seed + i) % len(STUB_ANGLES)]
+        source = STUB_SOURCES[(seed + i) % len(STUB_SOURCES)]
+        items.append({
+            "article_id": hashlib.sha1(f"{topic}-{i}-{today.date()}".encode()).hexdigest()[:16],
+            "title": _sentence(title.format(topic=topic)),
+            "link": f"https://news.example.com/{topic.lower().replace(' ', '-')}/{i + 1}",
+            "description": description.format(topic=topic),
+            "pubDate": (today - timedelta(hours=3 * i)).strftime("%Y-%m-%d %H:%M:%S"),
+            "source_id": source.lower().replace(" ", ""),
+            "source_name": source,
+            "language": "english"
+        })
+    return items
+
+
+def stub_response(params: dict, headers: dict) -> tuple:
+    """(status, headers, body) for a /latest request"""
+    if not params.get("apikey"):
+        body = {"status": "error", "results": {"message": "API key missing", "code": "Unauthorized"}}
+        return 401, {"content-type": "application/json"}, json.dumps(body).encode()
+    size = max(1, min(int(params.get("size") or 10), 10))
+    results = stub_articles(params.get("q") or "", size)
+    body = json.dumps({"status": "success", "totalResults": len(results), "results": results, "nextPage": None}).encode()
+    etag = '"' + hashlib.sha1(body).hexdigest()[:20] + '"'
+    if headers.get("if-none-match") == etag:
+        return 304, {"etag": etag}, b""
+    return 200, {"content-type": "application/json", "etag": etag, "cache-control": "max-age=600"}, body
+
+
+def _respond(request):
+    import httpx
+    status, headers, body = stub_response(dict(request.url.params), {k.lower(): v for k, v in request.headers.items()})
+    return httpx.Response(status, headers=headers, content=body)
+
+
+def transport(latency: float = 0.0):
+    """httpx transport answering like the stub server, for httpx.Client"""
+    import httpx
+
+    def handler(request):
+        if latency:
+            time.sleep(latency)
+        return _respond(request)
+    return httpx.MockTransport(handler)
+
+
+def async_transport(latency: float = 0.0):
+    """httpx transport answering like the stub server, for httpx.AsyncClient"""
+    import httpx
+
+    async def handler(request):
+        if latency:
+            await asyncio.sleep(latency)
+        return _respond(request)
+    return httpx.MockTransport(handler)
+
+
+def create_app(latency: float = 0.0):
+    from fastapi import FastAPI, Request, Response
+
+    app = FastAPI(title="NewsData stand-in")
+
+    @app.get("/api/1/latest")
+    async def latest(request: Request):
+        if latency:
+            await asyncio.sleep(latency)
+        status, headers, body = stub_response(dict(request.query_params), dict(request.headers))
+        return Response(content=body, status_code=status, headers=headers)
+
+    return app
+
+
+if __name__ == "__main__":
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds added to every response")
+    args = parser.parse_args()
+    uvicorn.run(create_app(args.latency), host=args.host, port=args.port)
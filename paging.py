@@ -0,0 +1,78 @@
+"""
+Lazy, paginated rendering of agent results.
+
+Agents describe a result as sections of rows plus a per-row formatter
+instead of a finished string. Only the lines of the requested page are
+formatted, so showing 10 lines of a 100k-row result costs 10 rows, and a
+page cursor (result, offset) fetches the next page without re-running the
+agent.
+"""
+
+from typing import Any, Callable, NamedTuple, Optional, Sequence
+
+
+class Section(NamedTuple):
+    """A heading (which may span several lines) followed by rows"""
+    heading: Optional[str] = None
+    rows: Sequence = ()
+    render: Callable[[Any], str] = str
+
+
+class LazyResult:
+    """An agent result whose lines are rendered on demand"""
+
+    def __init__(self, sections):
+        self._sections = [
+            ([] if section.heading is None else section.heading.split("\n"), section.rows, section.render)
+            for section in sections
+        ]
+        self.total = sum(len(heading) + len(rows) for heading, rows, _ in self._sections)
+
+    @classmethod
+    def from_text(cls, text: str) -> "LazyResult":
+        """A result that is already rendered, e.g. a short answer"""
+        return cls([Section(text)])
+
+    def __len__(self) -> int:
+        return self.total
+
+    def lines(self, start: int, stop: int) -> list:
+        """Render lines start..stop-1, formatting only the rows in that range"""
+        output = []
+        position = 0
+        for heading, rows, render in self._sections:
+            if position >= stop:
+                break
+            for line in heading:
+                if start <= position < stop:
+                    output.append(line)
+                position += 1
+            low, high = max(start - position, 0), min(stop - position, len(rows))
+            if low < high:
+                output.extend(render(row) for row in rows[low:high])
+            position += len(rows)
+        return output
+
+
+class Page(NamedTuple):
+    """One rendered page; next_offset is None on the last page"""
+    text: str
+    start: int
+    next_offset: Optional[int]
+    total: int
+
+
+def render_page(result: LazyResult, start: int = 0, max_lines: int = 10) -> Page:
+    stop = min(start + max_lines, result.total)
+    text = "\n".join(result.lines(start, stop))
+    return Page(text, start, stop if stop < result.total else None, result.total)
+
+
+def page_note(page: Page) -> str:
+    """Footer telling the user how to get the rest of a truncated result"""
+    if page.next_offset is None:
+        return ""
+    if page.start == 0:
+        return "\n\n[Response limited to summary. Ask for 'details' or 'full details' for complete information]"
+    return (f"\n\n[Showing lines {page.start + 1}-{page.next_offset} of {page.total}. "
+            f"Ask for 'show more' for the next page]")
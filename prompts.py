@@ -0,0 +1,295 @@
+"""
+Prompt templates for the Multi-Agent System
+
+Every prompt is a static prefix (instructions, field lists and examples)
+followed by a short suffix with the per-request variables. Prefixes are
+rendered once at import, so a request only formats its own variables, and
+because the variable part comes last all prompts of a template share the
+same leading tokens for the provider's prompt cache.
+"""
+
+import logging
+import threading
+
+import metrics
+
+# ==================== TOKEN COUNTING ====================
+
+_tokenizer = None
+_tokenizer_name = "estimate"
+
+
+def load_tokenizer(model: str = "gpt-4o") -> str:
+    """Switch token counting to the tiktoken encoding for model.
+
+    tiktoken may download the encoding on first use, so this runs during
+    warm-up rather than on a request. Until it succeeds, counts are estimated.
+    """
+    global _tokenizer, _tokenizer_name
+    try:
+        import tiktoken
+        try:
+            encoding = tiktoken.encoding_for_model(model)
+        except KeyError:
+            encoding = tiktoken.get_encoding("o200k_base")
+    except Exception as e:
+        logging.warning(f"Token counts are estimated, tiktoken is unavailable: {e}")
+        return _tokenizer_name
+    _tokenizer, _tokenizer_name = encoding, encoding.name
+    return _tokenizer_name
+
+
+def count_tokens(text: str) -> int:
+    if _tokenizer is not None:
+        return len(_tokenizer.encode(text, disallowed_special=()))
+    # Roughly four characters per token for English text
+    return (len(text) + 3) // 4
+
+
+# ==================== TEMPLATES ====================
+
+REGISTRY = {}
+
+
+class PromptTemplate:
+    """A prompt made of a fixed prefix and a str.format suffix for the request variables"""
+
+    def __init__(self, name: str, prefix: str, suffix: str):
+        self.name = name
+        self.prefix = prefix
+        self.suffix = suffix
+        self.renders = 0
+        self.variable_tokens = 0
+        self._prefix_tokens = None  # (tokenizer name, count)
+        self._lock = threading.Lock()
+        REGISTRY[name] = self
+
+    @property
+    def prefix_tokens(self) -> int:
+        cached = self._prefix_tokens
+        if cached is None or cached[0] != _tokenizer_name:
+            cached = self._prefix_tokens = (_tokenizer_name, count_tokens(self.prefix))
+        return cached[1]
+
+    def render(self, **variables) -> str:
+        variable_part = self.suffix.format(**variables)
+        tokens = count_tokens(variable_part)
+        with self._lock:
+            self.renders += 1
+            self.variable_tokens += tokens
+        metrics.PROMPT_TOKENS.inc(self.prefix_tokens, template=self.name, part="static")
+        metrics.PROMPT_TOKENS.inc(tokens, template=self.name, part="variable")
+        return self.prefix + variable_part
+
+    def stats(self) -> dict:
+        with self._lock:
+            renders, variable_tokens = self.renders, self.variable_tokens
+        return {
+            "static_tokens": self.prefix_tokens,
+            "renders": renders,
+            "avg_variable_tokens": round(variable_tokens / renders, 1) if renders else 0
+        }
+
+
+def render(name: str, **variables) -> str:
+    return REGISTRY[name].render(**variables)
+
+
+def stats() -> dict:
+    return {
+        "tokenizer": _tokenizer_name,
+        "templates": {name: template.stats() for name, template in REGISTRY.items()}
+    }
+
+
+# ==================== INTENT PROMPTS ====================
+
+USER_QUERY = 'User query: "{user_input}"\n'
+
+PromptTemplate("ticket_intent", """Analyze this ticket query and extract the intent in JSON format.
+
+Available ticket data fields: ticket_id, raised_by, category, subject, description, status (Open/In Progress/Resolved), priority (High/Medium/Low), created_at
+
+Return JSON with:
+- "query_type": "specific_ticket" | "filter_by_status" | "filter_by_priority" | "filter_by_person" | "count" | "overview"
+- "filter_value": the specific value if filtering (e.g., "High", "Open", person name, or ticket ID)
+- "question_type": "who" | "what" | "how_many" | "when" | "list" | "details"
+
+Examples:
+"Show TKT-001" -> {"query_type": "specific_ticket", "filter_value": "TKT-001", "question_type": "details"}
+"How many high priority tickets?" -> {"query_type": "filter_by_priority", "filter_value": "High", "question_type": "count"}
+"Who raised the WiFi ticket?" -> {"query_type": "filter_by_person", "filter_value": "WiFi", "question_type": "who"}
+"Show open tickets" -> {"query_type": "filter_by_status", "filter_value": "Open", "question_type": "list"}
+
+""", USER_QUERY)
+
+PromptTemplate("activity_intent", """Analyze this activity/task query and extract the intent in JSON format.
+
+Available activity fields: activity_id, task, employee, status (To Do/In Progress/Completed), priority (High/Medium/Low), progress, due_date
+
+Return JSON with:
+- "query_type": "who_assigned" | "filter_by_status" | "filter_by_employee" | "filter_by_priority" | "count" | "overview" | "task_details"
+- "filter_value": the specific value if filtering
+- "question_type": "who" | "what" | "how_many" | "when" | "list" | "details" | "status_check"
+
+Examples:
+"Who is assigned to design landing page?" -> {"query_type": "who_assigned", "filter_value": "design landing page", "question_type": "who"}
+"Show completed tasks" -> {"query_type": "filter_by_status", "filter_value": "Completed", "question_type": "list"}
+"What is John working on?" -> {"query_type": "filter_by_employee", "filter_value": "John", "question_type": "list"}
+"How many tasks are pending?" -> {"query_type": "filter_by_status", "filter_value": "To Do", "question_type": "count"}
+
+""", USER_QUERY)
+
+PromptTemplate("cost_intent", """Analyze this infrastructure cost query and extract the intent in JSON format.
+
+Available providers: AWS, Azure, Google Cloud, Firebase, DigitalOcean, Vercel, Heroku
+
+Return JSON with:
+- "query_type": "specific_provider" | "compare_all" | "overview" | "cheapest" | "most_expensive"
+- "provider": specific provider name if mentioned
+- "question_type": "how_much" | "what" | "which" | "compare" | "list" | "breakdown"
+
+Examples:
+"How much does AWS cost?" -> {"query_type": "specific_provider", "provider": "AWS", "question_type": "how_much"}
+"Which is cheaper, AWS or Azure?" -> {"query_type": "compare_all", "provider": "", "question_type": "which"}
+"Show me Firebase pricing" -> {"query_type": "specific_provider", "provider": "Firebase", "question_type": "breakdown"}
+
+""", USER_QUERY)
+
+PromptTemplate("chat_intent", """Analyze this general query and extract the intent in JSON format.
+
+Return JSON with:
+- "query_type": "company_info" | "greeting" | "help" | "general_question" | "goodbye"
+- "specific_topic": what they're asking about (e.g., "services", "team", "mission", "location", etc.)
+- "question_type": "what" | "who" | "where" | "when" | "how" | "why" | "greeting"
+
+Examples:
+"What services do you offer?" -> {"query_type": "company_info", "specific_topic": "services", "question_type": "what"}
+"Hello" -> {"query_type": "greeting", "specific_topic": "", "question_type": "greeting"}
+"Where is Technology-Garage located?" -> {"query_type": "company_info", "specific_topic": "location", "question_type": "where"}
+
+""", USER_QUERY)
+
+
+# ==================== ANSWER PROMPTS ====================
+
+RAW_DATA = 'User asked: "{user_input}"\n\nRaw data response:\n{result}'
+
+PromptTemplate("ticket_enhance", """Provide a direct, natural answer to the user's specific question from the raw data response below. Be concise and precise.
+- If they asked "who", tell them the person's name
+- If they asked "how many", give the count
+- If they asked "what", describe the item
+- If they asked "when", give the date/time
+- If they asked about status, tell them the status clearly
+
+""", RAW_DATA)
+
+PromptTemplate("activity_enhance", """Provide a direct, natural answer to the user's specific question from the raw data response below. Be concise and precise.
+- If they asked "who", tell them the person's name and what they're doing
+- If they asked "how many", give the count number
+- If they asked "what status", tell them the current status
+- If they asked "when", give the due date
+- Keep it conversational and direct
+
+""", RAW_DATA)
+
+PromptTemplate("cost_enhance", """Provide a direct, natural answer to the user's specific question from the raw data response below. Be concise and precise.
+- If they asked "how much", give the specific cost/estimate
+- If they asked "which is cheaper", compare and state which one
+- If they asked "what services", list the key services
+- Keep it conversational and direct
+
+""", RAW_DATA)
+
+PromptTemplate("news", """You are a news summarizer. Provide a professional news summary about the topic below as if reporting current events for the given date.
+
+Create 5 realistic news articles with:
+- Clear article titles
+- 2-3 sentence summaries each
+- Credible source names (Reuters, TechCrunch, Bloomberg, etc.)
+- Recent dates (this week, yesterday, Dec 2025, etc.)
+
+Format cleanly with numbered articles. Do NOT include any disclaimers about live news access or training data cutoffs. Write as a professional news aggregator would.
+
+""", "Topic: '{topic}'\nDate: {today}\n")
+
+PromptTemplate("news_summary", """You are a news summarizer. Summarize the fetched articles below for the user as a professional news aggregator would.
+
+Use only the information in these articles; do not add events, numbers or sources they don't mention.
+For each article give a numbered entry with its title, a 1-2 sentence summary, and its source name and date.
+Format cleanly with numbered articles. Do NOT include any disclaimers about live news access.
+
+""", "Topic: '{topic}'\n\nFetched articles:\n{articles}\n")
+
+PromptTemplate("company_chat", """You are a helpful assistant for Technology-Garage company.
+
+Provide a direct, specific answer to the user's question based on the company information below.
+If they ask about something specific (e.g., location, services, team size), answer that directly.
+Be friendly, professional, and concise.
+
+""", "Company Information:\n{company_info}\n\nUser question: {user_input}\n")
+
+PromptTemplate("general_chat", """You are a helpful assistant for Technology-Garage, a technology solutions company.
+You can help with general questions and conversations.
+
+Provide a helpful, friendly, and natural response.
+If it's a greeting, respond warmly.
+If they need help, guide them on what you can assist with.
+
+""", "User: {user_input}\n")
+
+
+# ==================== ROUTING AND SUMMARY PROMPTS ====================
+
+ROUTER_INSTRUCTIONS = """You are an intelligent router AI for Technology-Garage company assistant. Decide which agents should handle the user input and extract each selected agent's intent:
+
+Available agents and their intent fields:
+- TicketAnalyzerAgent: Handles ticket queries (employees, players, parents tickets)
+  {"query_type": "specific_ticket" | "filter_by_status" | "filter_by_priority" | "filter_by_person" | "count" | "overview", "filter_value": ticket ID, status (Open/In Progress/Resolved), priority (High/Medium/Low), or subject keyword, "question_type": "who" | "what" | "how_many" | "when" | "list" | "details"}
+- NewsAggregatorAgent: Fetches latest news articles
+  {"topic": news topic, default "technology"}
+- ActivityTrackerAgent: Shows employee activities and task tracking
+  {"query_type": "who_assigned" | "filter_by_status" | "filter_by_employee" | "filter_by_priority" | "count" | "overview" | "task_details", "filter_value": task text, status (To Do/In Progress/Completed), employee or priority, "question_type": "who" | "what" | "how_many" | "when" | "list" | "details" | "status_check"}
+- InfrastructureCostMonitorAgent: Monitors cloud infrastructure costs (AWS, Azure, Google Cloud, Firebase, DigitalOcean, Vercel, Heroku)
+  {"query_type": "specific_provider" | "compare_all" | "overview" | "cheapest" | "most_expensive", "provider": provider name if mentioned, "question_type": "how_much" | "what" | "which" | "compare" | "list" | "breakdown"}
+- ChatAgent: General conversation and company information
+  {"query_type": "company_info" | "greeting" | "help" | "general_question" | "goodbye", "specific_topic": e.g. "services", "team", "mission", "location", "question_type": "what" | "who" | "where" | "when" | "how" | "why" | "greeting"}
+
+Respond in JSON format with the agents that should handle this query and an intent for each of them:
+{"agents": ["AgentName1", "AgentName2", ...], "intents": {"AgentName1": {...}, "AgentName2": {...}}}
+
+Examples:
+- "Show me all tickets" -> {"agents": ["TicketAnalyzerAgent"], "intents": {"TicketAnalyzerAgent": {"query_type": "overview", "filter_value": "", "question_type": "list"}}}
+- "What's the latest news?" -> {"agents": ["NewsAggregatorAgent"], "intents": {"NewsAggregatorAgent": {"topic": "technology"}}}
+- "Show activities for John" -> {"agents": ["ActivityTrackerAgent"], "intents": {"ActivityTrackerAgent": {"query_type": "filter_by_employee", "filter_value": "John", "question_type": "list"}}}
+- "How much does AWS cost?" -> {"agents": ["InfrastructureCostMonitorAgent"], "intents": {"InfrastructureCostMonitorAgent": {"query_type": "specific_provider", "provider": "AWS", "question_type": "how_much"}}}
+- "Tell me about the company" -> {"agents": ["ChatAgent"], "intents": {"ChatAgent": {"query_type": "company_info", "specific_topic": "", "question_type": "what"}}}
+- "What tickets are open and latest AI news" -> {"agents": ["TicketAnalyzerAgent", "NewsAggregatorAgent"], "intents": {"TicketAnalyzerAgent": {"query_type": "filter_by_status", "filter_value": "Open", "question_type": "list"}, "NewsAggregatorAgent": {"topic": "AI"}}}
+"""
+
+PromptTemplate("router", ROUTER_INSTRUCTIONS + "\n", 'User input: "{user_input}"\n')
+
+PromptTemplate("batch_router", ROUTER_INSTRUCTIONS + """
+You will receive several numbered user inputs. Plan each one independently and respond with a JSON array holding one plan object per input, in the same order and nothing else. Each plan object must also have an "input" field with the number of the input it plans.
+
+""", "User inputs:\n{numbered_inputs}\n")
+
+PromptTemplate("overview_summary", """You are an intelligent business analyst for Technology-Garage company.
+
+Create a CONCISE executive summary (max 10 lines) of the department reports below that covers:
+1. **Key Priorities & Issues** - Most critical blockers
+2. **Current Status** - Overall health snapshot
+3. **Notable Updates** - Top 1-2 recent developments
+4. **Quick Recommendations** - Top 1-2 immediate actions
+
+Format as bullet points. Be ultra-concise - assume busy executive reading in 30 seconds.
+NO long paragraphs. Each section: max 1-2 lines.
+
+""", 'The user asked: "{user_input}"\n\nHere are reports from all departments:\n\n{responses_text}\n')
+
+PromptTemplate("summary", """You are a helpful assistant. Create a single, clear, and concise summary from these agent responses.
+Include at least one key point from EVERY agent's response.
+Do NOT repeat agent names in the summary.
+Keep it within 10 lines maximum.
+
+""", "{responses_text}\n")
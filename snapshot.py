@@ -0,0 +1,447 @@
+"""
+Memory-mapped columnar snapshots of the ticket and activity data
+
+A snapshot is one read-only file that every worker maps with mmap, so the
+data lives once in the OS page cache instead of as Python dicts in each
+process, and opening it costs a header read however large it is. Per table:
+- low-cardinality fields (status, priority, category) are fixed-width code
+  columns plus a small value list
+- other fields are string heaps: UTF-8 bytes back to back, with a uint64
+  offset per row
+- lookups go through key indexes: sorted keys (a string heap) with the
+  matching row numbers as uint32 postings, for ids, status, priority,
+  people and text tokens
+
+Rows are decoded into dicts only when a page of results is rendered.
+
+Build a snapshot from data.py, JSON/CSV exports or a SQLite database:
+
+    python snapshot.py agents.snap
+    python snapshot.py agents.snap tickets.csv activities.json agents.db
+"""
+
+import argparse
+import json
+import mmap
+import os
+import struct
+import sys
+import tempfile
+from array import array
+from bisect import bisect_left
+from collections import defaultdict
+from collections.abc import Sequence
+
+from backends import TICKET_FIELDS, ACTIVITY_FIELDS, SQLiteBackend, read_export
+from stores import CostTable, KANBAN_COLUMNS, person_keys, tokenize
+
+MAGIC = b"TGSNAP01"
+FOOTER = struct.Struct("<QQ8s")  # header offset, header length, magic
+CODE_FIELDS = ("status", "priority", "category")
+
+
+# ==================== WRITING ====================
+
+class _Writer:
+    """Appends 8-byte aligned arrays to the data section and records where they went"""
+
+    def __init__(self, f):
+        self.f = f
+        self.position = f.tell()
+
+    def write(self, data: bytes) -> int:
+        offset = self.position
+        self.f.write(data)
+        padding = -len(data) % 8
+        self.f.write(b"\0" * padding)
+        self.position += len(data) + padding
+        return offset
+
+    def strings(self, values) -> dict:
+        """String heap: uint64 offsets (one per value, plus the end) and UTF-8 bytes"""
+        offsets = array("Q", [0])
+        heap = bytearray()
+        for value in values:
+            heap += value.encode("utf-8")
+            offsets.append(len(heap))
+        return {"kind": "str", "offsets": self.write(offsets.tobytes()), "heap": self.write(bytes(heap))}
+
+    def codes(self, values: list) -> dict:
+        """Code column: the distinct values and one uint8/uint16 code per row"""
+        distinct = list(dict.fromkeys(values))
+        code_of = {value: code for code, value in enumerate(distinct)}
+        codes = array("B" if len(distinct) <= 0xFF else "H", (code_of[value] for value in values))
+        return {"kind": "code", "values": distinct, "typecode": codes.typecode, "codes": self.write(codes.tobytes())}
+
+    def index(self, postings: dict) -> dict:
+        """Key index: sorted keys, and per key a run of ascending row numbers"""
+        keys = sorted(postings)
+        starts = array("Q", [0])
+        rows = array("I")
+        for key in keys:
+            rows.extend(sorted(set(postings[key])))
+            starts.append(len(rows))
+        return {"keys": self.strings(keys), "count": len(keys),
+                "starts": self.write(starts.tobytes()), "rows": self.write(rows.tobytes())}
+
+
+def _text(value) -> str:
+    return "" if value is None else str(value)
+
+
+def _write_table(writer: _Writer, records: list, fields: tuple, indexes: dict) -> dict:
+    columns = {}
+    for field in fields:
+        values = [_text(record.get(field)) for record in records]
+        if field in CODE_FIELDS and len(set(values)) <= 0xFFFF:
+            columns[field] = writer.codes(values)
+        else:
+            columns[field] = writer.strings(values)
+    columns["extra"] = writer.strings(
+        json.dumps(extra) if extra else ""
+        for extra in ({k: v for k, v in record.items() if k not in fields} for record in records))
+    postings = {name: defaultdict(list) for name in indexes}
+    for row, record in enumerate(records):
+        for name, keys in indexes.items():
+            for key in keys(record):
+                postings[name][key].append(row)
+    return {
+        "rows": len(records),
+        "fields": list(fields),
+        "columns": columns,
+        "indexes": {name: writer.index(keys) for name, keys in postings.items()}
+    }
+
+
+TICKET_INDEXES = {
+    "ticket_id": lambda ticket: [ticket["ticket_id"].upper()],
+    "status": lambda ticket: [ticket["status"].lower()],
+    "priority": lambda ticket: [ticket["priority"].lower()],
+    "person": lambda ticket: person_keys(ticket["raised_by"]),
+    "tokens": lambda ticket: set(tokenize(f"{ticket['subject']} {ticket['description']}"))
+}
+ACTIVITY_INDEXES = {
+    "activity_id": lambda activity: [activity["activity_id"].upper()],
+    "status": lambda activity: [activity["status"]],
+    "priority": lambda activity: [activity["priority"].lower()],
+    "employee": lambda activity: [activity["employee"].lower()],
+    "tokens": lambda activity: set(tokenize(activity["task"]))
+}
+
+
+def write_snapshot(path: str, tickets, activities, costs: dict = None):
+    """Write a snapshot file; it is built next to path and renamed into place,
+    so workers that already mapped the old file keep reading it safely"""
+    # Activities keep the first position of their ID, as ActivityStore does
+    activities = list({activity["activity_id"]: activity for activity in activities}.values())
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, temp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(MAGIC)
+            writer = _Writer(f)
+            header = {
+                "byteorder": sys.byteorder,
+                "costs": costs or {},
+                "tables": {
+                    "tickets": _write_table(writer, list(tickets), TICKET_FIELDS, TICKET_INDEXES),
+                    "activities": _write_table(writer, activities, ACTIVITY_FIELDS, ACTIVITY_INDEXES)
+                }
+            }
+            encoded = json.dumps(header).encode("utf-8")
+            offset = writer.write(encoded)
+            f.write(FOOTER.pack(offset, len(encoded), MAGIC))
+        os.replace(temp_path, path)
+    except BaseException:
+        os.unlink(temp_path)
+        raise
+
+
+# ==================== READING ====================
+
+class _Strings(Sequence):
+    """A string heap read straight from the mapping"""
+
+    def __init__(self, view: memoryview, spec: dict, count: int):
+        self._offsets = view[spec["offsets"]:spec["offsets"] + 8 * (count + 1)].cast("Q")
+        self._heap = view[spec["heap"]:]
+        self._count = count
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __getitem__(self, row: int) -> str:
+        return str(self._heap[self._offsets[row]:self._offsets[row + 1]], "utf-8")
+
+
+class _Codes(Sequence):
+    """A code column read straight from the mapping"""
+
+    def __init__(self, view: memoryview, spec: dict, count: int):
+        itemsize = array(spec["typecode"]).itemsize
+        self._codes = view[spec["codes"]:spec["codes"] + itemsize * count].cast(spec["typecode"])
+        self._values = spec["values"]
+
+    def __len__(self) -> int:
+        return len(self._codes)
+
+    def __getitem__(self, row: int) -> str:
+        return self._values[self._codes[row]]
+
+
+class _Index:
+    """Key index: row numbers for a key, found by binary search over the keys"""
+
+    def __init__(self, view: memoryview, spec: dict):
+        count = spec["count"]
+        self.keys = _Strings(view, spec["keys"], count)
+        self._starts = view[spec["starts"]:spec["starts"] + 8 * (count + 1)].cast("Q")
+        self._rows = view[spec["rows"]:spec["rows"] + 4 * self._starts[count]].cast("I")
+
+    def at(self, position: int) -> memoryview:
+        return self._rows[self._starts[position]:self._starts[position + 1]]
+
+    def get(self, key: str) -> memoryview:
+        """Ascending row numbers for key (empty if absent)"""
+        position = bisect_left(self.keys, key)
+        if position < len(self.keys) and self.keys[position] == key:
+            return self.at(position)
+        return self._rows[0:0]
+
+
+class _Table:
+    def __init__(self, view: memoryview, spec: dict):
+        self.rows = spec["rows"]
+        self.fields = spec["fields"]
+        self._columns = [
+            (field, (_Codes if column["kind"] == "code" else _Strings)(view, column, self.rows))
+            for field, column in spec["columns"].items() if field != "extra"
+        ]
+        self._extra = _Strings(view, spec["columns"]["extra"], self.rows)
+        self.indexes = {name: _Index(view, index) for name, index in spec["indexes"].items()}
+
+    def record(self, row: int) -> dict:
+        record = {field: column[row] for field, column in self._columns}
+        extra = self._extra[row]
+        if extra:
+            record.update(json.loads(extra))
+        return record
+
+    def all_rows(self) -> range:
+        return range(self.rows)
+
+
+class SnapshotRows(Sequence):
+    """Rows of a snapshot table by row number; dicts are built only for the
+    rows actually read, e.g. the page being rendered"""
+
+    def __init__(self, table: _Table, rows):
+        self._table = table
+        self._rows = rows
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self._table.record(row) for row in self._rows[index]]
+        return self._table.record(self._rows[index])
+
+
+def _contains(rows: memoryview, row: int) -> bool:
+    position = bisect_left(rows, row)
+    return position < len(rows) and rows[position] == row
+
+
+def _first_match(index: _Index, tokens: set):
+    """First row whose text has every token: walk the rarest token's rows and
+    check the others by binary search"""
+    postings = sorted((index.get(token) for token in tokens), key=len)
+    for row in postings[0]:
+        if all(_contains(posting, row) for posting in postings[1:]):
+            return row
+    return None
+
+
+class SnapshotTicketStore:
+    """Read-only TicketStore over a snapshot table"""
+
+    def __init__(self, table: _Table):
+        self._table = table
+        self._index = table.indexes
+
+    def _rows(self, index: str, key: str) -> SnapshotRows:
+        return SnapshotRows(self._table, self._index[index].get(key))
+
+    def __len__(self) -> int:
+        return self._table.rows
+
+    def __iter__(self):
+        return iter(SnapshotRows(self._table, self._table.all_rows()))
+
+    def get(self, ticket_id: str):
+        """Ticket by ID, or None"""
+        rows = self._index["ticket_id"].get(ticket_id.upper())
+        return self._table.record(rows[-1]) if len(rows) else None
+
+    def by_status(self, status: str) -> SnapshotRows:
+        return self._rows("status", status.lower())
+
+    def by_priority(self, priority: str) -> SnapshotRows:
+        return self._rows("priority", priority.lower())
+
+    def by_raised_by(self, person: str) -> SnapshotRows:
+        """Tickets raised by a person, matched on full name or name without role"""
+        return self._rows("person", person.strip().lower())
+
+    def count_by_status(self, status: str) -> int:
+        return len(self._index["status"].get(status.lower()))
+
+    def search(self, text: str) -> list:
+        """All tickets whose subject/description mention every word of text"""
+        tokens = set(tokenize(text))
+        if not tokens:
+            return []
+        postings = sorted((self._index["tokens"].get(token) for token in tokens), key=len)
+        rows = [row for row in postings[0] if all(_contains(posting, row) for posting in postings[1:])]
+        return SnapshotRows(self._table, rows)
+
+    def find(self, text: str):
+        """First ticket whose subject/description mention every word of text, or None"""
+        tokens = set(tokenize(text))
+        row = _first_match(self._index["tokens"], tokens) if tokens else None
+        return None if row is None else self._table.record(row)
+
+
+class SnapshotActivityStore:
+    """Read-only ActivityStore over a snapshot table"""
+
+    def __init__(self, table: _Table):
+        self._table = table
+        self._index = table.indexes
+
+    def __len__(self) -> int:
+        return self._table.rows
+
+    def __iter__(self):
+        return iter(SnapshotRows(self._table, self._table.all_rows()))
+
+    def get(self, activity_id: str):
+        rows = self._index["activity_id"].get(activity_id.upper())
+        return self._table.record(rows[0]) if len(rows) else None
+
+    def by_status(self, status: str) -> SnapshotRows:
+        return SnapshotRows(self._table, self._index["status"].get(status))
+
+    def by_priority(self, priority: str) -> SnapshotRows:
+        return SnapshotRows(self._table, self._index["priority"].get(priority.lower()))
+
+    def by_employee(self, name: str) -> SnapshotRows:
+        """Activities of every employee whose name contains name (case-insensitive)"""
+        name = name.strip().lower()
+        employees = self._index["employee"]
+        rows = employees.get(name)
+        if len(rows):
+            return SnapshotRows(self._table, rows)
+        # Partial names: match against the distinct employees, not every activity
+        matches = [employees.at(position) for position, employee in enumerate(employees.keys) if name in employee]
+        if len(matches) == 1:
+            return SnapshotRows(self._table, matches[0])
+        return SnapshotRows(self._table, sorted(row for rows in matches for row in rows))
+
+    def find_task(self, text: str):
+        """First activity whose task mentions every word of text, or None"""
+        tokens = set(tokenize(text))
+        row = _first_match(self._index["tokens"], tokens) if tokens else None
+        return None if row is None else self._table.record(row)
+
+    def kanban(self) -> dict:
+        """Kanban columns in board order, each a list of activities"""
+        return {column: self.by_status(column) for column in KANBAN_COLUMNS}
+
+    def column_counts(self) -> dict:
+        statuses = self._index["status"]
+        counts = dict.fromkeys(KANBAN_COLUMNS, 0)
+        counts.update((status, len(statuses.at(position))) for position, status in enumerate(statuses.keys))
+        return counts
+
+
+class SnapshotBackend:
+    """Tickets and activities served from a memory-mapped snapshot file.
+
+    The file is mapped read-only, so its pages are shared by every worker
+    that opens it. A missing snapshot is written from data.py first.
+    """
+
+    name = "snapshot"
+    blocking = False  # reads are memory accesses into the mapped file
+
+    def __init__(self, path: str):
+        self.path = path
+        if not os.path.exists(path):
+            from data import MOCK_TICKETS, MOCK_ACTIVITIES, INFRASTRUCTURE_COSTS
+            write_snapshot(path, MOCK_TICKETS, MOCK_ACTIVITIES, INFRASTRUCTURE_COSTS)
+        with open(path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        view = memoryview(self._mmap)
+        header_offset, header_length, magic = FOOTER.unpack(view[-FOOTER.size:])
+        if view[:len(MAGIC)] != MAGIC or magic != MAGIC:
+            raise ValueError(f"{path} is not a data snapshot")
+        header = json.loads(str(view[header_offset:header_offset + header_length], "utf-8"))
+        if header["byteorder"] != sys.byteorder:
+            raise ValueError(f"{path} was written on a {header['byteorder']}-endian machine")
+        self.tickets = SnapshotTicketStore(_Table(view, header["tables"]["tickets"]))
+        self.activities = SnapshotActivityStore(_Table(view, header["tables"]["activities"]))
+        costs = header["costs"]
+        if not costs:
+            from data import INFRASTRUCTURE_COSTS as costs
+        self.cost_table = CostTable(costs)
+
+    def close(self):
+        # Result sequences may still hold views into the mapping; the OS
+        # unmaps it with the process in that case
+        try:
+            self._mmap.close()
+        except BufferError:
+            pass
+
+    def stats(self) -> dict:
+        return {
+            "backend": self.name,
+            "path": self.path,
+            "mapped_bytes": len(self._mmap),
+            "tickets": len(self.tickets),
+            "activities": len(self.activities),
+            "cost_services": len(self.cost_table)
+        }
+
+
+def build_from(paths: list) -> dict:
+    """Tickets, activities and costs from export files and SQLite databases"""
+    data = {"tickets": [], "activities": [], "costs": {}}
+    for path in paths:
+        if os.path.splitext(path)[1].lower() in (".db", ".sqlite", ".sqlite3"):
+            backend = SQLiteBackend(path, seed=False)
+            loaded = {"tickets": list(backend.tickets), "activities": list(backend.activities), "costs": backend.costs()}
+            backend.close()
+        else:
+            loaded = read_export(path)
+        data["tickets"] += loaded["tickets"]
+        data["activities"] += loaded["activities"]
+        data["costs"].update(loaded["costs"])
+    return data
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("snapshot", help="snapshot file to write")
+    parser.add_argument("sources", nargs="*", help="JSON/CSV exports or SQLite databases (default: data.py)")
+    args = parser.parse_args()
+    if args.sources:
+        data = build_from(args.sources)
+    else:
+        from data import MOCK_TICKETS, MOCK_ACTIVITIES, INFRASTRUCTURE_COSTS
+        data = {"tickets": MOCK_TICKETS, "activities": MOCK_ACTIVITIES, "costs": INFRASTRUCTURE_COSTS}
+    write_snapshot(args.snapshot, data["tickets"], data["activities"], data["costs"])
+    print(json.dumps({"tickets": len(data["tickets"]), "activities": len(data["activities"]),
+                      "bytes": os.path.getsize(args.snapshot)}))
@@ -0,0 +1,523 @@
+"""
+Indexed in-memory stores over the ticket, activity, cost and company data
+for Technology-Garage Multi-Agent System
+"""
+
+import json
+import re
+from array import array
+from collections import defaultdict
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+# Words too common to narrow a text search
+STOPWORDS = {"a", "an", "the", "of", "to", "for", "and", "in", "on", "with", "is", "my", "from"}
+
+
+def tokenize(text: str) -> list:
+    """Lowercase word tokens used by the inverted text indexes"""
+    return [token for token in TOKEN_PATTERN.findall(text.lower()) if token not in STOPWORDS]
+
+
+def person_keys(raised_by: str) -> set:
+    """Index keys for a person: 'Tamizh (Coach)' -> {'tamizh (coach)', 'tamizh'}"""
+    full = raised_by.strip().lower()
+    return {full, full.split("(")[0].strip()}
+
+
+class TicketStore:
+    """Tickets with hash indexes on id, status, priority and raised_by,
+    plus an inverted token index over subject and description.
+
+    Every index keeps tickets in insertion order, so filtered results come
+    back in the same order as a scan over the source list would give.
+    """
+
+    def __init__(self, tickets=()):
+        self._tickets = []
+        self._by_id = {}
+        self._by_status = defaultdict(list)
+        self._by_priority = defaultdict(list)
+        self._by_person = defaultdict(list)
+        self._by_token = defaultdict(list)
+        for ticket in tickets:
+            self.add(ticket)
+
+    def add(self, ticket: dict):
+        """Add a ticket and index it"""
+        row = len(self._tickets)
+        self._tickets.append(ticket)
+        self._by_id[ticket["ticket_id"].upper()] = ticket
+        self._by_status[ticket["status"].lower()].append(ticket)
+        self._by_priority[ticket["priority"].lower()].append(ticket)
+        for key in person_keys(ticket["raised_by"]):
+            self._by_person[key].append(ticket)
+        for token in set(tokenize(f"{ticket['subject']} {ticket['description']}")):
+            self._by_token[token].append(row)
+
+    def __len__(self) -> int:
+        return len(self._tickets)
+
+    def __iter__(self):
+        return iter(self._tickets)
+
+    def get(self, ticket_id: str):
+        """Ticket by ID, or None"""
+        return self._by_id.get(ticket_id.upper())
+
+    def by_status(self, status: str) -> list:
+        return self._by_status.get(status.lower(), [])
+
+    def by_priority(self, priority: str) -> list:
+        return self._by_priority.get(priority.lower(), [])
+
+    def by_raised_by(self, person: str) -> list:
+        """Tickets raised by a person, matched on full name or name without role"""
+        return self._by_person.get(person.strip().lower(), [])
+
+    def count_by_status(self, status: str) -> int:
+        return len(self.by_status(status))
+
+    def _matches(self, text: str):
+        """Yield tickets whose subject/description contain every token of text"""
+        tokens = set(tokenize(text))
+        if not tokens:
+            return
+        postings = sorted((self._by_token.get(token, []) for token in tokens), key=len)
+        if not postings[0]:
+            return
+        # Walk the rarest token's postings and check the other tokens per ticket
+        rest = tokens if len(tokens) > 1 else ()
+        for row in postings[0]:
+            ticket = self._tickets[row]
+            if rest:
+                ticket_tokens = set(tokenize(f"{ticket['subject']} {ticket['description']}"))
+                if not tokens <= ticket_tokens:
+                    continue
+            yield ticket
+
+    def search(self, text: str) -> list:
+        """All tickets whose subject/description mention every word of text"""
+        return list(self._matches(text))
+
+    def find(self, text: str):
+        """First ticket whose subject/description mention every word of text, or None"""
+        return next(self._matches(text), None)
+
+
+KANBAN_COLUMNS = ("To Do", "In Progress", "Completed")
+
+
+class ActivityStore:
+    """Activities with per-status, per-employee and per-priority indexes.
+
+    The status index doubles as the Kanban board: each column is kept up to
+    date as activities are added or moved, so rendering the board or reading
+    its counts never rescans the whole activity set.
+    """
+
+    def __init__(self, activities=()):
+        self._by_id = {}
+        self._order = {}
+        self._by_status = {column: {} for column in KANBAN_COLUMNS}
+        self._by_employee = defaultdict(dict)
+        self._by_priority = defaultdict(dict)
+        self._by_token = defaultdict(dict)
+        for activity in activities:
+            self.add(activity)
+
+    def _index(self, activity: dict):
+        activity_id = activity["activity_id"]
+        self._by_status.setdefault(activity["status"], {})[activity_id] = activity
+        self._by_employee[activity["employee"].lower()][activity_id] = activity
+        self._by_priority[activity["priority"].lower()][activity_id] = activity
+        for token in set(tokenize(activity["task"])):
+            self._by_token[token][activity_id] = activity
+
+    def _unindex(self, activity: dict):
+        activity_id = activity["activity_id"]
+        self._by_status[activity["status"]].pop(activity_id, None)
+        self._by_employee[activity["employee"].lower()].pop(activity_id, None)
+        self._by_priority[activity["priority"].lower()].pop(activity_id, None)
+        for token in set(tokenize(activity["task"])):
+            self._by_token[token].pop(activity_id, None)
+
+    def add(self, activity: dict):
+        """Add an activity and place it in its Kanban column"""
+        if activity["activity_id"] in self._by_id:
+            self._unindex(self._by_id[activity["activity_id"]])
+        self._order.setdefault(activity["activity_id"], len(self._order))
+        self._by_id[activity["activity_id"]] = activity
+        self._index(activity)
+
+    def update(self, activity_id: str, **changes) -> dict:
+        """Change fields of an activity, moving it between columns as needed"""
+        activity = self._by_id[activity_id]
+        self._unindex(activity)
+        activity.update(changes)
+        self._index(activity)
+        return activity
+
+    def __len__(self) -> int:
+        return len(self._by_id)
+
+    def __iter__(self):
+        return iter(self._by_id.values())
+
+    def get(self, activity_id: str):
+        return self._by_id.get(activity_id.upper())
+
+    def by_status(self, status: str) -> list:
+        return list(self._by_status.get(status, {}).values())
+
+    def by_priority(self, priority: str) -> list:
+        return list(self._by_priority.get(priority.lower(), {}).values())
+
+    def by_employee(self, name: str) -> list:
+        """Activities of every employee whose name contains name (case-insensitive)"""
+        name = name.strip().lower()
+        if name in self._by_employee:
+            return list(self._by_employee[name].values())
+        # Partial names: match against the distinct employees, not every activity
+        matches = [activities for employee, activities in self._by_employee.items() if name in employee]
+        if len(matches) == 1:
+            return list(matches[0].values())
+        return sorted(
+            (activity for activities in matches for activity in activities.values()),
+            key=lambda activity: self._order[activity["activity_id"]]
+        )
+
+    def find_task(self, text: str):
+        """First activity whose task mentions every word of text, or None"""
+        tokens = set(tokenize(text))
+        if not tokens:
+            return None
+        postings = sorted((self._by_token.get(token, {}) for token in tokens), key=len)
+        for activity_id, activity in postings[0].items():
+            if all(activity_id in posting for posting in postings[1:]):
+                return activity
+        return None
+
+    def kanban(self) -> dict:
+        """Kanban columns in board order, each a list of activities"""
+        return {column: list(self._by_status[column].values()) for column in KANBAN_COLUMNS}
+
+    def column_counts(self) -> dict:
+        return {column: len(activities) for column, activities in self._by_status.items()}
+
+
+HOURS_PER_MONTH = 730
+NAN = float("nan")
+
+# Numeric price columns, in the order used to compare services of a category
+PRICE_COLUMNS = ("monthly", "per_gb", "per_million")
+PRICE_UNITS = {"monthly": "/month", "per_gb": "/GB", "per_million": "/1M requests"}
+
+CATEGORY_SYNONYMS = {
+    "db": "Database", "sql": "Database", "vm": "Compute", "server": "Compute", "instance": "Compute",
+    "dyno": "Compute", "functions": "Serverless", "lambda": "Serverless", "bucket": "Storage",
+    "disk": "Storage", "redis": "Cache", "load balancer": "Networking", "auth": "Authentication"
+}
+
+
+def parse_price(text) -> tuple:
+    """Parse a display price into (low, high): '$30.40' -> (30.4, 30.4),
+    '$200-300' -> (200, 300), 'Free' -> (0, 0), 'Included' -> (nan, nan)"""
+    text = str(text)
+    if text.strip().lower() == "free":
+        return 0.0, 0.0
+    numbers = re.findall(r"\d+(?:\.\d+)?", text.replace(",", ""))
+    if not numbers or "$" not in text:
+        return NAN, NAN
+    low = float(numbers[0])
+    high = float(numbers[1]) if re.search(r"\d\s*-\s*\d", text) and len(numbers) > 1 else low
+    return low, high
+
+
+def format_price(value: float, unit: str = "") -> str:
+    """Dollar amount with cents and unit, keeping the extra digits of sub-dollar prices ($0.085/GB); "Free" for zero"""
+    if value == 0:
+        return "Free"
+    if value >= 1:
+        return f"${value:,.2f}{unit}"
+    digits = f"{float(f'{value:.6g}'):.10f}".rstrip("0")
+    return "$" + (digits if len(digits.split(".")[1]) >= 2 else f"{value:.2f}") + unit
+
+
+def format_estimate(low: float, high: float, unit: str = "") -> str:
+    """Estimate range in the data's display style: (200, 300) -> '$200-300'"""
+    if low == high:
+        return format_price(low, unit)
+    if low.is_integer() and high.is_integer():
+        return f"${low:,.0f}-{high:,.0f}{unit}"
+    return f"{format_price(low)}-{format_price(high)}{unit}"
+
+
+class CostTable:
+    """Infrastructure prices parsed once into typed, column-oriented arrays.
+
+    Each service is a row: provider and category codes plus float columns for
+    its monthly, per-GB and per-million-request price (nan when it doesn't
+    apply). Provider estimate ranges are kept as low/high columns. Queries
+    run over the columns with builtin min/sorted, without touching the
+    display strings or calling the LLM.
+    """
+
+    def __init__(self, costs: dict):
+        self.costs = costs
+        self.providers = list(costs)
+        self.categories = []
+        self.names = []
+        self.services = []
+        self.provider_code = array("H")
+        self.category_code = array("H")
+        self.columns = {column: array("d") for column in PRICE_COLUMNS}
+        self.estimate_low = array("d")
+        self.estimate_high = array("d")
+        self._rows_by_category = defaultdict(list)
+
+        for code, provider in enumerate(self.providers):
+            low, high = parse_price(costs[provider].get("total_monthly_estimate", ""))
+            self.estimate_low.append(low)
+            self.estimate_high.append(high)
+            for service in costs[provider]["services"]:
+                self._add_service(code, service)
+
+    def _add_service(self, provider_code: int, service: dict):
+        category = service["category"]
+        if category not in self.categories:
+            self.categories.append(category)
+        row = len(self.names)
+        self.names.append(service["name"])
+        self.services.append(service)
+        self.provider_code.append(provider_code)
+        self.category_code.append(self.categories.index(category))
+        self._rows_by_category[category].append(row)
+
+        monthly = parse_price(service.get("price_per_month", ""))[0]
+        if monthly != monthly:
+            hourly = parse_price(service.get("price_per_hour", ""))[0]
+            monthly = hourly * HOURS_PER_MONTH if hourly == hourly else parse_price(service.get("price", ""))[0]
+        per_gb = NAN
+        for key in ("price_per_gb_month", "price_per_gb", "price_per_gb_storage"):
+            per_gb = parse_price(service.get(key, ""))[0]
+            if per_gb == per_gb:
+                break
+        per_million = NAN
+        for key in ("price_per_million_requests", "price_per_million_executions", "price_per_million_invocations"):
+            per_million = parse_price(service.get(key, ""))[0]
+            if per_million == per_million:
+                break
+        self.columns["monthly"].append(monthly)
+        self.columns["per_gb"].append(per_gb)
+        self.columns["per_million"].append(per_million)
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def category_in(self, text: str):
+        """Category mentioned in text, or None"""
+        text = text.lower()
+        for category in self.categories:
+            if re.search(rf"\b{re.escape(category.lower())}\b", text):
+                return category
+        return next((category for word, category in CATEGORY_SYNONYMS.items() if re.search(rf"\b{word}\b", text)), None)
+
+    def _unit_column(self, rows: list):
+        """Price column most of rows are priced in (earlier columns win ties), or None"""
+        counts = {name: sum(1 for row in rows if self.columns[name][row] == self.columns[name][row]) for name in PRICE_COLUMNS}
+        column_name = max(PRICE_COLUMNS, key=lambda name: (counts[name], -PRICE_COLUMNS.index(name)))
+        return column_name if counts[column_name] else None
+
+    def _entry(self, row: int, column_name: str) -> dict:
+        return {
+            "provider": self.providers[self.provider_code[row]],
+            "service": self.names[row],
+            "category": self.categories[self.category_code[row]],
+            "price": self.columns[column_name][row],
+            "unit": PRICE_UNITS[column_name]
+        }
+
+    def ranking(self, category: str, providers=None, column_name=None) -> list:
+        """A category's services from cheapest to most expensive, compared in one unit.
+
+        Services mix units (Spaces is priced per month, S3 per GB), so only
+        services priced in column_name are ranked, by default the unit most
+        of the category's services use. Equal prices keep table order.
+        """
+        rows = self._rows(category, providers)
+        column_name = column_name or self._unit_column(rows)
+        if column_name is None:
+            return []
+        column = self.columns[column_name]
+        priced = sorted((row for row in rows if column[row] == column[row]), key=column.__getitem__)
+        return [self._entry(row, column_name) for row in priced]
+
+    def _pick(self, category: str, providers, highest: bool):
+        ranked = self.ranking(category, providers)
+        return (ranked[-1] if highest else ranked[0]) if ranked else None
+
+    def _rows(self, category=None, providers=None) -> list:
+        rows = self._rows_by_category.get(category, []) if category else range(len(self.names))
+        if providers:
+            codes = {self.providers.index(provider) for provider in providers}
+            rows = [row for row in rows if self.provider_code[row] in codes]
+        return list(rows)
+
+    def cheapest(self, category=None, providers=None) -> dict:
+        """Cheapest service per category (or for one category): {category: row}"""
+        categories = [category] if category else self.categories
+        picks = {c: self._pick(c, providers, highest=False) for c in categories}
+        return {c: pick for c, pick in picks.items() if pick}
+
+    def most_expensive(self, category=None, providers=None) -> dict:
+        """Most expensive service per category (or for one category): {category: row}"""
+        categories = [category] if category else self.categories
+        picks = {c: self._pick(c, providers, highest=True) for c in categories}
+        return {c: pick for c, pick in picks.items() if pick}
+
+    def rank_providers(self, providers=None, descending: bool = False) -> list:
+        """Providers ordered by estimated monthly spend (low, then high end)"""
+        codes = [self.providers.index(p) for p in providers] if providers else range(len(self.providers))
+        ranked = sorted(codes, key=lambda code: (self.estimate_low[code], self.estimate_high[code]), reverse=descending)
+        return [
+            {"provider": self.providers[code], "low": self.estimate_low[code], "high": self.estimate_high[code]}
+            for code in ranked
+        ]
+
+    def compare(self, providers=None, categories=None) -> list:
+        """Providers ranked by estimated spend, each with its cheapest service per category.
+
+        Every provider's pick for a category is priced in the unit most of
+        the category's services (across all providers) use.
+        """
+        units = {category: self._unit_column(self._rows(category)) for category in categories or self.categories}
+        comparison = []
+        for entry in self.rank_providers(providers):
+            entry["cheapest"] = {}
+            for category, column_name in units.items():
+                ranked = self.ranking(category, [entry["provider"]], column_name) if column_name else []
+                if ranked:
+                    entry["cheapest"][category] = ranked[0]
+            comparison.append(entry)
+        return comparison
+
+    def compare_in_category(self, category: str, providers=None) -> list:
+        """Providers that offer category, each with its cheapest service there, ranked by that price"""
+        column_name = self._unit_column(self._rows(category))
+        comparison, seen = [], set()
+        for entry in self.ranking(category, providers, column_name) if column_name else []:
+            if entry["provider"] not in seen:
+                seen.add(entry["provider"])
+                comparison.append(entry)
+        return comparison
+
+
+# Phrases that point at each COMPANY_INFO field; nested fields use dotted paths
+COMPANY_FIELD_SYNONYMS = {
+    "name": r"\b(?:company name|called)\b",
+    "founded": r"\b(?:founded|established|founding|since when|how old)\b",
+    "headquarters": r"\b(?:headquarter(?:s|ed)?|hq|located|location|based in|office|address|where (?:is|are) (?:you|it|the company|technology[- ]garage))\b",
+    "description": r"\b(?:what (?:do|does) (?:you|it|the company|technology[- ]garage) do|description)\b",
+    "services": r"\b(?:services?|offer(?:s|ings?)?|provide|programs?|bootcamps?|courses?)\b",
+    "team_size": r"\b(?:team size|big is (?:the|your) team|employees|staff|coaches|headcount|how many people|people work)\b",
+    "industries_served": r"\b(?:industr(?:y|ies)|sectors?)\b",
+    "vision": r"\bvision\b",
+    "mission": r"\b(?:mission|purpose)\b",
+    "values": r"\b(?:values|principles|culture)\b",
+    "clients": r"\b(?:clients?|customers?)\b",
+    "learning_approach.gamification_elements": r"\b(?:gamifi\w*|xp|experience points|badges?|leaderboards?|quests?)\b",
+    "learning_approach.coaching_style": r"\b(?:coaching style|teaching style|how (?:do you|does it) coach)\b",
+    "learning_approach.skill_tracks": r"\b(?:skill tracks?|tracks|curriculum|what can i learn)\b",
+    "learning_approach.success_metrics": r"\b(?:success|satisfaction|track record|students coached)\b"
+}
+
+# Questions answered from the index must refer to the company itself, so
+# "What year is it?" isn't taken for the founding year
+COMPANY_MENTION_PATTERN = re.compile(r"\b(?:you|your|company|technology[- ]garage)\b")
+
+# Words that belong to the other agents, so a question using them is never
+# answered from the company index alone
+OTHER_AGENT_PATTERN = re.compile(r"\b(?:news|tickets?|tasks?|activit(?:y|ies)|costs?|pricing|prices?)\b")
+
+# Yes/no questions ("Do you offer refunds?", "Is your office open on
+# weekends?") can't be answered by quoting a field
+YES_NO_PATTERN = re.compile(r"^(?:(?:so|and|but|please|hey|hi|ok|okay),? )*(?:do|does|did|is|are|was|were|can|could|will|would|have|has)\b")
+
+# Questions that need an explanation rather than a field value
+OPEN_ENDED_PATTERN = re.compile(
+    r"\b(?:why|how (?:do|does|can|is|are|will)|explain|describe|compare|tell me (?:more )?about|recommend|should|difference|what makes|elaborate)\b"
+)
+
+# Fields sent to the model for open-ended questions that name no field
+COMPANY_OVERVIEW_FIELDS = ("name", "founded", "headquarters", "description", "services", "mission")
+
+# Single-fact answers; list fields without a template are answered as bullet lists
+COMPANY_FACT_TEMPLATES = {
+    "name": "The company is called {name}.",
+    "founded": "{name} was founded in {value}.",
+    "headquarters": "{name} is headquartered in {value}.",
+    "description": "{value}",
+    "team_size": "{name} has a team of {value}.",
+    "vision": "{name}'s vision: {value}.",
+    "mission": "{name}'s mission: {value}.",
+    "learning_approach.coaching_style": "{name}'s coaching style: {value}.",
+    "learning_approach.success_metrics": "{name}'s track record: {value}."
+}
+
+
+class CompanyIndex:
+    """Field-level index over COMPANY_INFO.
+
+    Questions are matched to fields through COMPANY_FIELD_SYNONYMS. A
+    question that mentions the company, is about exactly one field, and is
+    neither a yes/no question nor about another agent's data is answered
+    from a template without the LLM; anything else gets a JSON excerpt of just the matched fields, built
+    from per-field snippets serialized once here.
+    """
+
+    def __init__(self, info: dict):
+        self.name = info.get("name", "")
+        self.values = {}
+        for field, value in info.items():
+            if isinstance(value, dict):
+                self.values.update({f"{field}.{key}": nested for key, nested in value.items()})
+            else:
+                self.values[field] = value
+        self._patterns = [
+            (field, re.compile(pattern)) for field, pattern in COMPANY_FIELD_SYNONYMS.items() if field in self.values
+        ]
+        # Each field as the inner lines of a JSON object, so excerpts are joins
+        self._snippets = {
+            field: json.dumps({field: value}, indent=2)[2:-2] for field, value in self.values.items()
+        }
+
+    def fields_in(self, text: str) -> list:
+        """Fields the question refers to, in COMPANY_INFO order"""
+        text = text.lower()
+        return [field for field, pattern in self._patterns if pattern.search(text)]
+
+    def fact(self, field: str) -> str:
+        value = self.values[field]
+        template = COMPANY_FACT_TEMPLATES.get(field)
+        if template is None:
+            label = field.split(".")[-1].replace("_", " ").capitalize()
+            items = value if isinstance(value, list) else [value]
+            return f"{label} at {self.name}:\n" + "\n".join(f"- {item}" for item in items)
+        return template.format(name=self.name, value=value)
+
+    def answer(self, text: str):
+        """Template answer for a single-fact question, or None if it needs the LLM"""
+        text = text.lower()
+        if (not COMPANY_MENTION_PATTERN.search(text) or OPEN_ENDED_PATTERN.search(text)
+                or YES_NO_PATTERN.search(text.strip()) or OTHER_AGENT_PATTERN.search(text)):
+            return None
+        fields = self.fields_in(text)
+        return self.fact(fields[0]) if len(fields) == 1 else None
+
+    def excerpt(self, text: str, topic: str = "") -> str:
+        """JSON with only the fields relevant to the question (an overview if none match)"""
+        fields = self.fields_in(f"{text} {topic}") or [f for f in COMPANY_OVERVIEW_FIELDS if f in self.values]
+        if "name" not in fields:
+            fields.insert(0, "name")
+        return "{\n" + ",\n".join(self._snippets[field] for field in fields) + "\n}"